@@ -0,0 +1,130 @@
+import numpy as np
+
+
+# ============================================
+# DATA
+# ============================================
+CITIES = {
+    "Mumbai": {"lat": 19.0896, "lon": 72.8656, "code": "BOM"},
+    "Delhi": {"lat": 28.5562, "lon": 77.1000, "code": "DEL"},
+    "Bangalore": {"lat": 12.9716, "lon": 77.5946, "code": "BLR"},
+    "Chennai": {"lat": 13.0827, "lon": 80.2707, "code": "MAA"},
+    "Kolkata": {"lat": 22.5726, "lon": 88.3639, "code": "CCU"},
+    "Hyderabad": {"lat": 17.3850, "lon": 78.4867, "code": "HYD"},
+}
+
+EARTH_RADIUS_KM = 6371
+
+# Column names accepted by AirportRegistry.from_file, first match wins.
+# The second spelling of each matches the public OurAirports airports.csv.
+_FILE_COLUMNS = {
+    "code": ("code", "iata_code", "iata"),
+    "name": ("name", "municipality", "city"),
+    "lat": ("lat", "latitude_deg", "latitude"),
+    "lon": ("lon", "longitude_deg", "longitude"),
+}
+
+
+def haversine_np(lat1, lon1, lat2, lon2):
+    """Element-wise great-circle distance in km; arguments broadcast."""
+    p1 = np.radians(lat1)
+    p2 = np.radians(lat2)
+    dp = p2 - p1
+    dl = np.radians(np.asarray(lon2) - np.asarray(lon1))
+    a = np.sin(dp / 2) ** 2 + np.cos(p1) * np.cos(p2) * np.sin(dl / 2) ** 2
+    return EARTH_RADIUS_KM * 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+
+# ============================================
+# REGISTRY
+# ============================================
+class AirportRegistry:
+    """Airports indexed 0..N-1 with a lazily built N x N distance matrix."""
+
+    def __init__(self, codes, names, lat, lon, dtype=np.float64):
+        self.codes = np.asarray(codes, dtype=str)
+        self.names = np.asarray(names, dtype=str)
+        self.lat = np.asarray(lat, dtype=np.float64)
+        self.lon = np.asarray(lon, dtype=np.float64)
+        self.dtype = dtype
+        self._matrix = None
+
+        # Names and IATA codes both resolve to the same row.
+        self.index = {c: i for i, c in enumerate(self.codes.tolist())}
+        self.index.update({n: i for i, n in enumerate(self.names.tolist())})
+
+    def __len__(self):
+        return len(self.codes)
+
+    @classmethod
+    def from_cities(cls, cities, **kwargs):
+        names = list(cities)
+        return cls(
+            codes=[cities[n]["code"] for n in names],
+            names=names,
+            lat=[cities[n]["lat"] for n in names],
+            lon=[cities[n]["lon"] for n in names],
+            **kwargs,
+        )
+
+    @classmethod
+    def from_file(cls, path, **kwargs):
+        """Load airports from a CSV file; rows without an IATA code are dropped.
+
+        For thousands of airports pass ``dtype=np.float32`` to halve the
+        matrix footprint.
+        """
+        import pandas as pd
+
+        header = pd.read_csv(path, nrows=0).columns
+        usecols = {}
+        for field, candidates in _FILE_COLUMNS.items():
+            found = next((c for c in candidates if c in header), None)
+            if found is None:
+                raise ValueError(f"{path}: no column for {field!r} (expected one of {candidates})")
+            usecols[found] = field
+
+        frame = pd.read_csv(path, usecols=list(usecols), keep_default_na=False)
+        frame = frame.rename(columns=usecols)
+        frame = frame[frame["code"].str.len() == 3].drop_duplicates("code")
+        return cls(frame["code"], frame["name"], frame["lat"], frame["lon"], **kwargs)
+
+    @property
+    def matrix(self):
+        if self._matrix is None:
+            self._matrix = self._build_matrix()
+        return self._matrix
+
+    def _build_matrix(self, block=1024):
+        n = len(self)
+        out = np.empty((n, n), dtype=self.dtype)
+        # Row blocks keep the float64 temporaries bounded for large registries.
+        for start in range(0, n, block):
+            stop = min(start + block, n)
+            out[start:stop] = haversine_np(
+                self.lat[start:stop, None], self.lon[start:stop, None],
+                self.lat[None, :], self.lon[None, :],
+            )
+        np.fill_diagonal(out, 0)
+        return out
+
+    def indices(self, labels):
+        """Resolve names, codes or integer indices to row indices."""
+        labels = np.asarray(labels)
+        if labels.dtype.kind in "iu":
+            return labels.astype(np.intp, copy=False)
+        uniq, inverse = np.unique(labels, return_inverse=True)
+        try:
+            codes = np.array([self.index[u] for u in uniq.tolist()], dtype=np.intp)
+        except KeyError as exc:
+            raise KeyError(f"Unknown airport {exc.args[0]!r}") from None
+        return codes[inverse].reshape(labels.shape)
+
+    def distance(self, a, b):
+        return float(self.matrix[self.index[a], self.index[b]])
+
+    def distances(self, sources, dests):
+        return self.matrix[self.indices(sources), self.indices(dests)]
+
+
+REGISTRY = AirportRegistry.from_cities(CITIES)
@@ -0,0 +1,307 @@
+"""Headless JSON API for flight search, distances and model pricing.
+
+Runs as its own process, separate from the Streamlit UI:
+
+    python api.py --port 8080
+
+POST /search    {"queries": [{"source", "dest", "date", "class", "passengers"}, ...]}
+POST /distance  {"pairs": [["BOM", "DEL"], ...]}
+POST /predict   {"rows": [<Data_Train-shaped row>, ...]}
+POST /hold      {"flight_no", "date", "seats"}
+POST /confirm   {"hold_id"}
+POST /release   {"hold_id"}
+GET  /health
+"""
+import argparse
+import asyncio
+from datetime import date
+
+import pandas as pd
+from aiohttp import web
+
+from airports import REGISTRY
+from batcher import BatcherStopped, MicroBatcher, QueueFull
+from fare_engine import CLASS_TYPES, generate_flights
+from features import RAW_COLUMNS
+from prediction_cache import PredictionCache
+from predictor import ARTIFACTS_DIR
+from repricing import FareTable, search_cache_invalidator, seat_booker
+from search_cache import SearchCache, search_key
+from seat_inventory import SeatInventory
+
+
+MAX_BATCH = 1000
+
+SEARCH_CACHE = web.AppKey("search_cache", SearchCache)
+ARTIFACTS = web.AppKey("artifacts_dir", str)
+BATCHER = web.AppKey("batcher", MicroBatcher)
+INVENTORY = web.AppKey("inventory", SeatInventory)
+FARES = web.AppKey("fare_table", FareTable)
+PREDICTIONS = web.AppKey("prediction_cache", PredictionCache)
+
+
+class BadRequest(ValueError):
+    """Invalid client input; the only exception answered with a 400."""
+
+
+def _error(status, message):
+    return web.json_response({"error": message}, status=status)
+
+
+async def _batch(request, field):
+    try:
+        payload = await request.json()
+    except ValueError:
+        raise BadRequest("Body must be JSON") from None
+    items = payload.get(field) if isinstance(payload, dict) else None
+    if not isinstance(items, list) or not items:
+        raise BadRequest(f"'{field}' must be a non-empty list")
+    if len(items) > MAX_BATCH:
+        raise BadRequest(f"At most {MAX_BATCH} {field} per request")
+    return items
+
+
+@web.middleware
+async def error_middleware(request, handler):
+    # Validation raises BadRequest; anything else is a bug and is left to
+    # aiohttp's 500 handling.
+    try:
+        return await handler(request)
+    except BadRequest as exc:
+        return _error(400, str(exc))
+
+
+def _airports(labels):
+    if not all(isinstance(label, str) for label in labels):
+        raise BadRequest("Airports must be given as names or codes")
+    try:
+        return REGISTRY.indices(labels)
+    except KeyError as exc:
+        raise BadRequest(exc.args[0]) from None
+
+
+def _date(value):
+    try:
+        return date.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise BadRequest(f"Invalid date {value!r}; expected YYYY-MM-DD") from None
+
+
+def _count(value, field):
+    try:
+        count = int(value)
+    except (TypeError, ValueError):
+        raise BadRequest(f"{field} must be a whole number") from None
+    if not 1 <= count <= 9:
+        raise BadRequest(f"{field} must be between 1 and 9")
+    return count
+
+
+# ============================================
+# SEARCH
+# ============================================
+def _parse_query(item):
+    if not isinstance(item, dict):
+        raise BadRequest("Each query must be a JSON object")
+    try:
+        source, dest, travel_date = item["source"], item["dest"], _date(item["date"])
+    except KeyError as exc:
+        raise BadRequest(f"Query is missing {exc.args[0]!r}") from None
+    class_type = item.get("class", CLASS_TYPES[0])
+    if class_type not in CLASS_TYPES:
+        raise BadRequest(f"Unknown class {class_type!r}")
+    passengers = _count(item.get("passengers", 1), "passengers")
+    _airports([source, dest])
+    return source, dest, travel_date, class_type, passengers
+
+
+def _search(cache, inventory, fares, queries):
+    fares.advance()
+    first, last = fares.window()
+    for _, _, travel_date, _, _ in queries:
+        if not first <= travel_date <= last:
+            raise BadRequest(f"date must be between {first.isoformat()} and {last.isoformat()}")
+    results = []
+    for source, dest, travel_date, class_type, passengers in queries:
+        flights = cache.get_or_compute(
+            search_key(source, dest, travel_date, class_type, passengers),
+            lambda rng: fares.reprice_results(
+                generate_flights(source, dest, class_type, passengers, rng=rng,
+                                 travel_date=travel_date),
+                travel_date,
+            ),
+        )
+        flights = inventory.with_live_seats(flights, travel_date)
+        results.append({
+            "source": source,
+            "dest": dest,
+            "date": travel_date.isoformat(),
+            "class": class_type,
+            "passengers": passengers,
+            "distance_km": REGISTRY.distance(source, dest),
+            "flights": [flights.record(i) for i in range(len(flights))],
+        })
+    return results
+
+
+async def search(request):
+    queries = [_parse_query(item) for item in await _batch(request, "queries")]
+    loop = asyncio.get_running_loop()
+    results = await loop.run_in_executor(None, _search, request.app[SEARCH_CACHE],
+                                         request.app[INVENTORY], request.app[FARES], queries)
+    return web.json_response({"results": results})
+
+
+async def distance(request):
+    pairs = await _batch(request, "pairs")
+    if not all(isinstance(p, list) and len(p) == 2 for p in pairs):
+        raise BadRequest("Each pair must be [source, dest]")
+    sources, dests = zip(*pairs)
+    _airports(list(sources) + list(dests))
+    km = REGISTRY.distances(list(sources), list(dests))
+    return web.json_response({"distances_km": km.tolist()})
+
+
+# ============================================
+# BOOKING
+# ============================================
+async def _json_object(request):
+    try:
+        payload = await request.json()
+    except ValueError:
+        raise BadRequest("Body must be JSON") from None
+    if not isinstance(payload, dict):
+        raise BadRequest("Body must be a JSON object")
+    return payload
+
+
+async def hold(request):
+    payload = await _json_object(request)
+    try:
+        flight_no, travel_date = str(payload["flight_no"]), _date(payload["date"])
+    except KeyError as exc:
+        raise BadRequest(f"Hold is missing {exc.args[0]!r}") from None
+    seats = _count(payload.get("seats", 1), "seats")
+    loop = asyncio.get_running_loop()
+    held = await loop.run_in_executor(None, request.app[INVENTORY].hold, flight_no, travel_date, seats)
+    if held is None:
+        return _error(409, f"Not enough seats on {flight_no} for {travel_date.isoformat()}")
+    return web.json_response(held)
+
+
+def _hold_action(action, status):
+    async def handler(request):
+        payload = await _json_object(request)
+        if "hold_id" not in payload:
+            raise BadRequest("'hold_id' is required")
+        loop = asyncio.get_running_loop()
+        method = getattr(request.app[INVENTORY], action)
+        if not await loop.run_in_executor(None, method, str(payload["hold_id"])):
+            return _error(409, "Hold is unknown, expired or already closed")
+        return web.json_response({"hold_id": payload["hold_id"], "status": status})
+    return handler
+
+
+# ============================================
+# PREDICT
+# ============================================
+def _predict_fn(artifacts_dir, cache=None):
+    """Features + ensemble for one coalesced batch of raw rows."""
+    def predict_rows(raw):
+        from features import build_features
+        from freq_index import load_frequency_index
+        from prediction_cache import CachedPredictor
+        from predictor import load_predictor
+
+        model = load_predictor(artifacts_dir)
+        if cache is not None:
+            # Rows any process has already priced with this model version skip the model.
+            model = CachedPredictor(model, cache)
+        return model.predict_batch(build_features(raw, load_frequency_index(artifacts_dir)))
+    return predict_rows
+
+
+async def predict(request):
+    rows = await _batch(request, "rows")
+    if not all(isinstance(row, dict) for row in rows):
+        raise BadRequest("Each row must be a JSON object")
+    frame = pd.DataFrame(rows)
+    missing = [c for c in RAW_COLUMNS if c not in frame.columns]
+    if missing:
+        raise BadRequest(f"Missing raw columns: {missing}")
+    try:
+        prices = await request.app[BATCHER].submit(frame)
+    except QueueFull as exc:
+        return _error(503, f"Overloaded: {exc}")
+    except BatcherStopped:
+        return _error(503, "Shutting down")
+    except (ImportError, FileNotFoundError) as exc:
+        return _error(503, f"Model unavailable: {exc}")
+    return web.json_response({"model_version": _model_version(request.app[ARTIFACTS]),
+                              "prices": prices.tolist()})
+
+
+def _model_version(artifacts_dir):
+    from predictor import load_predictor
+    return load_predictor(artifacts_dir).version
+
+
+async def health(request):
+    return web.json_response({
+        "status": "ok",
+        "search_cache": request.app[SEARCH_CACHE].stats(),
+        "inference": request.app[BATCHER].stats(),
+        "inventory": request.app[INVENTORY].stats(),
+        "fares": request.app[FARES].stats(),
+        "prediction_cache": request.app[PREDICTIONS].stats(),
+    })
+
+
+async def _start_batcher(app):
+    await app[BATCHER].start()
+
+
+async def _stop_batcher(app):
+    await app[BATCHER].stop()
+
+
+async def _close_stores(app):
+    app[INVENTORY].close()
+    app[PREDICTIONS].close()
+
+
+def create_app(search_cache=None, artifacts_dir=ARTIFACTS_DIR, inventory=None, fare_table=None,
+               prediction_cache=None):
+    app = web.Application(middlewares=[error_middleware])
+    app[SEARCH_CACHE] = search_cache or SearchCache()
+    app[INVENTORY] = inventory or SeatInventory()
+    app[FARES] = FareTable(date.today()) if fare_table is None else fare_table
+    app[FARES].subscribe(search_cache_invalidator(app[FARES], app[SEARCH_CACHE]))
+    # Confirmed and cancelled bookings reprice the flights they touch.
+    app[INVENTORY].subscribe(seat_booker(app[FARES]))
+    app[ARTIFACTS] = artifacts_dir
+    app[PREDICTIONS] = prediction_cache or PredictionCache()
+    app[BATCHER] = MicroBatcher(_predict_fn(artifacts_dir, app[PREDICTIONS]),
+                                required_columns=RAW_COLUMNS)
+    app.on_startup.append(_start_batcher)
+    app.on_cleanup.append(_stop_batcher)
+    app.on_cleanup.append(_close_stores)
+    app.add_routes([
+        web.get("/health", health),
+        web.post("/search", search),
+        web.post("/distance", distance),
+        web.post("/predict", predict),
+        web.post("/hold", hold),
+        web.post("/confirm", _hold_action("confirm", "confirmed")),
+        web.post("/release", _hold_action("release", "released")),
+    ])
+    return app
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the AeroVoyage JSON API.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--artifacts", default=ARTIFACTS_DIR)
+    args = parser.parse_args()
+    web.run_app(create_app(artifacts_dir=args.artifacts), host=args.host, port=args.port)
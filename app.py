@@ -1,9 +1,27 @@
+import os
+import threading
+import time
+
+IMPORT_STARTED = time.perf_counter()
+
 import streamlit as st
-import pandas as pd
 import numpy as np
-import math
 from datetime import datetime, timedelta
-import plotly.graph_objects as go
+
+from airports import CITIES, REGISTRY
+from charts import FigureCache, prewarm as prewarm_figures
+from fare_calendar import WINDOWS, calendar_dates, calendar_grid, calendar_key, price_calendar
+from fare_engine import generate_flights
+from itinerary import RouteGraph, build_schedule, fare_for
+from perf import PerfRecorder, memory_usage
+from route_geometry import RouteGeometry
+from repricing import HORIZON_DAYS, FareTable, search_cache_invalidator, seat_booker
+from search_cache import SearchCache, search_key
+from seat_inventory import SeatInventory
+from ui_templates import flight_card, stat_card
+
+# Module imports are cached by Python, so only a process's first run pays this.
+IMPORT_SECONDS = time.perf_counter() - IMPORT_STARTED
 
 
 # ============================================
@@ -17,9 +35,54 @@ st.set_page_config(
 )
 
 
+# ============================================
+# PERFORMANCE
+# ============================================
+# Opt-in debug panel: ?debug=1 in the URL or AEROVOYAGE_DEBUG=1.
+@st.cache_resource
+def get_perf_recorder():
+    return PerfRecorder()
+
+
+DEBUG = os.environ.get("AEROVOYAGE_DEBUG") == "1" or st.query_params.get("debug") == "1"
+perf_timer = get_perf_recorder().start()
+
+
+# ============================================
+# STARTUP
+# ============================================
+# AEROVOYAGE_STARTUP=lazy (default) paints first and warms plotly and the
+# distance matrix in a background thread; =eager warms them before the
+# first paint. Either way it happens once per process.
+STARTUP_MODE = os.environ.get("AEROVOYAGE_STARTUP", "lazy")
+
+
+def _warm(recorder):
+    started = time.perf_counter()
+    REGISTRY.matrix
+    prewarm_figures()
+    recorder.mark_startup("prewarm", time.perf_counter() - started)
+
+
+@st.cache_resource
+def start_prewarm():
+    recorder = get_perf_recorder()
+    recorder.mark_startup("imports", IMPORT_SECONDS)
+    if STARTUP_MODE == "eager":
+        _warm(recorder)
+        return None
+    thread = threading.Thread(target=_warm, args=(recorder,), name="aerovoyage-prewarm", daemon=True)
+    thread.start()
+    return thread
+
+
+start_prewarm()
+
+
 # ============================================
 # CUSTOM CSS
 # ============================================
+perf_timer.begin("CSS")
 st.markdown("""
 <style>
     .main {
@@ -157,80 +220,10 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 
-# ============================================
-# DATA & HELPERS
-# ============================================
-CITIES = {
-    "Mumbai": {"lat": 19.0896, "lon": 72.8656, "code": "BOM"},
-    "Delhi": {"lat": 28.5562, "lon": 77.1000, "code": "DEL"},
-    "Bangalore": {"lat": 12.9716, "lon": 77.5946, "code": "BLR"},
-    "Chennai": {"lat": 13.0827, "lon": 80.2707, "code": "MAA"},
-    "Kolkata": {"lat": 22.5726, "lon": 88.3639, "code": "CCU"},
-    "Hyderabad": {"lat": 17.3850, "lon": 78.4867, "code": "HYD"},
-}
-
-
-AIRLINES = [
-    {"name": "IndiGo", "logo": "🔵", "multiplier": 1.0, "rating": 4.2},
-    {"name": "Air India", "logo": "🔴", "multiplier": 1.2, "rating": 4.0},
-    {"name": "Vistara", "logo": "🟣", "multiplier": 1.4, "rating": 4.5},
-    {"name": "SpiceJet", "logo": "🟡", "multiplier": 0.9, "rating": 3.8},
-    {"name": "GoAir", "logo": "🟢", "multiplier": 0.85, "rating": 3.9},
-    {"name": "AirAsia", "logo": "🔴", "multiplier": 0.88, "rating": 4.1},
-]
-
-
-def haversine(lat1, lon1, lat2, lon2):
-    R = 6371
-    p1 = math.radians(lat1)
-    p2 = math.radians(lat2)
-    dp = math.radians(lat2 - lat1)
-    dl = math.radians(lon2 - lon1)
-    a = math.sin(dp/2)**2 + math.cos(p1) * math.cos(p2) * math.sin(dl/2)**2
-    return R * 2 * math.atan2(math.sqrt(a), math.sqrt(1-a))
-
-
-def generate_flights(source, dest, class_type, passengers):
-    if source == dest:
-        return []
-    
-    coord1 = CITIES[source]
-    coord2 = CITIES[dest]
-    distance = haversine(coord1["lat"], coord1["lon"], coord2["lat"], coord2["lon"])
-    
-    flights = []
-    for idx, airline in enumerate(AIRLINES):
-        base_price = distance * 2.5
-        class_mult = {"Economy": 1, "Premium Economy": 1.5, "Business": 2.5}[class_type]
-        price = int(base_price * airline["multiplier"] * class_mult * passengers)
-        
-        base_duration = int((distance / 770) * 60 + 30)
-        duration = base_duration + np.random.randint(0, 20)
-        
-        dep_hour = 6 + idx * 2
-        dep_min = [0, 15, 30, 45][idx % 4]
-        dep_time = f"{dep_hour:02d}:{dep_min:02d}"
-        
-        arr_mins = (dep_hour * 60 + dep_min + duration) % 1440
-        arr_time = f"{(arr_mins // 60):02d}:{(arr_mins % 60):02d}"
-        
-        flights.append({
-            **airline,
-            "price": price,
-            "duration": duration,
-            "departure": dep_time,
-            "arrival": arr_time,
-            "stops": 0 if idx % 3 == 0 else idx % 3,
-            "seats": int(np.random.randint(5, 25)),
-            "flight_no": f"{airline['name'][:2].upper()}{np.random.randint(1000, 9999)}"
-        })
-    
-    return flights
-
-
 # ============================================
 # HEADER
 # ============================================
+perf_timer.begin("HEADER")
 st.markdown("""
 <div style='text-align: center; padding: 20px; background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white; border-radius: 20px; margin-bottom: 30px;'>
     <h1 style='font-size: 56px; font-weight: 900; margin: 0; letter-spacing: -1px;'>✈️ AeroVoyage</h1>
@@ -242,6 +235,7 @@ st.markdown("""
 # ============================================
 # SEARCH SECTION
 # ============================================
+perf_timer.begin("SEARCH")
 st.markdown("<div class='search-box'>", unsafe_allow_html=True)
 st.markdown("### 🔍 Find Your Perfect Flight")
 
@@ -258,7 +252,10 @@ with col2:
 
 
 with col3:
-    travel_date = st.date_input("📅 Date", datetime.now() + timedelta(days=7))
+    # Fares are priced from today over the fare table's horizon.
+    today = datetime.now().date()
+    travel_date = st.date_input("📅 Date", today + timedelta(days=7), min_value=today,
+                                max_value=today + timedelta(days=HORIZON_DAYS - 1))
 
 
 with col4:
@@ -273,261 +270,252 @@ st.markdown("</div>", unsafe_allow_html=True)
 
 
 # ============================================
-# GENERATE FLIGHTS
+# RESULT SECTIONS
 # ============================================
-flights = generate_flights(source, dest, class_type, passengers)
+# Sections with their own widgets (charts, fare calendar, connections) are
+# fragments: those widgets rerun only that section, not the search, pricing
+# and the rest of the page. Sections without widgets are plain functions.
+def get_figure_cache():
+    if "figure_cache" not in st.session_state:
+        st.session_state["figure_cache"] = FigureCache()
+    return st.session_state["figure_cache"]
 
 
-if flights:
-    # Create DataFrame and derived fields immediately so all sections use enriched data
-    df = pd.DataFrame(flights)
-    max_price = df['price'].max()
-    df['savings'] = max_price - df['price']
-    df['duration_str'] = df.apply(lambda x: f"{int(x['duration'])//60}h {int(x['duration'])%60}m", axis=1)
-    df['stops_str'] = df.apply(lambda x: '✈️ Non-stop' if int(x['stops']) == 0 else f"{int(x['stops'])} stop(s)", axis=1)
-    df['route'] = df.apply(lambda x: f"{x['departure']} → {x['arrival']}", axis=1)
+@st.cache_resource
+def get_route_geometry():
+    return RouteGeometry(REGISTRY)
 
-    # Update flights to include derived columns (use this list everywhere below)
-    flights = df.to_dict(orient='records')
 
-    # Find best options (from enriched list)
-    cheapest = min(flights, key=lambda x: x["price"])
-    fastest = min(flights, key=lambda x: x["duration"])
-    
-    # ============================================
-    # STATISTICS
-    # ============================================
+def render_stats(flights, source, dest):
     st.markdown("<div class='section-header'>📊 Quick Stats</div>", unsafe_allow_html=True)
     
-    stat1, stat2, stat3, stat4 = st.columns(4)
-    
-    with stat1:
-        st.markdown(f"""
-        <div class='stat-card'>
-            <div style='font-size: 18px;'>💰 Lowest Price</div>
-            <div class='stat-number'>₹{cheapest['price']:,}</div>
-            <div>{cheapest['name']}</div>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    with stat2:
-        st.markdown(f"""
-        <div class='stat-card'>
-            <div style='font-size: 18px;'>⚡ Fastest Flight</div>
-            <div class='stat-number'>{fastest['duration'] // 60}h {fastest['duration'] % 60}m</div>
-            <div>{fastest['name']}</div>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    with stat3:
-        avg_price = int(np.mean([f['price'] for f in flights]))
-        st.markdown(f"""
-        <div class='stat-card'>
-            <div style='font-size: 18px;'>📈 Avg Price</div>
-            <div class='stat-number'>₹{avg_price:,}</div>
-            <div>{len(flights)} options</div>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    with stat4:
-        distance = haversine(CITIES[source]["lat"], CITIES[source]["lon"], 
-                           CITIES[dest]["lat"], CITIES[dest]["lon"])
-        st.markdown(f"""
-        <div class='stat-card'>
-            <div style='font-size: 18px;'>🛫 Distance</div>
-            <div class='stat-number'>{int(distance)}</div>
-            <div>kilometers</div>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    # ============================================
-    # BEST OPTIONS
-    # ============================================
+    cheapest = flights.record(flights.cheapest())
+    fastest = flights.record(flights.fastest())
+    cards = [
+        stat_card("💰 Lowest Price", f"₹{cheapest['price']:,}", cheapest['name']),
+        stat_card("⚡ Fastest Flight", fastest['duration_str'], fastest['name']),
+        stat_card("📈 Avg Price", f"₹{flights.avg_price():,}", f"{len(flights)} options"),
+        stat_card("🛫 Distance", int(REGISTRY.distance(source, dest)), "kilometers"),
+    ]
+    for col, card in zip(st.columns(4), cards):
+        with col:
+            st.markdown(card, unsafe_allow_html=True)
+
+
+def render_best_options(flights, source, dest):
     st.markdown("<div class='section-header'>✨ Best Options for You</div>", unsafe_allow_html=True)
     
     best_col1, best_col2 = st.columns(2)
     
     with best_col1:
-        st.markdown(f"""
-        <div class='flight-card'>
-            <div class='best-badge cheapest-badge'>💰 CHEAPEST FLIGHT</div>
-            <div style='display: flex; justify-content: space-between; align-items: center; margin: 15px 0;'>
-                <div style='display: flex; align-items: center; gap: 15px;'>
-                    <span style='font-size: 40px;'>{cheapest['logo']}</span>
-                    <div>
-                        <div style='font-size: 22px; font-weight: 700;'>{cheapest['name']}</div>
-                        <div style='color: #6b7280;'>{cheapest['flight_no']}</div>
-                    </div>
-                </div>
-                <div class='price-tag'>₹{cheapest['price']:,}</div>
-            </div>
-            <div class='flight-route'>
-                <div style='text-align: center;'>
-                    <div class='flight-time'>{cheapest['departure']}</div>
-                    <div class='flight-city'>{source}</div>
-                </div>
-                <div style='flex: 1; text-align: center; margin: 0 20px;'>
-                    <div style='border-top: 2px dashed #cbd5e1; position: relative;'>
-                        <div style='position: absolute; top: -12px; left: 50%; transform: translateX(-50%); background: white; padding: 0 10px;'>
-                            ✈️
-                        </div>
-                    </div>
-                    <div style='margin-top: 15px; font-weight: 600;'>{cheapest['duration_str']}</div>
-                    <div style='font-size: 12px; color: #6b7280;'>{cheapest['stops_str']}</div>
-                </div>
-                <div style='text-align: center;'>
-                    <div class='flight-time'>{cheapest['arrival']}</div>
-                    <div class='flight-city'>{dest}</div>
-                </div>
-            </div>
-            <div style='display: flex; justify-content: space-between; align-items: center; margin-top: 20px; padding-top: 20px; border-top: 1px solid #e5e7eb;'>
-                <div style='color: #6b7280;'>⭐ {cheapest['rating']} • {cheapest['seats']} seats left</div>
-            </div>
-        </div>
-        """, unsafe_allow_html=True)
+        st.markdown(flight_card("cheapest", flights.record(flights.cheapest()), source, dest),
+                    unsafe_allow_html=True)
     
     with best_col2:
-        st.markdown(f"""
-        <div class='flight-card'>
-            <div class='best-badge fastest-badge'>⚡ FASTEST FLIGHT</div>
-            <div style='display: flex; justify-content: space-between; align-items: center; margin: 15px 0;'>
-                <div style='display: flex; align-items: center; gap: 15px;'>
-                    <span style='font-size: 40px;'>{fastest['logo']}</span>
-                    <div>
-                        <div style='font-size: 22px; font-weight: 700;'>{fastest['name']}</div>
-                        <div style='color: #6b7280;'>{fastest['flight_no']}</div>
-                    </div>
-                </div>
-                <div class='price-tag'>₹{fastest['price']:,}</div>
-            </div>
-            <div class='flight-route'>
-                <div style='text-align: center;'>
-                    <div class='flight-time'>{fastest['departure']}</div>
-                    <div class='flight-city'>{source}</div>
-                </div>
-                <div style='flex: 1; text-align: center; margin: 0 20px;'>
-                    <div style='border-top: 2px dashed #cbd5e1; position: relative;'>
-                        <div style='position: absolute; top: -12px; left: 50%; transform: translateX(-50%); background: white; padding: 0 10px;'>
-                            ✈️
-                        </div>
-                    </div>
-                    <div style='margin-top: 15px; font-weight: 600;'>{fastest['duration_str']}</div>
-                    <div style='font-size: 12px; color: #6b7280;'>{fastest['stops_str']}</div>
-                </div>
-                <div style='text-align: center;'>
-                    <div class='flight-time'>{fastest['arrival']}</div>
-                    <div class='flight-city'>{dest}</div>
-                </div>
-            </div>
-            <div style='display: flex; justify-content: space-between; align-items: center; margin-top: 20px; padding-top: 20px; border-top: 1px solid #e5e7eb;'>
-                <div style='color: #6b7280;'>⭐ {fastest['rating']} • {fastest['seats']} seats left</div>
-            </div>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    # ============================================
-    # COMPARISON CHARTS
-    # ============================================
+        st.markdown(flight_card("fastest", flights.record(flights.fastest()), source, dest),
+                    unsafe_allow_html=True)
+
+
+@st.fragment
+def render_charts(flights, query, generation):
     st.markdown("<div class='section-header'>📊 Flight Comparison</div>", unsafe_allow_html=True)
     
+    sort_by = st.radio("Sort by", ["Airline", "Price", "Duration"], horizontal=True,
+                       key="chart_sort", label_visibility="collapsed")
+    order = {
+        "Airline": np.arange(len(flights)),
+        "Price": flights.top_k("price", len(flights)),
+        "Duration": flights.top_k("duration", len(flights)),
+    }[sort_by]
+    
+    figures = get_figure_cache()
+    names = flights.names[order]
+    price = flights.price[order]
+    duration = flights.duration[order]
+    
     chart_col1, chart_col2 = st.columns(2)
     
     with chart_col1:
         # Price comparison
-        fig_price = go.Figure()
-        colors_price = ['#10b981' if f['price'] == cheapest['price'] else '#667eea' for f in flights]
-        fig_price.add_trace(go.Bar(
-            x=[f['name'] for f in flights],
-            y=[f['price'] for f in flights],
-            marker_color=colors_price,
-            text=[f"₹{f['price']:,}" for f in flights],
-            textposition='outside',
-        ))
-        fig_price.update_layout(
-            title="💰 Price Comparison",
-            yaxis_title="Price (₹)",
-            height=400,
-            showlegend=False,
-            paper_bgcolor='rgba(0,0,0,0)',
-            plot_bgcolor='rgba(0,0,0,0)',
+        fig_price = figures.bar(
+            "price", (query, sort_by, generation), "💰 Price Comparison", "Price (₹)",
+            x=names, y=price,
+            colors=np.where(price == price.min(), '#10b981', '#667eea'),
+            text=flights.price_str()[order],
         )
         st.plotly_chart(fig_price, use_container_width=True)
     
     with chart_col2:
         # Duration comparison
-        fig_duration = go.Figure()
-        colors_dur = ['#f59e0b' if f['duration'] == fastest['duration'] else '#764ba2' for f in flights]
-        fig_duration.add_trace(go.Bar(
-            x=[f['name'] for f in flights],
-            y=[f['duration'] for f in flights],
-            marker_color=colors_dur,
-            text=[f"{int(f['duration'])//60}h {int(f['duration'])%60}m" for f in flights],
-            textposition='outside',
-        ))
-        fig_duration.update_layout(
-            title="⏱️ Duration Comparison",
-            yaxis_title="Duration (minutes)",
-            height=400,
-            showlegend=False,
-            paper_bgcolor='rgba(0,0,0,0)',
-            plot_bgcolor='rgba(0,0,0,0)',
+        fig_duration = figures.bar(
+            "duration", (query, sort_by, generation), "⏱️ Duration Comparison", "Duration (minutes)",
+            x=names, y=duration,
+            colors=np.where(duration == duration.min(), '#f59e0b', '#764ba2'),
+            text=flights.duration_str()[order],
         )
         st.plotly_chart(fig_duration, use_container_width=True)
+
+
+@st.cache_resource
+def get_calendar_cache():
+    return SearchCache(max_entries=128)
+
+
+@st.fragment
+def render_fare_calendar(source, dest, travel_date, class_type, passengers, fare_table):
+    st.markdown("<div class='section-header'>📅 Fare Calendar</div>", unsafe_allow_html=True)
+    
+    window = st.radio("Window", list(WINDOWS), horizontal=True,
+                      key="calendar_window", label_visibility="collapsed")
+    first, last = fare_table.window()
+    dates = calendar_dates(travel_date, *WINDOWS[window], earliest=first, latest=last)
+    if not len(dates):
+        st.info("The selected window is entirely in the past.")
+        return
+    # The whole window is priced in one batch and cached per route, window
+    # and fare table generation, so any repricing rebuilds it.
+    key = calendar_key(source, dest, dates, class_type, passengers, fare_table.generation)
+    calendar = get_calendar_cache().get_or_compute(
+        key, lambda rng: price_calendar(source, dest, dates, class_type, passengers,
+                                        fare_table=fare_table),
+    )
     
-    # ============================================
-    # DETAILED COMPARISON TABLE
-    # ============================================
+    best = int(calendar["min_price"].argmin())
+    st.markdown(f"Cheapest day: **{calendar['dates'][best]}** with "
+                f"{calendar['cheapest_airline'][best]} at **₹{int(calendar['min_price'][best]):,}**")
     
-    # ============================================
-    # ROUTE MAP
-    # ============================================
+    z, labels, weeks = calendar_grid(calendar)
+    fig = get_figure_cache().heatmap(key, z, weeks, labels)
+    st.plotly_chart(fig, use_container_width=True)
+
+
+def render_route_map(source, dest):
     st.markdown("<div class='section-header'>🗺️ Route Map</div>", unsafe_allow_html=True)
     
     coord1 = CITIES[source]
     coord2 = CITIES[dest]
     
-    # Create curved flight path
-    n = 50
-    lats = np.linspace(coord1["lat"], coord2["lat"], n)
-    lons = np.linspace(coord1["lon"], coord2["lon"], n)
-    for i in range(n):
-        lats[i] += 2 * math.sin(math.pi * i / n)
-    
-    fig_map = go.Figure()
-    
-    # Flight path
-    fig_map.add_trace(go.Scattermapbox(
-        lat=lats,
-        lon=lons,
-        mode='lines',
-        line=dict(width=4, color='#667eea'),
-        hoverinfo='skip'
-    ))
-    
-    # Cities
-    fig_map.add_trace(go.Scattermapbox(
-        lat=[coord1["lat"], coord2["lat"]],
-        lon=[coord1["lon"], coord2["lon"]],
-        mode='markers+text',
-        marker=dict(size=20, color=['#10b981', '#ef4444']),
-        text=[f"🛫 {source}", f"🛬 {dest}"],
-        textposition="top center",
-        textfont=dict(size=14, color='black', family='Arial Black')
-    ))
-    
-    fig_map.update_layout(
-        mapbox=dict(
-            style="open-street-map",
-            center=dict(lat=(coord1["lat"] + coord2["lat"]) / 2, lon=(coord1["lon"] + coord2["lon"]) / 2),
-            zoom=4.5
-        ),
-        height=500,
-        margin=dict(l=0, r=0, t=0, b=0),
-        showlegend=False
+    # Great-circle flight path, computed once per airport pair
+    lats, lons = get_route_geometry().arc(source, dest)
+    
+    fig_map = get_figure_cache().route_map(
+        (source, dest), lats, lons,
+        [coord1["lat"], coord2["lat"]], [coord1["lon"], coord2["lon"]],
+        [f"🛫 {source}", f"🛬 {dest}"],
     )
     
     st.plotly_chart(fig_map, use_container_width=True)
 
+
+@st.cache_resource
+def get_route_graph():
+    return RouteGraph(build_schedule())
+
+
+def _clock(minutes):
+    day, minute = divmod(int(minutes), 1440)
+    return f"{minute // 60:02d}:{minute % 60:02d}" + (f" +{day}d" if day else "")
+
+
+@st.fragment
+def render_connections(source, dest, class_type, passengers):
+    st.markdown("<div class='section-header'>🔀 Connecting Itineraries</div>", unsafe_allow_html=True)
+    
+    objective = st.radio("Optimise for", ["Price", "Duration", "Balanced"], horizontal=True,
+                         key="itinerary_objective", label_visibility="collapsed")
+    weights = {"Price": "price", "Duration": "duration", "Balanced": (1.0, 10.0)}[objective]
+    itineraries = get_route_graph().k_best(source, dest, k=3, objective=weights)
+    if not itineraries:
+        st.info("No itineraries within the connection limits.")
+        return
+    
+    st.dataframe({
+        "Route": [" → ".join(it["airports"]) for it in itineraries],
+        "Flights": [", ".join(it["flights"]) for it in itineraries],
+        "Departs": [_clock(it["departure"]) for it in itineraries],
+        "Arrives": [_clock(it["arrival"]) for it in itineraries],
+        "Duration": [f"{it['duration'] // 60}h {it['duration'] % 60}m" for it in itineraries],
+        "Stops": [it["stops"] for it in itineraries],
+        "Price (₹)": [fare_for(it, class_type, passengers) for it in itineraries],
+    }, hide_index=True, use_container_width=True)
+
+
+# ============================================
+# GENERATE FLIGHTS
+# ============================================
+@st.cache_resource
+def get_search_cache():
+    return SearchCache()
+
+
+@st.cache_resource
+def get_fare_table():
+    # Fare changes drop exactly the cached searches for the affected route and day.
+    table = FareTable(datetime.now().date())
+    table.subscribe(search_cache_invalidator(table, get_search_cache()))
+    return table
+
+
+@st.cache_resource
+def get_seat_inventory():
+    # Shared by every session and, through the database file, every process.
+    inventory = SeatInventory()
+    inventory.subscribe(seat_booker(get_fare_table()))
+    return inventory
+
+
+perf_timer.begin("GENERATE FLIGHTS")
+fare_table = get_fare_table()
+fare_table.advance()
+query = search_key(source, dest, travel_date, class_type, passengers)
+flights = get_search_cache().get_or_compute(
+    query,
+    lambda rng: fare_table.reprice_results(
+        generate_flights(source, dest, class_type, passengers, rng=rng, travel_date=travel_date),
+        travel_date,
+    ),
+)
+# Cached results keep their first seat draw; live counts come from the inventory.
+flights = get_seat_inventory().with_live_seats(flights, travel_date)
+
+
+if flights:
+    # ============================================
+    # STATISTICS
+    # ============================================
+    perf_timer.begin("STATISTICS")
+    render_stats(flights, source, dest)
+    
+    # ============================================
+    # BEST OPTIONS
+    # ============================================
+    perf_timer.begin("BEST OPTIONS")
+    render_best_options(flights, source, dest)
+    
+    # ============================================
+    # COMPARISON CHARTS
+    # ============================================
+    perf_timer.begin("COMPARISON CHARTS")
+    render_charts(flights, query, fare_table.generation)
+    
+    # ============================================
+    # FARE CALENDAR
+    # ============================================
+    perf_timer.begin("FARE CALENDAR")
+    render_fare_calendar(source, dest, travel_date, class_type, passengers, fare_table)
+    
+    # ============================================
+    # ROUTE MAP
+    # ============================================
+    perf_timer.begin("ROUTE MAP")
+    render_route_map(source, dest)
+    
+    # ============================================
+    # CONNECTING ITINERARIES
+    # ============================================
+    perf_timer.begin("CONNECTIONS")
+    render_connections(source, dest, class_type, passengers)
+
 else:
     st.markdown("""
     <div style='text-align: center; padding: 100px 20px; background: white; border-radius: 20px; margin: 40px 0;'>
@@ -541,6 +529,7 @@ else:
 # ============================================
 # FEATURES SECTION
 # ============================================
+perf_timer.begin("FEATURES")
 st.markdown("<div class='section-header'>⚡ Why Choose AeroVoyage?</div>", unsafe_allow_html=True)
 
 feat1, feat2, feat3, feat4 = st.columns(4)
@@ -585,6 +574,7 @@ with feat4:
 # ============================================
 # FOOTER
 # ============================================
+perf_timer.begin("FOOTER")
 st.markdown("""
 <div style='text-align: center; padding: 40px 20px; margin-top: 60px; 
             background: linear-gradient(135deg, #1f2937, #111827); 
@@ -595,3 +585,46 @@ st.markdown("""
     <p style='font-size: 14px; opacity: 0.7; margin-top: 20px;'>© 2024 AeroVoyage. All rights reserved.</p>
 </div>
 """, unsafe_allow_html=True)
+
+
+# ============================================
+# PERFORMANCE PANEL
+# ============================================
+record = get_perf_recorder().finish(perf_timer)
+
+if "first_render_ms" not in st.session_state:
+    # Time to interactive: per session, and once per process from the first import.
+    st.session_state["first_render_ms"] = record["total_ms"]
+    get_perf_recorder().observe("FIRST RENDER", record["total_ms"] / 1000)
+    get_perf_recorder().mark_startup("first_render", time.perf_counter() - IMPORT_STARTED)
+
+if DEBUG:
+    import pandas as pd
+
+    recorder = get_perf_recorder()
+    with st.expander("🛠️ Performance", expanded=True):
+        startup = {phase: seconds * 1000 for phase, seconds in recorder.startup.items()}
+        s1, s2, s3, s4 = st.columns(4)
+        s1.metric("Imports", f"{startup.get('imports', 0):.0f} ms")
+        s2.metric("Prewarm", f"{startup['prewarm']:.0f} ms" if "prewarm" in startup else "running",
+                  STARTUP_MODE, delta_color="off")
+        s3.metric("Process first render", f"{startup.get('first_render', 0):.0f} ms")
+        s4.metric("Session first render", f"{st.session_state['first_render_ms']:.0f} ms")
+        
+        recent = recorder.recent()[::-1]
+        st.dataframe(
+            pd.DataFrame([{"total_ms": r["total_ms"], **r["spans_ms"]} for r in recent]).round(2),
+            use_container_width=True,
+        )
+        
+        search_stats = get_search_cache().stats()
+        figures = get_figure_cache()
+        memory = memory_usage()
+        m1, m2, m3, m4 = st.columns(4)
+        m1.metric("Search cache hit rate", f"{search_stats['hit_rate']:.0%}",
+                  f"{search_stats['size']} entries", delta_color="off")
+        m2.metric("Figure builds / updates", f"{figures.builds} / {figures.updates}")
+        m3.metric("RSS", f"{memory['rss_mib']:.0f} MiB" if memory["rss_mib"] else "n/a")
+        m4.metric("Peak RSS", f"{memory['peak_rss_mib']:.0f} MiB")
+        
+        st.code(recorder.prometheus(), language="text")
@@ -0,0 +1,210 @@
+"""Chunked, resumable batch scoring of fare files.
+
+    python batch_score.py Dataset/Test_set.xlsx --out scores/ --chunk-rows 50000
+    python batch_score.py fares.parquet --out scores/ --workers 8 --format csv
+
+The input is streamed in fixed-size chunks. Each chunk runs feature
+engineering and the ensemble in a worker process and is written as its
+own ``part-NNNNN`` file. At most ``2 * workers`` chunks are in flight, so
+peak memory does not grow with the input. ``_progress.json`` in the output
+directory records finished chunks; rerunning the same command skips them.
+"""
+import argparse
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import pandas as pd
+
+from prediction_cache import PREDICTION_CACHE_PATH
+from predictor import ARTIFACTS_DIR
+
+
+PROGRESS_FILE = "_progress.json"
+PREDICTION_COLUMN = "Predicted_Price"
+
+
+# ============================================
+# INPUT
+# ============================================
+def iter_chunks(path, chunk_rows):
+    """Stream ``path`` (.parquet, .csv or a workbook) as frames of ``chunk_rows`` rows."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".csv":
+        yield from pd.read_csv(path, chunksize=chunk_rows)
+    elif ext == ".parquet":
+        import pyarrow.parquet as pq
+
+        reader = pq.ParquetFile(path, memory_map=True)
+        for batch in reader.iter_batches(batch_size=chunk_rows):
+            yield batch.to_pandas()
+    else:
+        # Workbooks cannot be streamed; they go through the typed Parquet cache.
+        from dataset import iter_batches
+
+        yield from iter_batches(os.path.abspath(path), chunk_rows)
+
+
+def _fingerprint(path, chunk_rows, fmt, artifacts_dir, engine, cache_path):
+    """Every setting that changes the part files; a resume needs all of them to match."""
+    from predictor import load_meta, model_version
+
+    stat = os.stat(path)
+    return {
+        "input": os.path.abspath(path),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "chunk_rows": chunk_rows,
+        "format": fmt,
+        "artifacts": os.path.abspath(artifacts_dir),
+        # A retrain in place keeps the directory but changes the predictions.
+        "model": model_version(load_meta(artifacts_dir), artifacts_dir),
+        "engine": engine,
+        "cache": os.path.abspath(cache_path) if cache_path else None,
+    }
+
+
+# ============================================
+# PROGRESS
+# ============================================
+def load_progress(out_dir, fingerprint):
+    """(finished chunk ids, rows scored) from an earlier run of the same job."""
+    path = os.path.join(out_dir, PROGRESS_FILE)
+    if not os.path.exists(path):
+        return set(), 0
+    with open(path, encoding="utf-8") as fh:
+        progress = json.load(fh)
+    if progress.get("job") != fingerprint:
+        raise ValueError(f"{out_dir} holds output of a different job; use a new --out "
+                         f"or delete {PROGRESS_FILE}")
+    return set(progress["done"]), progress["rows"]
+
+
+def save_progress(out_dir, fingerprint, done, rows):
+    path = os.path.join(out_dir, PROGRESS_FILE)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump({"job": fingerprint, "done": sorted(done), "rows": rows}, fh, indent=2)
+    os.replace(tmp, path)
+
+
+# ============================================
+# SCORING
+# ============================================
+_WORKER = {}
+
+
+def _init_worker(artifacts_dir, engine="native", cache_path=None):
+    from freq_index import load_frequency_index
+
+    # Models and index are loaded once per worker, not once per chunk.
+    if engine == "trees":
+        from tree_export import load_tree_predictor
+
+        # Every worker maps the same read-only file instead of its own model copy.
+        _WORKER["model"] = load_tree_predictor(artifacts_dir)
+    else:
+        from predictor import load_predictor
+
+        _WORKER["model"] = load_predictor(artifacts_dir)
+    if cache_path:
+        from prediction_cache import CachedPredictor, PredictionCache
+
+        _WORKER["model"] = CachedPredictor(_WORKER["model"], PredictionCache(cache_path))
+    _WORKER["index"] = load_frequency_index(artifacts_dir)
+
+
+def part_path(out_dir, chunk, fmt):
+    return os.path.join(out_dir, f"part-{chunk:05d}.{fmt}")
+
+
+def score_chunk(chunk, frame, out_dir, fmt):
+    """Score one chunk and write its part file; returns (chunk, rows, seconds)."""
+    from features import build_features
+
+    started = time.perf_counter()
+    out = frame.copy()
+    out[PREDICTION_COLUMN] = _WORKER["model"].predict_batch(build_features(frame, _WORKER["index"]))
+
+    path = part_path(out_dir, chunk, fmt)
+    tmp = f"{path}.tmp"
+    if fmt == "parquet":
+        out.to_parquet(tmp, index=False)
+    else:
+        out.to_csv(tmp, index=False)
+    os.replace(tmp, path)
+    return chunk, len(frame), time.perf_counter() - started
+
+
+def score_file(path, out_dir, chunk_rows=50_000, workers=None, fmt="parquet",
+               artifacts_dir=ARTIFACTS_DIR, engine="native", cache_path=None, log=print):
+    """Score ``path`` into ``out_dir``; returns a summary dict."""
+    os.makedirs(out_dir, exist_ok=True)
+    fingerprint = _fingerprint(path, chunk_rows, fmt, artifacts_dir, engine, cache_path)
+    done, total = load_progress(out_dir, fingerprint)
+    workers = workers or os.cpu_count() or 1
+    started = time.perf_counter()
+    scored = skipped = 0
+
+    def finished(result):
+        nonlocal scored, total
+        chunk, rows, seconds = result
+        done.add(chunk)
+        scored += rows
+        total += rows
+        save_progress(out_dir, fingerprint, done, total)
+        log(f"chunk {chunk:5d}: {rows} rows in {seconds:.2f}s")
+
+    if workers == 1:
+        _init_worker(artifacts_dir, engine, cache_path)
+        for chunk, frame in enumerate(iter_chunks(path, chunk_rows)):
+            if chunk in done:
+                skipped += 1
+                continue
+            finished(score_chunk(chunk, frame, out_dir, fmt))
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(artifacts_dir, engine, cache_path)) as pool:
+            pending = set()
+            for chunk, frame in enumerate(iter_chunks(path, chunk_rows)):
+                if chunk in done:
+                    skipped += 1
+                    continue
+                # Bounded read-ahead: never hold more than 2 chunks per worker.
+                if len(pending) >= 2 * workers:
+                    completed, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in completed:
+                        finished(future.result())
+                pending.add(pool.submit(score_chunk, chunk, frame, out_dir, fmt))
+            for future in wait(pending).done:
+                finished(future.result())
+
+    elapsed = time.perf_counter() - started
+    return {
+        "rows": scored,
+        "chunks": len(done),
+        "skipped_chunks": skipped,
+        "seconds": elapsed,
+        "rows_per_s": scored / elapsed if elapsed else 0.0,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Score a fare file in chunks with the ensemble.")
+    parser.add_argument("input", help=".parquet, .csv or .xlsx with Test_set columns")
+    parser.add_argument("--out", required=True, help="output directory for part files")
+    parser.add_argument("--chunk-rows", type=int, default=50_000)
+    parser.add_argument("--workers", type=int, help="worker processes (default: all cores)")
+    parser.add_argument("--format", choices=["parquet", "csv"], default="parquet")
+    parser.add_argument("--artifacts", default=ARTIFACTS_DIR)
+    parser.add_argument("--engine", choices=["native", "trees"], default="native",
+                        help="'trees' evaluates trees_vN.bin from tree_export.py")
+    parser.add_argument("--cache", nargs="?", const=PREDICTION_CACHE_PATH, metavar="PATH",
+                        help="reuse and share predictions through the prediction cache")
+    args = parser.parse_args()
+
+    summary = score_file(args.input, args.out, args.chunk_rows, args.workers,
+                         args.format, args.artifacts, args.engine, args.cache)
+    print(f"Scored {summary['rows']} rows ({summary['skipped_chunks']} chunks already done) "
+          f"in {summary['seconds']:.1f}s, {summary['rows_per_s']:.0f} rows/s")
@@ -0,0 +1,206 @@
+"""Micro-batching coalescer for model inference.
+
+Callers submit small frames. The batcher concatenates whatever is queued
+until ``max_batch_rows`` rows are waiting or ``max_wait_ms`` has passed
+since the first one. It then runs one ``predict_fn`` call in an executor
+and slices the result back to each caller. If a batch fails, its frames
+are retried one at a time, so only the caller whose frame is bad gets
+the error.
+"""
+import asyncio
+import time
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+
+class QueueFull(RuntimeError):
+    pass
+
+
+class BatcherStopped(RuntimeError):
+    pass
+
+
+class MicroBatcher:
+    """Coalesce concurrent ``submit`` calls into batched ``predict_fn`` calls.
+
+    ``predict_fn(frame) -> array`` must return one value per input row.
+    Backpressure: at most ``max_queue_rows`` rows may be pending. Beyond
+    that, ``submit`` waits up to ``enqueue_timeout`` seconds for room, then
+    raises ``QueueFull``. Frames lacking any of ``required_columns`` are
+    rejected in ``submit`` before they can join another caller's batch.
+    """
+
+    def __init__(self, predict_fn, max_batch_rows=512, max_wait_ms=5,
+                 max_queue_rows=8192, enqueue_timeout=1.0, executor=None,
+                 required_columns=None):
+        self.predict_fn = predict_fn
+        self.required_columns = list(required_columns or [])
+        self.max_batch_rows = max_batch_rows
+        self.max_wait = max_wait_ms / 1000
+        self.max_queue_rows = max_queue_rows
+        self.enqueue_timeout = enqueue_timeout
+        self.executor = executor
+
+        self._pending = deque()
+        self._pending_rows = 0
+        self._wakeup = None
+        self._full = None
+        self._room = None
+        self._task = None
+        self._inflight = []
+        self._stopped = False
+
+        self.batches = 0
+        self.rows = 0
+        self.rejected = 0
+        self.batch_sizes = deque(maxlen=1024)
+        self.flush_seconds = deque(maxlen=1024)
+
+    async def start(self):
+        self._stopped = False
+        self._wakeup = asyncio.Event()
+        self._full = asyncio.Event()
+        self._room = asyncio.Condition()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._stopped = True
+        # Queued and in-flight callers get an error instead of waiting forever.
+        stopped = [future for _, future in self._inflight]
+        stopped += [future for _, future in self._pending]
+        self._inflight = []
+        self._pending.clear()
+        self._pending_rows = 0
+        for future in stopped:
+            if not future.done():
+                future.set_exception(BatcherStopped("Batcher stopped"))
+
+    async def submit(self, frame):
+        """Queue ``frame`` and wait for its predictions."""
+        if self._room is None:
+            raise RuntimeError("batcher not started")
+        n = len(frame)
+        if n == 0:
+            return np.empty(0, dtype=np.float64)
+        if n > self.max_queue_rows:
+            raise ValueError(f"Frame of {n} rows exceeds max_queue_rows={self.max_queue_rows}")
+        missing = [c for c in self.required_columns if c not in frame.columns]
+        if missing:
+            raise ValueError(f"Missing raw columns: {missing}")
+
+        async with self._room:
+            try:
+                await asyncio.wait_for(
+                    self._room.wait_for(lambda: self._pending_rows + n <= self.max_queue_rows),
+                    self.enqueue_timeout,
+                )
+            except asyncio.TimeoutError:
+                self.rejected += 1
+                raise QueueFull(f"{self._pending_rows} rows already queued") from None
+            if self._stopped:
+                raise BatcherStopped("Batcher stopped")
+            future = asyncio.get_running_loop().create_future()
+            self._pending.append((frame, future))
+            self._pending_rows += n
+        if self._pending_rows >= self.max_batch_rows:
+            self._full.set()
+        self._wakeup.set()
+        return await future
+
+    async def _take_batch(self):
+        """Pop queued frames up to ``max_batch_rows`` (always at least one)."""
+        frames = []
+        rows = 0
+        while self._pending and (not frames or rows + len(self._pending[0][0]) <= self.max_batch_rows):
+            frame, future = self._pending.popleft()
+            frames.append((frame, future))
+            rows += len(frame)
+        async with self._room:
+            self._pending_rows -= rows
+            self._room.notify_all()
+        if self._pending_rows < self.max_batch_rows:
+            self._full.clear()
+        return frames, rows
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            if not self._pending:
+                continue
+
+            # Give concurrent callers a few ms to join, unless the batch is already full.
+            try:
+                await asyncio.wait_for(self._full.wait(), self.max_wait)
+            except asyncio.TimeoutError:
+                pass
+
+            frames, rows = await self._take_batch()
+            if self._pending:
+                self._wakeup.set()
+
+            started = time.perf_counter()
+            self._inflight = frames
+            try:
+                batch = pd.concat([f for f, _ in frames], ignore_index=True) if len(frames) > 1 else frames[0][0]
+                preds = await loop.run_in_executor(self.executor, self.predict_fn, batch)
+            except Exception as exc:
+                if len(frames) == 1:
+                    self._resolve(frames[0][1], exception=exc)
+                else:
+                    await self._run_one_by_one(loop, frames)
+            else:
+                offset = 0
+                for frame, future in frames:
+                    self._resolve(future, np.asarray(preds[offset:offset + len(frame)]))
+                    offset += len(frame)
+            self._inflight = []
+
+            self.batches += 1
+            self.rows += rows
+            self.batch_sizes.append(rows)
+            self.flush_seconds.append(time.perf_counter() - started)
+
+    async def _run_one_by_one(self, loop, frames):
+        """Retry a failed batch per caller, so one bad frame fails only its own request."""
+        for frame, future in frames:
+            try:
+                preds = await loop.run_in_executor(self.executor, self.predict_fn, frame)
+            except Exception as exc:
+                self._resolve(future, exception=exc)
+            else:
+                self._resolve(future, np.asarray(preds))
+
+    @staticmethod
+    def _resolve(future, result=None, exception=None):
+        if future.done():
+            return
+        if exception is not None:
+            future.set_exception(exception)
+        else:
+            future.set_result(result)
+
+    def stats(self):
+        sizes = np.asarray(self.batch_sizes) if self.batch_sizes else np.zeros(1)
+        flush = np.asarray(self.flush_seconds) if self.flush_seconds else np.zeros(1)
+        return {
+            "queue_rows": self._pending_rows,
+            "queue_requests": len(self._pending),
+            "batches": self.batches,
+            "rows": self.rows,
+            "rejected": self.rejected,
+            "batch_size_mean": float(sizes.mean()),
+            "batch_size_p95": float(np.percentile(sizes, 95)),
+            "flush_ms_p95": float(np.percentile(flush, 95) * 1000),
+        }
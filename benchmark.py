@@ -0,0 +1,350 @@
+"""Headless benchmarks for the search, enrichment, rendering and inference paths.
+
+    python benchmark.py --sizes 6 100 1000 --out bench.json
+    python benchmark.py --compare bench.json --threshold 0.2
+
+Each case runs at several table sizes with synthetic airports and
+airlines. The report gives p50/p95/p99 latency, throughput and peak
+traced memory. With --compare, the exit status is 1 when any case's p50
+regresses by more than the threshold.
+"""
+import argparse
+import gc
+import json
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+
+from airports import AirportRegistry
+from fare_engine import AIRLINES, build_airline_table, price_batch
+from flight_results import FlightResults
+
+
+TEST_SET_ROWS = 2671
+
+
+# ============================================
+# SYNTHETIC TABLES
+# ============================================
+def synthetic_registry(n, seed=0):
+    rng = np.random.default_rng(seed)
+    codes = [f"{chr(65 + i // 676 % 26)}{chr(65 + i // 26 % 26)}{chr(65 + i % 26)}" for i in range(n)]
+    return AirportRegistry(codes, [f"City {c}" for c in codes],
+                           rng.uniform(8, 34, n), rng.uniform(68, 97, n))
+
+
+def synthetic_airlines(n, seed=0):
+    rng = np.random.default_rng(seed)
+    base = AIRLINES * (n // len(AIRLINES) + 1)
+    return build_airline_table([
+        {**a, "name": f"{a['name']} {i}", "multiplier": float(rng.uniform(0.8, 1.5))}
+        for i, a in enumerate(base[:n])
+    ])
+
+
+def synthetic_raw_rows(n, seed=0):
+    """Test_set-shaped raw rows drawn from realistic value pools."""
+    import pandas as pd
+
+    rng = np.random.default_rng(seed)
+    pick = lambda values: rng.choice(np.array(values, dtype=object), n)  # noqa: E731
+    return pd.DataFrame({
+        "Airline": pick(["IndiGo", "Air India", "Jet Airways", "SpiceJet", "Vistara", "GoAir"]),
+        "Date_of_Journey": pick([f"{d}/{m:02d}/2019" for d in range(1, 29) for m in (3, 4, 5, 6)]),
+        "Source": pick(["Delhi", "Kolkata", "Banglore", "Mumbai", "Chennai"]),
+        "Destination": pick(["Cochin", "Banglore", "Delhi", "New Delhi", "Hyderabad", "Kolkata"]),
+        "Route": pick(["DEL → BOM → COK", "CCU → BLR", "BLR → DEL"]),
+        "Dep_Time": pick([f"{h:02d}:{m:02d}" for h in range(24) for m in (0, 15, 30, 45)]),
+        "Arrival_Time": pick(["04:25 07 Jun", "10:20", "19:00 22 May", "01:10"]),
+        "Duration": pick(["2h 50m", "7h 25m", "19h", "10h 55m", "4h"]),
+        "Total_Stops": pick(["non-stop", "1 stop", "2 stops"]),
+        "Additional_Info": pick(["No info", "In-flight meal not included"]),
+    })
+
+
+# ============================================
+# MEASUREMENT
+# ============================================
+def measure(fn, repeat, warmup=2, items=1):
+    """Time ``fn`` ``repeat`` times; peak memory is traced on one extra call."""
+    for _ in range(warmup):
+        fn()
+    gc.collect()
+    samples = np.empty(repeat)
+    for i in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples[i] = time.perf_counter() - start
+
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    p50, p95, p99 = np.percentile(samples, [50, 95, 99]) * 1000
+    return {
+        "p50_ms": float(p50),
+        "p95_ms": float(p95),
+        "p99_ms": float(p99),
+        "throughput_per_s": float(items * repeat / samples.sum()),
+        "items_per_call": items,
+        "peak_mem_kb": peak / 1024,
+        "repeat": repeat,
+    }
+
+
+# ============================================
+# CASES
+# ============================================
+def case_distance_matrix(n):
+    def run():
+        synthetic_registry(n).matrix
+    return run, n * n
+
+
+def case_search(n):
+    registry, airlines = synthetic_registry(n), synthetic_airlines(n)
+    registry.matrix
+    rng = np.random.default_rng(0)
+
+    def run():
+        batch = price_batch([0], [n - 1], ["Economy"], [1], rng=rng,
+                            registry=registry, airlines=airlines)
+        FlightResults.from_batch(batch, 0, 0, n - 1, airlines)
+    return run, n
+
+
+def case_search_batch(n):
+    registry, airlines = synthetic_registry(n), synthetic_airlines(min(n, 100))
+    registry.matrix
+    rng = np.random.default_rng(0)
+    src = rng.integers(0, n, 1000)
+    dst = (src + 1 + rng.integers(0, n - 1, 1000)) % n
+
+    def run():
+        price_batch(src, dst, rng.integers(0, 3, 1000), rng.integers(1, 10, 1000),
+                    rng=rng, registry=registry, airlines=airlines)
+    return run, 1000
+
+
+def case_enrichment(n):
+    registry, airlines = synthetic_registry(n), synthetic_airlines(n)
+    batch = price_batch([0], [n - 1], ["Economy"], [1], registry=registry, airlines=airlines)
+    flights = FlightResults.from_batch(batch, 0, 0, n - 1, airlines)
+
+    def run():
+        flights.price_str()
+        flights.duration_str()
+        flights.stops_str()
+        flights.route_str()
+        flights.record(flights.cheapest())
+        flights.record(flights.fastest())
+        flights.top_k("price", 10)
+    return run, n
+
+
+def case_charts(n):
+    from charts import FigureCache
+
+    airlines = synthetic_airlines(n)
+    registry = synthetic_registry(max(n, 2))
+    rng = np.random.default_rng(0)
+    figures = FigureCache()
+    counter = iter(range(10 ** 9))
+
+    def run():
+        batch = price_batch([0], [1], ["Economy"], [1], rng=rng, registry=registry, airlines=airlines)
+        flights = FlightResults.from_batch(batch, 0, 0, 1, airlines)
+        key = next(counter)
+        figures.bar("price", key, "Price", "Price (₹)", flights.names, flights.price,
+                    np.where(flights.price == flights.price.min(), "#10b981", "#667eea"),
+                    flights.price_str())
+        figures.bar("duration", key, "Duration", "Duration (minutes)", flights.names,
+                    flights.duration, np.full(n, "#764ba2"), flights.duration_str())
+    return run, n
+
+
+def case_route_map(n):
+    from route_geometry import RouteGeometry
+
+    registry = synthetic_registry(n)
+    routes = [(i, (i * 7 + 1) % n) for i in range(min(n, 500))]
+
+    def run():
+        RouteGeometry(registry).arcs(routes)
+    return run, len(routes)
+
+
+def case_itinerary(n):
+    from itinerary import RouteGraph, build_schedule
+
+    registry, airlines = synthetic_registry(n), synthetic_airlines(6)
+    # Coverage shrinks with n so the schedule stays near 30k legs.
+    coverage = min(0.6, 30000 / (n * n * len(airlines["multiplier"]) * 4))
+    graph = RouteGraph(build_schedule(registry, airlines, coverage=coverage), registry, airlines)
+    queries = iter(range(10 ** 9))
+
+    def run():
+        q = next(queries) % n
+        graph.k_best(q, (q + n // 2) % n, k=5, objective="duration")
+    return run, 1
+
+
+def case_fare_calendar(n):
+    from fare_calendar import price_calendars
+
+    registry, airlines = synthetic_registry(n), synthetic_airlines(6)
+    registry.matrix
+    routes = [(i, (i * 7 + 1) % n) for i in range(min(n, 500)) if i != (i * 7 + 1) % n]
+    dates = np.arange(np.datetime64("2026-01-01"), np.datetime64("2026-04-01"))
+
+    def run():
+        price_calendars(routes, dates, workers=1, registry=registry, airlines=airlines)
+    return run, len(routes) * len(dates)
+
+
+def case_repricing(n):
+    from datetime import timedelta
+
+    from repricing import FareTable
+
+    # The table holds every ordered pair, so airports are capped to keep it near 1M rows.
+    registry, airlines = synthetic_registry(min(n, 30)), synthetic_airlines(6)
+    start = datetime(2026, 1, 1, 9, 0)
+    table = FareTable(start.date(), now=start, registry=registry, airlines=airlines)
+    rng = np.random.default_rng(0)
+    ticks = iter(range(1, 10 ** 9))
+
+    def run():
+        # One booking burst and a 15-minute clock tick, as events arrive.
+        table.book(rng.integers(len(table) // 4, len(table) // 2, 10))
+        table.advance(start + timedelta(minutes=15 * next(ticks)))
+    return run, 1
+
+
+def case_features(n):
+    from features import build_features
+
+    raw = synthetic_raw_rows(TEST_SET_ROWS)
+
+    def run():
+        build_features(raw)
+    return run, TEST_SET_ROWS
+
+
+def case_inference(n):
+    from features import build_features
+    from freq_index import load_frequency_index
+    from predictor import load_predictor
+
+    model = load_predictor()
+    frame = build_features(synthetic_raw_rows(TEST_SET_ROWS), load_frequency_index())
+
+    def run():
+        model.predict_batch(frame)
+    return run, TEST_SET_ROWS
+
+
+def case_startup(n):
+    """Fresh interpreter importing the modules app.py needs before its first paint."""
+    modules = "airports, charts, fare_calendar, fare_engine, itinerary, perf, route_geometry, " \
+              "search_cache, ui_templates"
+
+    def run():
+        subprocess.run([sys.executable, "-c", f"import {modules}"], check=True)
+    return run, 1
+
+
+# Cases marked False do not depend on the table size and run once.
+CASES = {
+    "distance_matrix": (case_distance_matrix, True),
+    "search": (case_search, True),
+    "search_batch": (case_search_batch, True),
+    "enrichment": (case_enrichment, True),
+    "charts": (case_charts, True),
+    "route_map": (case_route_map, True),
+    "itinerary": (case_itinerary, True),
+    "fare_calendar": (case_fare_calendar, True),
+    "repricing": (case_repricing, True),
+    "features": (case_features, False),
+    "inference": (case_inference, False),
+    "startup": (case_startup, False),
+}
+
+
+def run_benchmarks(sizes, repeat, only=None):
+    results, skipped = {}, {}
+    for name, (factory, sized) in CASES.items():
+        if only and name not in only:
+            continue
+        for n in (sizes if sized else [sizes[0]]):
+            label = f"{name}@{n}" if sized else name
+            try:
+                fn, items = factory(n)
+            except (ImportError, FileNotFoundError) as exc:
+                skipped[label] = str(exc)
+                continue
+            results[label] = measure(fn, repeat, items=items)
+            print(f"{label:24s} p50 {results[label]['p50_ms']:9.3f} ms  "
+                  f"p99 {results[label]['p99_ms']:9.3f} ms  "
+                  f"{results[label]['throughput_per_s']:14.0f} items/s  "
+                  f"peak {results[label]['peak_mem_kb']:9.0f} KiB")
+    return {
+        "meta": {
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "python": sys.version.split()[0],
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "sizes": sizes,
+            "repeat": repeat,
+        },
+        "results": results,
+        "skipped": skipped,
+    }
+
+
+def compare(current, baseline, threshold):
+    """Names of cases whose p50 grew by more than ``threshold`` (a fraction)."""
+    regressions = []
+    for label, new in current["results"].items():
+        old = baseline["results"].get(label)
+        if old is None:
+            continue
+        ratio = new["p50_ms"] / old["p50_ms"] if old["p50_ms"] else 1.0
+        flag = "REGRESSION" if ratio > 1 + threshold else "ok"
+        print(f"{label:24s} {old['p50_ms']:9.3f} -> {new['p50_ms']:9.3f} ms  x{ratio:5.2f}  {flag}")
+        if ratio > 1 + threshold:
+            regressions.append(label)
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the fare search and pricing hot paths.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[6, 100, 1000])
+    parser.add_argument("--repeat", type=int, default=30)
+    parser.add_argument("--only", nargs="+", choices=sorted(CASES))
+    parser.add_argument("--out", help="write results as JSON")
+    parser.add_argument("--compare", help="baseline JSON from an earlier run")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="allowed p50 slowdown vs baseline, as a fraction")
+    args = parser.parse_args()
+
+    report = run_benchmarks(args.sizes, args.repeat, args.only)
+    for label, reason in report["skipped"].items():
+        print(f"{label:24s} skipped: {reason}")
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as fh:
+            json.dump(report, fh, indent=2)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as fh:
+            regressions = compare(report, json.load(fh), args.threshold)
+        if regressions:
+            print(f"{len(regressions)} regression(s): {', '.join(regressions)}")
+            sys.exit(1)
@@ -0,0 +1,96 @@
+"""Calendar features of journey dates: weekday, weekend, season and holiday.
+
+NumPy only, so fare pricing can use them without importing pandas.
+"""
+import numpy as np
+
+
+# Month -> season: 0 winter (Dec-Feb), 1 summer (Mar-May), 2 monsoon (Jun-Sep),
+# 3 post-monsoon (Oct-Nov). Index 0 is unused.
+SEASON_BY_MONTH = np.array([-1, 0, 0, 1, 1, 1, 2, 2, 2, 2, 3, 3, 0], dtype=np.int8)
+
+# National holidays on a fixed calendar day, as (month, day).
+FIXED_HOLIDAYS = [(1, 26), (8, 15), (10, 2), (12, 25)]
+
+# Movable festival holidays: the training year plus the years users can
+# search. Extend before the last listed year runs out. Islamic holidays
+# follow the gazetted date and may move by a day with the moon sighting.
+HOLIDAY_DATES = np.array([
+    "2019-03-04", "2019-03-21", "2019-04-13", "2019-04-17", "2019-04-19",
+    "2019-05-18", "2019-06-05", "2019-08-12", "2019-09-10", "2019-10-08",
+    "2019-10-27", "2019-11-12",
+    "2025-02-26", "2025-03-14", "2025-03-31", "2025-04-10", "2025-04-18",
+    "2025-05-12", "2025-06-07", "2025-07-06", "2025-08-16", "2025-09-05",
+    "2025-10-02", "2025-10-20", "2025-11-05",
+    "2026-02-15", "2026-03-04", "2026-03-21", "2026-03-26", "2026-03-31",
+    "2026-04-03", "2026-05-01", "2026-05-27", "2026-06-26", "2026-08-26",
+    "2026-09-04", "2026-10-20", "2026-11-08", "2026-11-24",
+    "2027-03-06", "2027-03-10", "2027-03-22", "2027-03-26", "2027-04-15",
+    "2027-04-19", "2027-05-17", "2027-05-20", "2027-06-15", "2027-08-25",
+    "2027-10-09", "2027-10-29", "2027-11-14",
+], dtype="datetime64[D]")
+
+# Last day HOLIDAY_DATES covers; later dates only get the fixed holidays.
+HOLIDAYS_COVER_UNTIL = np.datetime64("2027-12-31")
+
+
+def date_features(dates):
+    """Calendar features for a datetime64[D] array; used by features and fare calendars."""
+    dates = np.asarray(dates, dtype="datetime64[D]")
+    valid = ~np.isnat(dates)
+    years = dates.astype("datetime64[Y]")
+    months = dates.astype("datetime64[M]")
+
+    year = years.astype(np.int64) + 1970
+    month = (months - years).astype(np.int64) + 1
+    day = (dates - months).astype(np.int64) + 1
+    # 1970-01-01 was a Thursday; shift so Monday == 0 like pandas.
+    weekday = (dates.astype(np.int64) + 3) % 7
+
+    month_day = month * 100 + day
+    fixed = np.isin(month_day, [m * 100 + d for m, d in FIXED_HOLIDAYS])
+    holiday = fixed | np.isin(dates, HOLIDAY_DATES)
+
+    out = {
+        "journey_year": year,
+        "journey_month": month,
+        "journey_day": day,
+        "journey_weekday": weekday,
+        "journey_is_weekend": (weekday >= 5).astype(np.int8),
+        "travel_season_num": SEASON_BY_MONTH[np.where(valid, month, 0)],
+        "is_holiday": holiday.astype(np.int8),
+    }
+    if not valid.all():
+        out = {k: np.where(valid, v, np.nan) for k, v in out.items()}
+    return out
+
+
+def fit_date_multipliers(dates, prices, groups):
+    """Season, weekend and holiday price multipliers fitted on observed fares.
+
+    ``groups`` are integer ids of comparable fares (e.g. airline, route and
+    stops). Log prices are centred within each group, then regressed on
+    season, weekend and holiday indicators. Seasons absent from ``dates``
+    get 1.0.
+    """
+    dates = np.asarray(dates, dtype="datetime64[D]")
+    log_price = np.log(np.asarray(prices, dtype=np.float64))
+    groups = np.asarray(groups, dtype=np.int64)
+    centred = log_price - (np.bincount(groups, log_price) / np.bincount(groups))[groups]
+
+    cal = date_features(dates)
+    season = cal["travel_season_num"].astype(np.int64)
+    seen = np.flatnonzero(np.bincount(season, minlength=4))
+    X = np.column_stack([season[:, None] == seen[None, :],
+                         cal["journey_is_weekend"], cal["is_holiday"]]).astype(np.float64)
+    coef = np.linalg.lstsq(X, centred, rcond=None)[0]
+
+    season_mult = np.ones(4)
+    # Scale seasons so the fare-weighted average season is 1.0.
+    season_coef = coef[:len(seen)] - np.average(coef[:len(seen)], weights=np.bincount(season)[seen])
+    season_mult[seen] = np.exp(season_coef)
+    return {
+        "season": season_mult,
+        "weekend": float(np.exp(coef[len(seen)])),
+        "holiday": float(np.exp(coef[len(seen) + 1])),
+    }
@@ -0,0 +1,139 @@
+"""Plotly figures for the result sections.
+
+plotly is imported on first use, so pages that render no chart never pay
+for it. ``prewarm`` builds each figure once to load plotly's validators
+ahead of the first real render.
+"""
+import threading
+
+
+_IMPORT_LOCK = threading.Lock()
+
+
+def _go():
+    # plotly's validators find pandas through sys.modules and can pick up a
+    # half-imported module while another thread (the prewarm) is importing
+    # it, so pandas is fully imported first, one thread at a time.
+    with _IMPORT_LOCK:
+        import pandas  # noqa: F401
+        import plotly.graph_objects as go
+    return go
+
+
+def comparison_figure(title, yaxis_title):
+    go = _go()
+    fig = go.Figure(go.Bar(textposition='outside'))
+    fig.update_layout(
+        title=title,
+        yaxis_title=yaxis_title,
+        height=400,
+        showlegend=False,
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+    )
+    return fig
+
+
+def route_map_figure():
+    go = _go()
+    fig = go.Figure()
+    
+    # Flight path
+    fig.add_trace(go.Scattermapbox(
+        mode='lines',
+        line=dict(width=4, color='#667eea'),
+        hoverinfo='skip'
+    ))
+    
+    # Cities
+    fig.add_trace(go.Scattermapbox(
+        mode='markers+text',
+        marker=dict(size=20, color=['#10b981', '#ef4444']),
+        textposition="top center",
+        textfont=dict(size=14, color='black', family='Arial Black')
+    ))
+    
+    fig.update_layout(
+        mapbox=dict(style="open-street-map"),
+        height=500,
+        margin=dict(l=0, r=0, t=0, b=0),
+        showlegend=False
+    )
+    return fig
+
+
+def calendar_heatmap_figure():
+    go = _go()
+    fig = go.Figure(go.Heatmap(
+        x=["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"],
+        colorscale=[[0, '#10b981'], [0.5, '#fef3c7'], [1, '#ef4444']],
+        hovertemplate="%{text}<br>₹%{z:,.0f}<extra></extra>",
+        xgap=3,
+        ygap=3,
+    ))
+    fig.update_layout(
+        height=360,
+        margin=dict(l=0, r=0, t=10, b=0),
+        yaxis=dict(autorange='reversed', type='category'),
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+    )
+    return fig
+
+
+def prewarm():
+    """Build and fill each figure type once, off the request path."""
+    comparison_figure("", "").data[0].update(x=["a"], y=[1], marker_color=["#667eea"], text=["1"])
+    route_map_figure().data[0].update(lat=[0, 1], lon=[0, 1])
+    calendar_heatmap_figure().data[0].update(z=[[1.0]], y=["w"], text=[["d"]])
+
+
+class FigureCache:
+    """Per-session figures that are built once and only get new trace data.
+
+    ``key`` identifies the data a figure currently shows; when it matches
+    the previous render the figure is returned untouched.
+    """
+
+    def __init__(self):
+        self._figures = {}
+        self._keys = {}
+        self.builds = 0
+        self.updates = 0
+
+    def get(self, name, build):
+        fig = self._figures.get(name)
+        if fig is None:
+            fig = self._figures[name] = build()
+            self.builds += 1
+        return fig
+
+    def bar(self, name, key, title, yaxis_title, x, y, colors, text):
+        fig = self.get(name, lambda: comparison_figure(title, yaxis_title))
+        if self._keys.get(name) != key:
+            fig.data[0].update(x=x, y=y, marker_color=colors, text=text)
+            self._keys[name] = key
+            self.updates += 1
+        return fig
+
+    def route_map(self, key, path_lat, path_lon, cities_lat, cities_lon, labels, zoom=4.5):
+        fig = self.get("route_map", route_map_figure)
+        if self._keys.get("route_map") != key:
+            fig.data[0].update(lat=path_lat, lon=path_lon)
+            fig.data[1].update(lat=cities_lat, lon=cities_lon, text=labels)
+            fig.update_layout(mapbox=dict(
+                center=dict(lat=(cities_lat[0] + cities_lat[-1]) / 2,
+                            lon=(cities_lon[0] + cities_lon[-1]) / 2),
+                zoom=zoom,
+            ))
+            self._keys["route_map"] = key
+            self.updates += 1
+        return fig
+
+    def heatmap(self, key, z, y, text):
+        fig = self.get("calendar", calendar_heatmap_figure)
+        if self._keys.get("calendar") != key:
+            fig.data[0].update(z=z, y=y, text=text)
+            self._keys["calendar"] = key
+            self.updates += 1
+        return fig
@@ -0,0 +1,157 @@
+"""Typed Parquet cache for the Dataset spreadsheets.
+
+Each workbook is parsed once into ``Dataset/.cache/<name>-<path hash>.parquet``.
+Later loads memory-map the Parquet file and read only the requested columns.
+"""
+import hashlib
+import json
+import os
+
+import pandas as pd
+
+
+DATASET_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Dataset")
+CACHE_DIR = os.path.join(DATASET_DIR, ".cache")
+DATASETS = {
+    "train": "Data_Train.xlsx",
+    "test": "Test_set.xlsx",
+}
+
+# Bump when the conversion below changes so stale caches are rebuilt.
+SCHEMA_VERSION = 1
+
+# Low-cardinality text columns, stored dictionary-encoded. Date_of_Journey is
+# the only column parsed here. Dep_Time, Arrival_Time and Duration are left as
+# their source text on purpose: Arrival_Time may carry a next-day date
+# ("04:25 07 Jun"), and features.py parses all three from the same strings the
+# API and batch_score receive, so training and serving share one parser. They
+# repeat heavily, so that parser runs once per distinct value.
+CATEGORICAL_COLUMNS = [
+    "Airline", "Source", "Destination", "Route", "Total_Stops", "Additional_Info",
+    "Dep_Time", "Arrival_Time", "Duration",
+]
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow  # noqa: F401
+        import pyarrow.parquet as pq
+    except ImportError as exc:
+        raise ImportError("The dataset cache needs pyarrow (pip install pyarrow)") from exc
+    return pq
+
+
+def _sha256(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _source_path(name):
+    if name in DATASETS:
+        return os.path.join(DATASET_DIR, DATASETS[name])
+    return name
+
+
+def cache_path(source):
+    """Cache file for ``source``; workbooks with the same name in other directories get their own."""
+    stem = os.path.splitext(os.path.basename(source))[0]
+    key = hashlib.sha256(os.path.abspath(source).encode("utf-8")).hexdigest()[:12]
+    return os.path.join(CACHE_DIR, f"{stem}-{key}.parquet")
+
+
+# ============================================
+# CONVERSION
+# ============================================
+def read_workbook(source):
+    """Parse a workbook into typed columns (slow path, used to fill the cache)."""
+    frame = pd.read_excel(source, dtype={"Date_of_Journey": str})
+    frame["Date_of_Journey"] = pd.to_datetime(frame["Date_of_Journey"], format="%d/%m/%Y")
+    for col in CATEGORICAL_COLUMNS:
+        if col in frame.columns:
+            frame[col] = frame[col].astype("category")
+    if "Price" in frame.columns:
+        frame["Price"] = frame["Price"].astype("int32")
+    return frame
+
+
+def _stamp(source):
+    stat = os.stat(source)
+    return {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+
+
+def _is_fresh(source, parquet, sidecar):
+    if not (os.path.exists(parquet) and os.path.exists(sidecar)):
+        return False
+    with open(sidecar, encoding="utf-8") as fh:
+        meta = json.load(fh)
+    if meta.get("schema_version") != SCHEMA_VERSION:
+        return False
+
+    stamp = _stamp(source)
+    if stamp["mtime_ns"] == meta.get("mtime_ns") and stamp["size"] == meta.get("size"):
+        return True
+    # Touched but possibly unchanged (checkout, copy): only then pay for a hash.
+    if _sha256(source) != meta.get("sha256"):
+        return False
+    meta.update(stamp)
+    _write_json(sidecar, meta)
+    return True
+
+
+def _write_json(path, payload):
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump(payload, fh, indent=2)
+    os.replace(tmp, path)
+
+
+def build_cache(source, force=False):
+    """Convert ``source`` to Parquet if the cache is missing or stale; return its path."""
+    pq = _require_pyarrow()
+    import pyarrow as pa
+
+    parquet = cache_path(source)
+    sidecar = f"{parquet}.json"
+    if not force and _is_fresh(source, parquet, sidecar):
+        return parquet
+
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    table = pa.Table.from_pandas(read_workbook(source), preserve_index=False)
+    tmp = f"{parquet}.tmp"
+    pq.write_table(table, tmp)
+    os.replace(tmp, parquet)
+    _write_json(sidecar, {
+        "schema_version": SCHEMA_VERSION,
+        "source": os.path.basename(source),
+        "sha256": _sha256(source),
+        "rows": table.num_rows,
+        **_stamp(source),
+    })
+    return parquet
+
+
+# ============================================
+# LOADING
+# ============================================
+def load_dataset(name, columns=None, as_arrow=False):
+    """Load ``name`` ('train', 'test' or a workbook path) through the Parquet cache.
+
+    ``columns`` restricts the read to those columns. With ``as_arrow`` the
+    memory-mapped Arrow table is returned without conversion to pandas.
+    """
+    pq = _require_pyarrow()
+    parquet = build_cache(_source_path(name))
+    table = pq.read_table(parquet, columns=columns, memory_map=True)
+    return table if as_arrow else table.to_pandas()
+
+
+def iter_batches(name, batch_size, columns=None):
+    """Stream ``name`` as pandas frames of at most ``batch_size`` rows."""
+    pq = _require_pyarrow()
+    parquet = build_cache(_source_path(name))
+    reader = pq.ParquetFile(parquet, memory_map=True)
+    for batch in reader.iter_batches(batch_size=batch_size, columns=columns):
+        yield batch.to_pandas()
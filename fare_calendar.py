@@ -0,0 +1,128 @@
+"""Fare calendars: every airline priced for every day of a date window.
+
+A calendar for one route is a single ``price_batch`` call with one query
+row per day; the date uplift comes from the same calendar features the
+model uses (weekday, weekend, season, holiday). Given a ``FareTable``, the
+cells also carry its demand multipliers, so they match what a search for
+that day quotes. Many routes at once (``price_calendars``) are base fares
+without demand pricing and can be split across a process pool.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+
+import numpy as np
+
+from airports import REGISTRY
+from fare_engine import AIRLINE_TABLE, price_batch
+from calendar_features import date_features
+
+
+WINDOWS = {"±30 days": (30, 30), "90 days": (0, 89)}
+
+# Below this many (route, day) rows the pool's start-up and pickling cost
+# more than pricing in-process.
+POOL_MIN_ROWS = 200_000
+
+
+def calendar_dates(travel_date, days_before=30, days_after=30, earliest=None, latest=None):
+    """Consecutive ``datetime64[D]`` days around ``travel_date`` within ``earliest``..``latest``."""
+    start = travel_date - timedelta(days=days_before)
+    if earliest is not None:
+        start = max(start, earliest)
+    stop = travel_date + timedelta(days=days_after + 1)
+    if latest is not None:
+        stop = min(stop, latest + timedelta(days=1))
+    return np.arange(np.datetime64(start, "D"), np.datetime64(stop, "D"))
+
+
+def price_calendar(source, dest, dates, class_type, passengers,
+                   registry=REGISTRY, airlines=AIRLINE_TABLE, fare_table=None):
+    """Per-day fares for one route, demand-priced through ``fare_table`` if given.
+
+    Returns ``dates``, ``price`` with shape (days, n_airlines), the cheapest
+    fare and airline per day, and the calendar features for each day.
+    """
+    dates = np.asarray(dates, dtype="datetime64[D]")
+    # Durations and seats are not shown on the calendar, so the draw is fixed.
+    batch = price_batch([source], [dest], [class_type], [passengers],
+                        rng=np.random.default_rng(0), registry=registry,
+                        airlines=airlines, dates=dates)
+    price = batch["price"]
+    if fare_table is not None:
+        factor = fare_table.demand_multipliers(source, dest, dates[:, None])
+        price = np.rint(price * factor).astype(np.int64)
+    cheapest = price.argmin(axis=1)
+    return {
+        "dates": dates,
+        "price": price,
+        "min_price": price[np.arange(len(dates)), cheapest],
+        "cheapest_airline": airlines["names"][cheapest],
+        **date_features(dates),
+    }
+
+
+_WORKER_TABLES = {}
+
+
+def _init_worker(registry, airlines):
+    # Sent once per worker process rather than with every chunk.
+    _WORKER_TABLES["registry"], _WORKER_TABLES["airlines"] = registry, airlines
+
+
+def _price_routes(sources, dests, dates, class_type, passengers, registry=None, airlines=None):
+    """Cheapest fare per (route, day) as an (R, days) array."""
+    if registry is None:
+        registry, airlines = _WORKER_TABLES["registry"], _WORKER_TABLES["airlines"]
+    n_days = len(dates)
+    batch = price_batch(np.repeat(sources, n_days), np.repeat(dests, n_days),
+                        [class_type], [passengers], rng=np.random.default_rng(0),
+                        registry=registry, airlines=airlines,
+                        dates=np.tile(dates, len(sources)))
+    return batch["price"].min(axis=1).reshape(len(sources), n_days)
+
+
+def price_calendars(routes, dates, class_type="Economy", passengers=1, workers=None,
+                    registry=REGISTRY, airlines=AIRLINE_TABLE):
+    """Cheapest base fare per day for many routes: an (R, days) int64 array.
+
+    ``routes`` is a sequence of (source, dest). Small jobs run in-process;
+    above ``POOL_MIN_ROWS`` rows the routes are split into one chunk per
+    worker process (default: all cores).
+    """
+    dates = np.asarray(dates, dtype="datetime64[D]")
+    pairs = registry.indices(np.asarray(routes).reshape(-1)).reshape(-1, 2)
+    workers = min(workers or os.cpu_count() or 1, len(pairs))
+    if workers <= 1 or len(pairs) * len(dates) < POOL_MIN_ROWS:
+        return _price_routes(pairs[:, 0], pairs[:, 1], dates, class_type, passengers,
+                             registry, airlines)
+
+    registry.matrix  # build once here so workers receive it instead of rebuilding
+    chunks = np.array_split(pairs, workers)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(registry, airlines)) as pool:
+        parts = pool.map(_price_routes, [c[:, 0] for c in chunks], [c[:, 1] for c in chunks],
+                         [dates] * workers, [class_type] * workers, [passengers] * workers)
+        return np.concatenate(list(parts))
+
+
+def calendar_key(source, dest, dates, class_type, passengers, generation=0):
+    return ("calendar", source, dest, str(dates[0]), len(dates), class_type, int(passengers),
+            generation)
+
+
+def calendar_grid(calendar):
+    """Cheapest fares laid out as weeks x weekdays (Monday first) for a heatmap.
+
+    Returns (z, day_labels, week_starts); days outside the window are NaN.
+    """
+    dates = calendar["dates"]
+    weekday = calendar["journey_weekday"]
+    slot = np.arange(len(dates)) + weekday[0]
+    n_weeks = slot[-1] // 7 + 1
+    z = np.full((n_weeks, 7), np.nan)
+    z.flat[slot] = calendar["min_price"]
+    labels = np.full((n_weeks, 7), "", dtype=object)
+    labels.flat[slot] = np.datetime_as_string(dates, unit="D")
+    week_starts = dates[0] - weekday[0] + np.arange(n_weeks) * 7
+    return z, labels, np.datetime_as_string(week_starts, unit="D")
@@ -0,0 +1,182 @@
+import numpy as np
+
+from airports import CITIES, REGISTRY
+from calendar_features import date_features
+from flight_results import FlightResults
+
+
+# ============================================
+# DATA
+# ============================================
+AIRLINES = [
+    {"name": "IndiGo", "code": "6E", "logo": "🔵", "multiplier": 1.0, "rating": 4.2},
+    {"name": "Air India", "code": "AI", "logo": "🔴", "multiplier": 1.2, "rating": 4.0},
+    {"name": "Vistara", "code": "UK", "logo": "🟣", "multiplier": 1.4, "rating": 4.5},
+    {"name": "SpiceJet", "code": "SG", "logo": "🟡", "multiplier": 0.9, "rating": 3.8},
+    {"name": "GoAir", "code": "G8", "logo": "🟢", "multiplier": 0.85, "rating": 3.9},
+    {"name": "AirAsia", "code": "I5", "logo": "🔴", "multiplier": 0.88, "rating": 4.1},
+]
+
+
+CLASS_TYPES = ["Economy", "Premium Economy", "Business"]
+CLASS_MULTIPLIERS = np.array([1.0, 1.5, 2.5])
+
+FARE_PER_KM = 2.5
+CRUISE_SPEED_KMH = 770
+GROUND_TIME_MIN = 30
+DEP_MINUTE_SLOTS = np.array([0, 15, 30, 45])
+# Flight numbers per route and airline: slot 0 for search results, the rest
+# for the connection schedule's daily waves; see flight_numbers.
+DAILY_SLOTS = 4
+# Seats on sale per flight; see seat_capacity.
+MIN_SEATS, MAX_SEATS = 5, 25
+
+# Date multipliers fitted with calendar_features.fit_date_multipliers on
+# Data_Train.xlsx (fares grouped by airline, route and stops);
+# tests/test_calendar_features.py checks they still match. Seasons are
+# indexed like SEASON_BY_MONTH: winter, summer, monsoon, post-monsoon. The
+# data covers Mar-Jun 2019 only, so winter and post-monsoon stay at 1.0.
+SEASON_MULTIPLIERS = np.array([1.000, 1.016, 0.967, 1.000])
+WEEKEND_MULTIPLIER = 1.075
+HOLIDAY_MULTIPLIER = 0.886
+
+
+# ============================================
+# LOOKUP TABLES
+# ============================================
+def build_airline_table(airlines):
+    idx = np.arange(len(airlines))
+    dep_hour = 6 + idx * 2
+    return {
+        "names": np.array([a["name"] for a in airlines]),
+        "logos": np.array([a["logo"] for a in airlines]),
+        "ratings": np.array([a["rating"] for a in airlines], dtype=np.float64),
+        "multiplier": np.array([a["multiplier"] for a in airlines], dtype=np.float64),
+        "prefix": np.array([a["code"] for a in airlines]),
+        # Schedule slots only depend on the airline position, so they are fixed per table.
+        "departure": (dep_hour * 60 + DEP_MINUTE_SLOTS[idx % 4]) % 1440,
+        "stops": idx % 3,
+    }
+
+
+AIRLINE_TABLE = build_airline_table(AIRLINES)
+CLASS_INDEX = {c: i for i, c in enumerate(CLASS_TYPES)}
+
+
+def flight_numbers(sources, dests, n_airports, slot=0):
+    """Flight number per (source, dest, daily slot) index; with the airline prefix it is unique.
+
+    Slot 0 is the flight a search quotes (and the fare table prices); the
+    connection schedule numbers its daily waves from slot 1, so the two
+    never share a number. The number is the same for every date, class and
+    party size, so it can key per-flight state such as seat inventory.
+    """
+    slot = np.asarray(slot, dtype=np.int64)
+    if ((slot < 0) | (slot >= DAILY_SLOTS)).any():
+        raise ValueError(f"Flight slots run from 0 to {DAILY_SLOTS - 1}")
+    route = np.asarray(sources, dtype=np.int64) * n_airports + np.asarray(dests, dtype=np.int64)
+    return 100 + route * DAILY_SLOTS + slot
+
+
+def parse_flight_nos(flight_nos, n_airports, airlines=AIRLINE_TABLE):
+    """(airline, source, dest, slot) indices for flight numbers; all -1 where not ours."""
+    prefixes = {p: i for i, p in enumerate(airlines["prefix"].tolist())}
+    parsed = np.full((4, len(flight_nos)), -1, dtype=np.int64)
+    for k, flight_no in enumerate(flight_nos):
+        flight_no = str(flight_no)
+        air, number = prefixes.get(flight_no[:2], -1), flight_no[2:]
+        if air < 0 or not number.isdigit():
+            continue
+        route, slot = divmod(int(number) - 100, DAILY_SLOTS)
+        if not 0 <= route < n_airports ** 2:
+            continue
+        parsed[:, k] = (air, *divmod(route, n_airports), slot)
+    return parsed
+
+
+def seat_capacity(sources, dests, airlines, n_airports):
+    """Seats on sale per (source, dest, airline), fixed per flight.
+
+    A multiplicative hash of the route and airline spreads capacities over
+    MIN_SEATS..MAX_SEATS - 1, so the search results, the seat inventory and
+    the fare table agree on it in every process without any shared state.
+    """
+    route = np.asarray(sources, dtype=np.int64) * n_airports + np.asarray(dests, dtype=np.int64)
+    key = (route * 64 + np.asarray(airlines, dtype=np.int64)) * 2654435761 % (1 << 32)
+    return MIN_SEATS + (key >> 16) % (MAX_SEATS - MIN_SEATS)
+
+
+def class_index(class_types):
+    class_types = np.asarray(class_types)
+    if class_types.dtype.kind in "iu":
+        return class_types.astype(np.intp, copy=False)
+    uniq, inverse = np.unique(class_types, return_inverse=True)
+    codes = np.array([CLASS_INDEX[c] for c in uniq.tolist()], dtype=np.intp)
+    return codes[inverse].reshape(class_types.shape)
+
+
+def date_multiplier(dates):
+    """Fare uplift per travel date from the model's calendar features."""
+    cal = date_features(dates)
+    return (SEASON_MULTIPLIERS[cal["travel_season_num"]]
+            * np.where(cal["journey_is_weekend"] == 1, WEEKEND_MULTIPLIER, 1.0)
+            * np.where(cal["is_holiday"] == 1, HOLIDAY_MULTIPLIER, 1.0))
+
+
+# ============================================
+# BATCH PRICING
+# ============================================
+def price_batch(sources, dests, class_types, passengers, rng=None,
+                registry=REGISTRY, airlines=AIRLINE_TABLE, dates=None):
+    """Price every airline for Q queries in one pass.
+
+    ``sources``/``dests`` are airport names, codes or registry indices,
+    ``class_types`` are class names or indices, ``passengers`` are counts
+    and ``dates`` optional travel dates. Per-flight arrays have shape
+    (Q, n_airlines); ``valid`` is False where source == dest. Distances
+    come from the registry's precomputed matrix.
+    """
+    rng = np.random.default_rng() if rng is None else rng
+
+    src = registry.indices(sources).reshape(-1)
+    dst = registry.indices(dests).reshape(-1)
+    cls = class_index(class_types).reshape(-1)
+    pax = np.asarray(passengers, dtype=np.int64).reshape(-1)
+    day = np.ones(1) if dates is None else date_multiplier(np.asarray(dates).reshape(-1))
+    src, dst, cls, pax, day = np.broadcast_arrays(src, dst, cls, pax, day)
+
+    distance = registry.matrix[src, dst]
+    shape = (src.shape[0], airlines["multiplier"].shape[0])
+
+    base_price = (distance * FARE_PER_KM * day)[:, None]
+    price = (base_price * airlines["multiplier"][None, :]
+             * CLASS_MULTIPLIERS[cls][:, None] * pax[:, None]).astype(np.int64)
+
+    base_duration = ((distance / CRUISE_SPEED_KMH) * 60 + GROUND_TIME_MIN).astype(np.int64)
+    duration = base_duration[:, None] + rng.integers(0, 20, size=shape)
+
+    departure = np.broadcast_to(airlines["departure"], shape)
+    arrival = (departure + duration) % 1440
+
+    return {
+        "source": src,
+        "dest": dst,
+        "distance": distance,
+        "valid": src != dst,
+        "price": price,
+        "duration": duration,
+        "departure": departure,
+        "arrival": arrival,
+        "stops": np.broadcast_to(airlines["stops"], shape),
+        "seats": seat_capacity(src[:, None], dst[:, None], np.arange(shape[1]), len(registry)),
+        "flight_number": np.broadcast_to(flight_numbers(src, dst, len(registry))[:, None], shape),
+    }
+
+
+def generate_flights(source, dest, class_type, passengers, rng=None, travel_date=None):
+    if source == dest:
+        return FlightResults.empty(source, dest, AIRLINE_TABLE)
+
+    dates = None if travel_date is None else [np.datetime64(travel_date, "D")]
+    batch = price_batch([source], [dest], [class_type], [passengers], rng=rng, dates=dates)
+    return FlightResults.from_batch(batch, 0, source, dest, AIRLINE_TABLE)
@@ -0,0 +1,216 @@
+"""Columnar feature engineering producing the meta_v3 model features.
+
+Text fields are factorized once and parsed on their distinct values only,
+then broadcast back with an integer take; there is no per-row Python.
+"""
+import numpy as np
+import pandas as pd
+
+from calendar_features import date_features
+
+
+FEATURES = [
+    "Airline",
+    "Source",
+    "Destination",
+    "Additional_Info",
+    "route",
+    "duration_min",
+    "duration_hr",
+    "total_stops_num",
+    "journey_year",
+    "journey_month",
+    "journey_day",
+    "journey_weekday",
+    "journey_is_weekend",
+    "travel_season_num",
+    "is_holiday",
+    "dep_hour",
+    "dep_min",
+    "dep_is_night",
+    "dep_is_peak",
+    "arr_hour",
+    "arr_min",
+    "is_premium_airline",
+    "bad_duration_flag",
+    "route_freq",
+    "airline_freq",
+    "airline_route_freq",
+]
+
+CATEGORICAL_COLUMNS = ["Airline", "Source", "Destination", "Additional_Info", "route"]
+
+RAW_COLUMNS = [
+    "Airline", "Date_of_Journey", "Source", "Destination", "Dep_Time",
+    "Arrival_Time", "Duration", "Total_Stops", "Additional_Info",
+]
+
+PREMIUM_AIRLINE_PATTERN = r"Business|Premium"
+NIGHT_HOURS = (22, 6)
+PEAK_HOURS = ((6, 10), (17, 21))
+BAD_DURATION_MIN = 30
+
+
+# ============================================
+# COLUMN HELPERS
+# ============================================
+def _factorize(series):
+    """(codes, uniques) with -1 for missing; categoricals reuse their codes."""
+    if not isinstance(series, pd.Series):
+        series = pd.Series(series)
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return series.cat.codes.to_numpy(), pd.Series(series.cat.categories)
+    codes, uniques = pd.factorize(series, use_na_sentinel=True)
+    return codes, pd.Series(uniques)
+
+
+def _take(values, codes, fill=np.nan):
+    values = np.asarray(values, dtype=np.float64)
+    out = values[codes]
+    out[codes < 0] = fill
+    return out
+
+
+def _categorical(series):
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return series
+    return series.astype("category")
+
+
+def _clock(series):
+    """Hour and minute arrays from 'HH:MM' (anything after the 5th char is ignored)."""
+    codes, uniq = _factorize(series)
+    text = uniq.astype(str)
+    hours = pd.to_numeric(text.str.slice(0, 2), errors="coerce").to_numpy()
+    minutes = pd.to_numeric(text.str.slice(3, 5), errors="coerce").to_numpy()
+    return _take(hours, codes), _take(minutes, codes)
+
+
+def _duration_minutes(series):
+    codes, uniq = _factorize(series)
+    parts = uniq.astype(str).str.extract(r"^\s*(?:(\d+)h)?\s*(?:(\d+)m)?\s*$")
+    hours = pd.to_numeric(parts[0], errors="coerce")
+    minutes = pd.to_numeric(parts[1], errors="coerce")
+    total = hours.fillna(0) * 60 + minutes.fillna(0)
+    total[hours.isna() & minutes.isna()] = np.nan
+    return _take(total.to_numpy(), codes)
+
+
+def _stops(series):
+    if series.dtype.kind in "iuf":
+        return series.to_numpy(dtype=np.float64)
+    codes, uniq = _factorize(series)
+    text = uniq.astype(str).str.lower()
+    stops = pd.to_numeric(text.str.extract(r"(\d+)")[0], errors="coerce")
+    stops[text.str.contains("non-stop")] = 0
+    return _take(stops.to_numpy(), codes)
+
+
+def _journey_dates(series):
+    """Journey dates as datetime64[D]; accepts parsed datetimes or 'dd/mm/YYYY' text."""
+    if series.dtype.kind == "M":
+        return series.to_numpy().astype("datetime64[D]")
+    codes, uniq = _factorize(series)
+    parsed = pd.to_datetime(uniq, format="%d/%m/%Y", errors="coerce").to_numpy()
+    out = parsed.astype("datetime64[D]")[codes]
+    out[codes < 0] = np.datetime64("NaT")
+    return out
+
+
+def _in_hours(hours, start, end):
+    if start <= end:
+        return (hours >= start) & (hours < end)
+    return (hours >= start) | (hours < end)
+
+
+# ============================================
+# FREQUENCY FEATURES
+# ============================================
+def _pair_codes(a_codes, b_codes, n_b):
+    pair = a_codes.astype(np.int64) * n_b + b_codes
+    pair[(a_codes < 0) | (b_codes < 0)] = -1
+    return pair
+
+
+def _counts(codes):
+    valid = codes >= 0
+    counts = np.bincount(codes[valid])
+    out = np.zeros(codes.shape[0], dtype=np.float64)
+    out[valid] = counts[codes[valid]]
+    return out
+
+
+def frequency_features(airline, route):
+    """Counts of each route, airline and (airline, route) pair within the frame itself."""
+    a_codes, a_uniq = _factorize(airline)
+    r_codes, _ = _factorize(route)
+    return {
+        "route_freq": _counts(r_codes),
+        "airline_freq": _counts(a_codes),
+        "airline_route_freq": _counts(_pair_codes(r_codes, a_codes, len(a_uniq))),
+    }
+
+
+# ============================================
+# PIPELINE
+# ============================================
+def route_labels(source, destination):
+    """Categorical 'Source_Destination' labels built on the distinct pairs only."""
+    s_codes, s_uniq = _factorize(source)
+    d_codes, d_uniq = _factorize(destination)
+    pair = _pair_codes(s_codes, d_codes, len(d_uniq))
+    pairs = np.unique(pair[pair >= 0])
+    codes = np.searchsorted(pairs, pair)
+    codes[pair < 0] = -1
+    labels = (s_uniq.to_numpy(dtype=object)[pairs // len(d_uniq)] + "_"
+              + d_uniq.to_numpy(dtype=object)[pairs % len(d_uniq)])
+    return pd.Categorical.from_codes(codes, categories=pd.Index(labels))
+
+
+def build_features(raw, frequency_index=None):
+    """Model feature frame (columns in ``FEATURES`` order) for raw fare rows.
+
+    Frequency columns come from ``frequency_index`` when given (serving);
+    otherwise they are counted over ``raw`` itself (training).
+    """
+    missing = [c for c in RAW_COLUMNS if c not in raw.columns]
+    if missing:
+        raise ValueError(f"Missing raw columns: {missing}")
+
+    out = {
+        "Airline": _categorical(raw["Airline"]),
+        "Source": _categorical(raw["Source"]),
+        "Destination": _categorical(raw["Destination"]),
+        "Additional_Info": _categorical(raw["Additional_Info"]),
+    }
+    out["route"] = route_labels(raw["Source"], raw["Destination"])
+
+    duration = _duration_minutes(raw["Duration"])
+    out["duration_min"] = duration
+    out["duration_hr"] = duration / 60
+    out["total_stops_num"] = _stops(raw["Total_Stops"])
+
+    out.update(date_features(_journey_dates(raw["Date_of_Journey"])))
+
+    dep_hour, dep_min = _clock(raw["Dep_Time"])
+    arr_hour, arr_min = _clock(raw["Arrival_Time"])
+    out["dep_hour"] = dep_hour
+    out["dep_min"] = dep_min
+    out["dep_is_night"] = _in_hours(dep_hour, *NIGHT_HOURS).astype(np.int8)
+    out["dep_is_peak"] = (_in_hours(dep_hour, *PEAK_HOURS[0])
+                          | _in_hours(dep_hour, *PEAK_HOURS[1])).astype(np.int8)
+    out["arr_hour"] = arr_hour
+    out["arr_min"] = arr_min
+
+    a_codes, a_uniq = _factorize(raw["Airline"])
+    premium = a_uniq.astype(str).str.contains(PREMIUM_AIRLINE_PATTERN).to_numpy()
+    out["is_premium_airline"] = _take(premium, a_codes, fill=0).astype(np.int8)
+    out["bad_duration_flag"] = (np.isnan(duration) | (duration < BAD_DURATION_MIN)).astype(np.int8)
+
+    if frequency_index is None:
+        out.update(frequency_features(raw["Airline"], out["route"]))
+    else:
+        out.update(frequency_index.lookup(raw["Airline"], out["route"]))
+
+    frame = pd.DataFrame(out, index=raw.index)
+    return frame[FEATURES]
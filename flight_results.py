@@ -0,0 +1,174 @@
+import numpy as np
+
+
+def _hhmm(minutes):
+    minutes = np.asarray(minutes)
+    hours = np.char.zfill((minutes // 60).astype(str), 2)
+    mins = np.char.zfill((minutes % 60).astype(str), 2)
+    return np.char.add(np.char.add(hours, ":"), mins)
+
+
+def _thousands(values):
+    """Integers as strings with ',' digit grouping, e.g. 12345 -> '12,345'."""
+    values = np.asarray(values, dtype=np.int64)
+    plain = values.astype(str)
+    head, tail = np.divmod(values, 1000)
+    if not (head > 0).any():
+        return plain
+    grouped = np.char.add(np.char.add(_thousands(head), ","), np.char.zfill(tail.astype(str), 3))
+    return np.where(head > 0, grouped, plain)
+
+
+def _readonly(values, dtype=None):
+    arr = np.ascontiguousarray(values, dtype=dtype)
+    arr.flags.writeable = False
+    return arr
+
+
+class FlightResults:
+    """Columnar search results: one read-only array per field, one row per flight.
+
+    Airline attributes (name, logo, rating) are looked up from the airline
+    table through ``airline``, so they are not copied per result set.
+    """
+
+    __slots__ = (
+        "source", "dest", "airline", "price", "duration", "departure",
+        "arrival", "stops", "seats", "flight_number", "_airlines",
+    )
+
+    def __init__(self, source, dest, airline, price, duration, departure, arrival,
+                 stops, seats, flight_number, airlines):
+        self.source = source
+        self.dest = dest
+        self.airline = _readonly(airline, np.intp)
+        self.price = _readonly(price, np.int64)
+        self.duration = _readonly(duration, np.int64)
+        self.departure = _readonly(departure, np.int64)
+        self.arrival = _readonly(arrival, np.int64)
+        self.stops = _readonly(stops, np.int64)
+        self.seats = _readonly(seats, np.int64)
+        self.flight_number = _readonly(flight_number, np.int64)
+        self._airlines = airlines
+
+    @classmethod
+    def from_batch(cls, batch, row, source, dest, airlines):
+        """Results for query ``row`` of a ``fare_engine.price_batch`` output."""
+        n = batch["price"].shape[1]
+        return cls(
+            source, dest, np.arange(n),
+            batch["price"][row], batch["duration"][row],
+            batch["departure"][row], batch["arrival"][row],
+            batch["stops"][row], batch["seats"][row],
+            batch["flight_number"][row], airlines,
+        )
+
+    @classmethod
+    def empty(cls, source, dest, airlines):
+        none = np.empty(0, dtype=np.int64)
+        return cls(source, dest, none, none, none, none, none, none, none, none, airlines)
+
+    def with_seats(self, seats):
+        """A copy with live seat counts; every other column is shared, not copied."""
+        return FlightResults(
+            self.source, self.dest, self.airline, self.price, self.duration,
+            self.departure, self.arrival, self.stops, seats, self.flight_number,
+            self._airlines,
+        )
+
+    def with_prices(self, price):
+        """A copy with repriced fares; every other column is shared, not copied."""
+        return FlightResults(
+            self.source, self.dest, self.airline, price, self.duration,
+            self.departure, self.arrival, self.stops, self.seats, self.flight_number,
+            self._airlines,
+        )
+
+    def __len__(self):
+        return self.price.shape[0]
+
+    # ============================================
+    # AIRLINE COLUMNS
+    # ============================================
+    @property
+    def names(self):
+        return self._airlines["names"][self.airline]
+
+    @property
+    def logos(self):
+        return self._airlines["logos"][self.airline]
+
+    @property
+    def ratings(self):
+        return self._airlines["ratings"][self.airline]
+
+    @property
+    def flight_nos(self):
+        return np.char.add(self._airlines["prefix"][self.airline], self.flight_number.astype(str))
+
+    # ============================================
+    # FORMATTING
+    # ============================================
+    def price_str(self):
+        return np.char.add("₹", _thousands(self.price))
+
+    def duration_str(self):
+        return np.char.add(np.char.add((self.duration // 60).astype(str), "h "),
+                           np.char.add((self.duration % 60).astype(str), "m"))
+
+    def stops_str(self):
+        return np.where(self.stops == 0, "✈️ Non-stop",
+                        np.char.add(self.stops.astype(str), " stop(s)"))
+
+    def departure_str(self):
+        return _hhmm(self.departure)
+
+    def arrival_str(self):
+        return _hhmm(self.arrival)
+
+    def route_str(self):
+        return np.char.add(np.char.add(self.departure_str(), " → "), self.arrival_str())
+
+    # ============================================
+    # QUERIES
+    # ============================================
+    def savings(self):
+        return self.price.max() - self.price if len(self) else self.price
+
+    def avg_price(self):
+        return int(self.price.mean())
+
+    def cheapest(self):
+        return int(np.argmin(self.price))
+
+    def fastest(self):
+        return int(np.argmin(self.duration))
+
+    def top_k(self, key="price", k=3):
+        """Row indices of the ``k`` smallest values of column ``key``, in order."""
+        values = getattr(self, key)
+        k = min(k, len(self))
+        if k <= 0:
+            return np.empty(0, dtype=np.intp)
+        part = np.argpartition(values, k - 1)[:k]
+        return part[np.argsort(values[part], kind="stable")]
+
+    def record(self, i):
+        """Row ``i`` as the dict shape the result cards use."""
+        a = self.airline[i]
+        dep, arr, dur = int(self.departure[i]), int(self.arrival[i]), int(self.duration[i])
+        stops = int(self.stops[i])
+        return {
+            "name": str(self._airlines["names"][a]),
+            "logo": str(self._airlines["logos"][a]),
+            "rating": float(self._airlines["ratings"][a]),
+            "price": int(self.price[i]),
+            "duration": dur,
+            "departure": f"{dep // 60:02d}:{dep % 60:02d}",
+            "arrival": f"{arr // 60:02d}:{arr % 60:02d}",
+            "stops": stops,
+            "seats": int(self.seats[i]),
+            "flight_no": f"{self._airlines['prefix'][a]}{self.flight_number[i]}",
+            "duration_str": f"{dur // 60}h {dur % 60}m",
+            "stops_str": "✈️ Non-stop" if stops == 0 else f"{stops} stop(s)",
+        }
@@ -0,0 +1,153 @@
+"""Persisted lookup index for the route/airline frequency features.
+
+Counts are computed once over the training data and saved next to
+``meta_vN.json`` as ``freq_index_vN.json``. Labels are stored sorted so a
+whole batch resolves with one ``np.searchsorted`` per key column.
+"""
+import json
+import os
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from features import route_labels
+from predictor import ARTIFACTS_DIR, artifact_file
+
+
+FORMAT_VERSION = 1
+
+# Count reported for an airline, route or pair never seen in training.
+UNSEEN_COUNT = 0
+
+
+def _codes_in(sorted_labels, values):
+    """Position of each value in ``sorted_labels``, -1 where absent."""
+    codes, uniq = pd.factorize(pd.Series(values, copy=False).astype(object))
+    uniq = np.asarray(uniq, dtype=str)
+    pos = np.searchsorted(sorted_labels, uniq)
+    pos = np.minimum(pos, max(len(sorted_labels) - 1, 0))
+    found = (len(sorted_labels) > 0) & (sorted_labels[pos] == uniq)
+    mapped = np.where(found, pos, -1)
+    out = mapped[codes]
+    out[codes < 0] = -1
+    return out
+
+
+def _lookup_counts(keys, counts, wanted, fallback):
+    pos = np.searchsorted(keys, wanted)
+    pos = np.minimum(pos, max(len(keys) - 1, 0))
+    found = (wanted >= 0) & (len(keys) > 0) & (keys[pos] == wanted)
+    return np.where(found, counts[pos], fallback).astype(np.float64)
+
+
+class FrequencyIndex:
+    """Sorted label arrays plus counts for airline, route and (airline, route)."""
+
+    def __init__(self, airlines, airline_counts, routes, route_counts,
+                 pair_keys, pair_counts, version, unseen=UNSEEN_COUNT):
+        self.airlines = np.asarray(airlines, dtype=str)
+        self.airline_counts = np.asarray(airline_counts, dtype=np.int64)
+        self.routes = np.asarray(routes, dtype=str)
+        self.route_counts = np.asarray(route_counts, dtype=np.int64)
+        # Pair key = airline position * len(routes) + route position, sorted.
+        self.pair_keys = np.asarray(pair_keys, dtype=np.int64)
+        self.pair_counts = np.asarray(pair_counts, dtype=np.int64)
+        self.version = version
+        self.unseen = unseen
+
+    @classmethod
+    def build(cls, airline, route, version):
+        """Count occurrences over training columns ``airline`` and ``route``, aligned by position."""
+        airline = pd.Series(np.asarray(airline, dtype=object))
+        route = pd.Series(np.asarray(route, dtype=object))
+        valid = airline.notna() & route.notna()
+
+        airlines, a_codes, a_counts = np.unique(
+            airline[valid].to_numpy(dtype=str), return_inverse=True, return_counts=True)
+        routes, r_codes, r_counts = np.unique(
+            route[valid].to_numpy(dtype=str), return_inverse=True, return_counts=True)
+        pair_keys, pair_counts = np.unique(
+            a_codes.astype(np.int64) * len(routes) + r_codes, return_counts=True)
+        return cls(airlines, a_counts, routes, r_counts, pair_keys, pair_counts, version)
+
+    @classmethod
+    def from_frame(cls, raw, version):
+        return cls.build(raw["Airline"], route_labels(raw["Source"], raw["Destination"]), version)
+
+    def lookup(self, airline, route):
+        """Feature arrays for a batch; unseen keys get ``self.unseen``."""
+        a_pos = _codes_in(self.airlines, airline)
+        r_pos = _codes_in(self.routes, route)
+        pair = np.where((a_pos >= 0) & (r_pos >= 0), a_pos * len(self.routes) + r_pos, -1)
+        return {
+            "route_freq": np.where(r_pos >= 0, self.route_counts[r_pos], self.unseen)
+                            .astype(np.float64),
+            "airline_freq": np.where(a_pos >= 0, self.airline_counts[a_pos], self.unseen)
+                              .astype(np.float64),
+            "airline_route_freq": _lookup_counts(self.pair_keys, self.pair_counts,
+                                                 pair, self.unseen),
+        }
+
+    def to_dict(self):
+        return {
+            "format_version": FORMAT_VERSION,
+            "version": self.version,
+            "unseen": self.unseen,
+            "airlines": self.airlines.tolist(),
+            "airline_counts": self.airline_counts.tolist(),
+            "routes": self.routes.tolist(),
+            "route_counts": self.route_counts.tolist(),
+            "pair_keys": self.pair_keys.tolist(),
+            "pair_counts": self.pair_counts.tolist(),
+        }
+
+    @classmethod
+    def from_dict(cls, payload):
+        if payload.get("format_version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported frequency index format: {payload.get('format_version')}")
+        return cls(
+            payload["airlines"], payload["airline_counts"],
+            payload["routes"], payload["route_counts"],
+            payload["pair_keys"], payload["pair_counts"],
+            payload["version"], payload.get("unseen", UNSEEN_COUNT),
+        )
+
+    def save(self, path):
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump(self.to_dict(), fh)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, encoding="utf-8") as fh:
+            return cls.from_dict(json.load(fh))
+
+
+def index_path(artifacts_dir=ARTIFACTS_DIR):
+    return artifact_file(artifacts_dir, "freq_index")
+
+
+@lru_cache(maxsize=None)
+def load_frequency_index(artifacts_dir=ARTIFACTS_DIR):
+    """Process-wide index for ``artifacts_dir``, read on first use."""
+    return FrequencyIndex.load(index_path(artifacts_dir))
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from dataset import load_dataset
+    from predictor import load_meta
+
+    parser = argparse.ArgumentParser(description="Rebuild the frequency index from the training data.")
+    parser.add_argument("--artifacts", default=ARTIFACTS_DIR)
+    parser.add_argument("--dataset", default="train")
+    args = parser.parse_args()
+
+    raw = load_dataset(args.dataset, columns=["Airline", "Source", "Destination"])
+    index = FrequencyIndex.from_frame(raw, version=load_meta(args.artifacts)["created_at"])
+    index.save(index_path(args.artifacts))
+    print(f"Wrote {index_path(args.artifacts)}: {len(index.airlines)} airlines, "
+          f"{len(index.routes)} routes, {len(index.pair_keys)} pairs")
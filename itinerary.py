@@ -0,0 +1,184 @@
+"""Multi-leg itinerary search over a scheduled-leg graph.
+
+``RouteGraph`` stores legs as parallel arrays sorted by (origin, departure)
+with CSR offsets per origin airport. The graph is built once and reused
+across requests. ``k_best`` is a best-first search over partial
+itineraries: a heap keyed on the objective, with stop limits, connection
+windows, no repeated airports and an A* great-circle lower bound.
+"""
+import heapq
+
+import numpy as np
+
+from airports import REGISTRY
+from fare_engine import (
+    AIRLINE_TABLE, CLASS_MULTIPLIERS, CRUISE_SPEED_KMH, FARE_PER_KM, GROUND_TIME_MIN,
+    DAILY_SLOTS, class_index, flight_numbers,
+)
+
+
+MIN_CONNECTION_MIN = 45
+MAX_CONNECTION_MIN = 12 * 60
+MAX_STOPS = 2
+
+# ============================================
+# SCHEDULE
+# ============================================
+def build_schedule(registry=REGISTRY, airlines=AIRLINE_TABLE, days=2, coverage=0.6,
+                   daily_frequency=2, seed=0):
+    """Synthetic leg table: each airline serves a random ``coverage`` share of pairs.
+
+    Fares and block times follow the fare engine (Economy, one passenger).
+    """
+    if not 1 <= daily_frequency < DAILY_SLOTS:
+        raise ValueError(f"daily_frequency must be between 1 and {DAILY_SLOTS - 1}")
+    rng = np.random.default_rng(seed)
+    n, n_air = len(registry), len(airlines["multiplier"])
+
+    a, o, d = np.meshgrid(np.arange(n_air), np.arange(n), np.arange(n), indexing="ij")
+    served = (o != d) & (rng.random(o.shape) < coverage)
+    a, o, d = a[served], o[served], d[served]
+
+    reps = days * daily_frequency
+    a, o, d = np.repeat(a, reps), np.repeat(o, reps), np.repeat(d, reps)
+    slot = np.tile(np.arange(reps), int(served.sum()))
+    day, wave = np.divmod(slot, daily_frequency)
+
+    distance = registry.matrix[o, d]
+    spread = 1440 // daily_frequency
+    dep = (day * 1440 + airlines["departure"][a] + wave * spread
+           + rng.integers(0, 8, len(a)) * 15)
+    duration = ((distance / CRUISE_SPEED_KMH) * 60 + GROUND_TIME_MIN).astype(np.int64)
+    price = distance * FARE_PER_KM * airlines["multiplier"][a]
+    return {
+        "origin": o, "dest": d, "airline": a,
+        "departure": dep, "arrival": dep + duration, "price": price,
+        # Waves take slots 1.., leaving slot 0 to the searched direct flights.
+        "flight_number": flight_numbers(o, d, n, wave + 1),
+    }
+
+
+# ============================================
+# GRAPH
+# ============================================
+class RouteGraph:
+    def __init__(self, legs, registry=REGISTRY, airlines=AIRLINE_TABLE):
+        order = np.lexsort((legs["departure"], legs["origin"]))
+        self.origin = np.asarray(legs["origin"])[order].astype(np.int32)
+        self.dest = np.asarray(legs["dest"])[order].astype(np.int32)
+        self.airline = np.asarray(legs["airline"])[order].astype(np.int32)
+        self.departure = np.asarray(legs["departure"])[order].astype(np.int64)
+        self.arrival = np.asarray(legs["arrival"])[order].astype(np.int64)
+        self.price = np.asarray(legs["price"])[order].astype(np.float64)
+        self.flight_number = np.asarray(legs["flight_number"])[order]
+        self.registry = registry
+        self.airlines = airlines
+        # Legs leaving airport i are self.<field>[offsets[i]:offsets[i + 1]].
+        self.offsets = np.searchsorted(self.origin, np.arange(len(registry) + 1))
+
+    def __len__(self):
+        return len(self.origin)
+
+    def departures(self, airport, earliest, latest):
+        """Leg ids leaving ``airport`` with earliest <= departure <= latest."""
+        lo, hi = self.offsets[airport], self.offsets[airport + 1]
+        deps = self.departure[lo:hi]
+        start = lo + np.searchsorted(deps, earliest, side="left")
+        stop = lo + np.searchsorted(deps, latest, side="right")
+        return np.arange(start, stop)
+
+    def _weights(self, objective):
+        if objective == "price":
+            return 1.0, 0.0
+        if objective == "duration":
+            return 0.0, 1.0
+        if isinstance(objective, tuple) and len(objective) == 2:
+            return float(objective[0]), float(objective[1])
+        raise ValueError(f"Unknown objective {objective!r}")
+
+    def _lower_bounds(self, dst, w_price, w_minutes):
+        """Admissible, consistent A* bound on the remaining cost from every airport.
+
+        Great-circle distance to ``dst`` priced at the cheapest airline and
+        flown at cruise speed; no real leg sequence can beat it.
+        """
+        km = self.registry.matrix[:, dst].astype(np.float64)
+        cheapest = self.airlines["multiplier"].min()
+        return w_price * km * FARE_PER_KM * cheapest + w_minutes * km / CRUISE_SPEED_KMH * 60
+
+    def k_best(self, source, dest, depart_after=0, k=5, objective="price",
+               max_stops=MAX_STOPS, min_connection=MIN_CONNECTION_MIN,
+               max_connection=MAX_CONNECTION_MIN, window=1440):
+        """Up to ``k`` itineraries from ``source`` to ``dest``, best first.
+
+        ``objective`` is 'price', 'duration' (elapsed minutes) or a
+        ``(per_rupee, per_minute)`` weight pair. The first leg departs within
+        ``window`` minutes after ``depart_after``.
+        """
+        w_price, w_minutes = self._weights(objective)
+        src, dst = (int(i) for i in self.registry.indices([source, dest]))
+        if src == dst:
+            return []
+        bound = self._lower_bounds(dst, w_price, w_minutes)
+
+        heap, results = [], []
+        counter = 0
+
+        def push(legs, price, elapsed, path):
+            nonlocal counter
+            cost = w_price * price + w_minutes * elapsed
+            key = cost + bound[self.dest[legs]]
+            for item in zip(key.tolist(), cost.tolist(), price.tolist(), legs.tolist()):
+                heapq.heappush(heap, (item[0], counter, item[1], item[2], path + (item[3],)))
+                counter += 1
+
+        first = self.departures(src, depart_after, depart_after + window)
+        push(first, self.price[first], self.arrival[first] - self.departure[first], ())
+
+        while heap and len(results) < k:
+            _, _, cost, price, path = heapq.heappop(heap)
+            last = path[-1]
+            here, arrived = int(self.dest[last]), int(self.arrival[last])
+            if here == dst:
+                results.append(self._itinerary(path, price, cost))
+                continue
+            if len(path) > max_stops:
+                continue
+
+            legs = self.departures(here, arrived + min_connection, arrived + max_connection)
+            nxt = self.dest[legs]
+            if len(path) == max_stops:
+                # Last allowed leg: only legs landing at the destination are useful.
+                keep = nxt == dst
+            else:
+                keep = np.ones(len(legs), dtype=bool)
+                for leg in path:
+                    keep &= nxt != self.origin[leg]
+            legs = legs[keep]
+            if len(legs):
+                push(legs, price + self.price[legs],
+                     self.arrival[legs] - self.departure[path[0]], path)
+        return results
+
+    def _itinerary(self, path, price, cost):
+        legs = np.array(path)
+        airports = np.append(self.origin[legs], self.dest[legs[-1]])
+        return {
+            "legs": path,
+            "airports": self.registry.codes[airports].tolist(),
+            "flights": np.char.add(self.airlines["prefix"][self.airline[legs]],
+                                   self.flight_number[legs].astype(str)).tolist(),
+            "airlines": self.airlines["names"][self.airline[legs]].tolist(),
+            "departure": int(self.departure[legs[0]]),
+            "arrival": int(self.arrival[legs[-1]]),
+            "duration": int(self.arrival[legs[-1]] - self.departure[legs[0]]),
+            "stops": len(path) - 1,
+            "price": float(price),
+            "score": float(cost),
+        }
+
+
+def fare_for(itinerary, class_type, passengers):
+    """Total fare for an itinerary found on per-passenger Economy leg prices."""
+    cls = int(class_index([class_type])[0])
+    return int(itinerary["price"] * CLASS_MULTIPLIERS[cls] * passengers)
@@ -0,0 +1,135 @@
+"""Per-section timing for Streamlit reruns.
+
+A ``RerunTimer`` records consecutive labelled sections with
+``perf_counter``. ``PerfRecorder`` keeps the last N reruns and cumulative
+per-section histograms, plus one-off startup phases (imports, prewarm,
+first render). It can export them as JSON log lines or as Prometheus text.
+"""
+import json
+import logging
+import os
+import resource
+import sys
+import threading
+import time
+from collections import deque
+
+
+logger = logging.getLogger("aerovoyage.perf")
+
+# Histogram bucket upper bounds, in seconds.
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+
+class RerunTimer:
+    """Consecutive sections of one rerun: ``begin('SEARCH')`` closes the previous one."""
+
+    __slots__ = ("started", "spans", "_label", "_t0")
+
+    def __init__(self):
+        self.started = time.time()
+        self.spans = []
+        self._label = None
+        self._t0 = time.perf_counter()
+
+    def begin(self, label):
+        now = time.perf_counter()
+        if self._label is not None:
+            self.spans.append((self._label, now - self._t0))
+        self._label, self._t0 = label, now
+
+    def end(self):
+        self.begin(None)
+
+    def total(self):
+        return sum(seconds for _, seconds in self.spans)
+
+
+class PerfRecorder:
+    """Process-wide store of rerun timings, shared by every session."""
+
+    def __init__(self, history=50):
+        self.history = deque(maxlen=history)
+        self._lock = threading.Lock()
+        self._counts = {}
+        self._sums = {}
+        self._buckets = {}
+        self.startup = {}
+
+    def start(self):
+        return RerunTimer()
+
+    def finish(self, timer):
+        timer.end()
+        record = {
+            "ts": timer.started,
+            "total_ms": timer.total() * 1000,
+            "spans_ms": {label: seconds * 1000 for label, seconds in timer.spans},
+        }
+        with self._lock:
+            self.history.append(record)
+            for label, seconds in timer.spans:
+                self._observe(label, seconds)
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(json.dumps({"event": "rerun", **record}))
+        return record
+
+    def _observe(self, label, seconds):
+        self._counts[label] = self._counts.get(label, 0) + 1
+        self._sums[label] = self._sums.get(label, 0.0) + seconds
+        buckets = self._buckets.setdefault(label, [0] * len(BUCKETS))
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                buckets[i] += 1
+
+    def observe(self, label, seconds):
+        """Add one sample outside a rerun, e.g. a session's first render."""
+        with self._lock:
+            self._observe(label, seconds)
+
+    def mark_startup(self, phase, seconds):
+        """Record a once-per-process phase; later calls for the same phase are ignored."""
+        with self._lock:
+            if phase in self.startup:
+                return False
+            self.startup[phase] = seconds
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(json.dumps({"event": "startup", "phase": phase, "ms": seconds * 1000}))
+        return True
+
+    def recent(self):
+        with self._lock:
+            return list(self.history)
+
+    def prometheus(self):
+        """Cumulative section histograms in Prometheus text exposition format."""
+        name = "aerovoyage_section_seconds"
+        lines = [f"# HELP {name} Wall-clock time per app section.", f"# TYPE {name} histogram"]
+        with self._lock:
+            for label in sorted(self._counts):
+                tag = label.lower().replace(" ", "_")
+                for bound, count in zip(BUCKETS, self._buckets[label]):
+                    lines.append(f'{name}_bucket{{section="{tag}",le="{bound}"}} {count}')
+                lines.append(f'{name}_bucket{{section="{tag}",le="+Inf"}} {self._counts[label]}')
+                lines.append(f'{name}_sum{{section="{tag}"}} {self._sums[label]:.6f}')
+                lines.append(f'{name}_count{{section="{tag}"}} {self._counts[label]}')
+            if self.startup:
+                gauge = "aerovoyage_startup_seconds"
+                lines += [f"# HELP {gauge} One-off process startup phases.", f"# TYPE {gauge} gauge"]
+                for phase, seconds in self.startup.items():
+                    lines.append(f'{gauge}{{phase="{phase}"}} {seconds:.6f}')
+        return "\n".join(lines) + "\n"
+
+
+def memory_usage():
+    """Current and peak resident set size of this process, in MiB."""
+    # ru_maxrss is KiB on Linux but bytes on macOS.
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    peak_mib = peak / 2 ** 20 if sys.platform == "darwin" else peak / 1024
+    current = None
+    try:
+        with open("/proc/self/statm", encoding="ascii") as fh:
+            current = int(fh.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    except (OSError, ValueError):
+        pass
+    return {"rss_mib": current, "peak_rss_mib": peak_mib}
@@ -0,0 +1,197 @@
+"""Cross-process cache of model predictions, backed by SQLite in WAL mode.
+
+Entries are keyed by a 64-bit hash of the engineered feature row
+(``pandas.util.hash_pandas_object`` over the model's feature columns) and
+namespaced by the predictor's version (``artifacts_vN@created_at``).
+Loading a retrained model changes the namespace, so its predictions
+never mix with the old model's. The old entries simply stop being read
+and age out.
+
+Every process opens the same file. The cache holds at most
+``max_entries`` rows. Past that, the least recently used tenth is
+deleted. Reads are batched into one query per candidate set. Recency is
+refreshed at most once per ``touch_seconds`` per entry, so a hot entry
+does not cost a write on every hit.
+"""
+import json
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from seat_inventory import ConnectionPool
+
+
+PREDICTION_CACHE_PATH = os.environ.get(
+    "AEROVOYAGE_PREDICTION_CACHE",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "predictions.db"),
+)
+MAX_ENTRIES = 1_000_000
+TOUCH_SECONDS = 60
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS predictions (
+    version TEXT NOT NULL,
+    key INTEGER NOT NULL,
+    value REAL NOT NULL,
+    used REAL NOT NULL,
+    PRIMARY KEY (version, key)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS predictions_used ON predictions (used);
+CREATE TABLE IF NOT EXISTS size (id INTEGER PRIMARY KEY CHECK (id = 0), entries INTEGER NOT NULL);
+INSERT OR IGNORE INTO size VALUES (0, 0);
+CREATE TRIGGER IF NOT EXISTS predictions_added AFTER INSERT ON predictions
+    BEGIN UPDATE size SET entries = entries + 1; END;
+CREATE TRIGGER IF NOT EXISTS predictions_removed AFTER DELETE ON predictions
+    BEGIN UPDATE size SET entries = entries - 1; END;
+"""
+
+
+def row_keys(frame, features):
+    """One signed 64-bit hash per row of ``frame[features]``; the index is ignored."""
+    hashes = pd.util.hash_pandas_object(frame[features], index=False).to_numpy()
+    # SQLite integers are signed; the bit pattern is kept as is.
+    return hashes.view(np.int64)
+
+
+class PredictionCache:
+    """Batch get/put of float predictions per (model version, row hash)."""
+
+    def __init__(self, path=PREDICTION_CACHE_PATH, max_entries=MAX_ENTRIES,
+                 touch_seconds=TOUCH_SECONDS, pool_size=4, clock=time.time):
+        self.path = path
+        self.max_entries = max_entries
+        self.touch_seconds = touch_seconds
+        self._clock = clock
+        self.pool = ConnectionPool(path, pool_size)
+        with self.pool.connection() as conn:
+            conn.executescript(SCHEMA)
+
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.puts = 0
+        self.evictions = 0
+
+    def get_many(self, version, keys):
+        """(values, found): values are NaN where ``found`` is False."""
+        keys = np.asarray(keys, dtype=np.int64)
+        values = np.full(len(keys), np.nan)
+        if not len(keys):
+            return values, np.zeros(0, dtype=bool)
+        now = self._clock()
+        with self.pool.connection() as conn:
+            rows = conn.execute(
+                "SELECT key, value, used FROM predictions "
+                "WHERE version = ? AND key IN (SELECT value FROM json_each(?))",
+                (version, json.dumps(keys.tolist())),
+            ).fetchall()
+            stale = [k for k, _, used in rows if used < now - self.touch_seconds]
+            if stale:
+                conn.execute("BEGIN IMMEDIATE")
+                conn.executemany("UPDATE predictions SET used = ? WHERE version = ? AND key = ?",
+                                 [(now, version, k) for k in stale])
+                conn.execute("COMMIT")
+
+        if rows:
+            found_keys = np.array([r[0] for r in rows], dtype=np.int64)
+            found_values = np.array([r[1] for r in rows], dtype=np.float64)
+            order = np.argsort(found_keys)
+            found_keys, found_values = found_keys[order], found_values[order]
+            pos = np.minimum(np.searchsorted(found_keys, keys), len(found_keys) - 1)
+            found = found_keys[pos] == keys
+            values[found] = found_values[pos[found]]
+        else:
+            found = np.zeros(len(keys), dtype=bool)
+        with self._lock:
+            self.hits += int(found.sum())
+            self.misses += int((~found).sum())
+        return values, found
+
+    def put_many(self, version, keys, values):
+        """Store predictions, then evict the least recently used entries if over budget."""
+        keys = np.asarray(keys, dtype=np.int64)
+        if not len(keys):
+            return
+        now = self._clock()
+        evicted = 0
+        with self.pool.connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.executemany(
+                    "INSERT INTO predictions VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT (version, key) DO UPDATE SET value = excluded.value, used = excluded.used",
+                    zip([version] * len(keys), keys.tolist(),
+                        np.asarray(values, dtype=np.float64).tolist(), [now] * len(keys)),
+                )
+                (entries,) = conn.execute("SELECT entries FROM size").fetchone()
+                if entries > self.max_entries:
+                    # Evict down to 90% so the next few puts do not evict again.
+                    evicted = entries - int(self.max_entries * 0.9)
+                    conn.execute("DELETE FROM predictions WHERE (version, key) IN "
+                                 "(SELECT version, key FROM predictions ORDER BY used LIMIT ?)",
+                                 (evicted,))
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        with self._lock:
+            self.puts += len(keys)
+            self.evictions += evicted
+
+    def entries(self):
+        with self.pool.connection() as conn:
+            return conn.execute("SELECT entries FROM size").fetchone()[0]
+
+    def drop_other_versions(self, version):
+        """Delete every entry not in ``version``'s namespace; returns how many."""
+        with self.pool.connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            count = conn.execute("DELETE FROM predictions WHERE version != ?", (version,)).rowcount
+            conn.execute("COMMIT")
+        return count
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            stats = {
+                "hits": self.hits,
+                "misses": self.misses,
+                "puts": self.puts,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+        return {"entries": self.entries(), **stats}
+
+    def close(self):
+        self.pool.close()
+
+
+class CachedPredictor:
+    """``predict_batch`` through a PredictionCache; only missed rows reach the model."""
+
+    def __init__(self, model, cache):
+        self.model = model
+        self.cache = cache
+        self.features = model.features
+        self.version = model.version
+
+    def validate(self, frame):
+        return self.model.validate(frame)
+
+    def predict_batch(self, frame):
+        X = self.validate(frame)
+        if len(X) == 0:
+            return np.empty(0, dtype=np.float64)
+        keys = row_keys(X, self.features)
+        values, found = self.cache.get_many(self.version, keys)
+        missed = np.flatnonzero(~found)
+        if len(missed):
+            # Repeated rows within one batch are predicted once.
+            uniq, first, inverse = np.unique(keys[missed], return_index=True, return_inverse=True)
+            fresh = self.model.predict_batch(X.iloc[missed[first]])
+            values[missed] = fresh[inverse]
+            self.cache.put_many(self.version, uniq, fresh)
+        return values
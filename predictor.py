@@ -0,0 +1,94 @@
+import json
+import os
+from functools import lru_cache
+
+import numpy as np
+
+
+ARTIFACTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "artifacts_v3")
+META_FILE = "meta_v3.json"
+CATBOOST_FILE = "catboost_model.cbm"
+LIGHTGBM_FILE = "lightgbm_model.txt"
+
+
+def artifact_file(artifacts_dir, stem, ext="json"):
+    """``<stem>_vN.<ext>`` inside ``artifacts_vN/``."""
+    suffix = os.path.basename(os.path.normpath(artifacts_dir)).rpartition("_")[2]
+    return os.path.join(artifacts_dir, f"{stem}_{suffix}.{ext}")
+
+
+def _meta_path(artifacts_dir):
+    path = artifact_file(artifacts_dir, "meta")
+    return path if os.path.exists(path) else os.path.join(artifacts_dir, META_FILE)
+
+
+def load_meta(artifacts_dir=ARTIFACTS_DIR):
+    with open(_meta_path(artifacts_dir), encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+def model_version(meta, artifacts_dir=ARTIFACTS_DIR):
+    return f"{os.path.basename(os.path.normpath(artifacts_dir))}@{meta['created_at']}"
+
+
+class EnsemblePredictor:
+    """CatBoost + LightGBM blend described by a meta_vN.json file."""
+
+    def __init__(self, meta, catboost_model, lightgbm_model, version):
+        self.meta = meta
+        self.features = list(meta["features"])
+        self.categorical = [self.features[i] for i in meta["categorical_indices"]]
+        self.weights = meta["ensemble_weights"]
+        self.version = version
+        self.catboost = catboost_model
+        self.lightgbm = lightgbm_model
+
+    @classmethod
+    def from_dir(cls, artifacts_dir=ARTIFACTS_DIR):
+        try:
+            from catboost import CatBoostRegressor
+            import lightgbm as lgb
+        except ImportError as exc:
+            raise ImportError(
+                "EnsemblePredictor needs catboost and lightgbm (pip install -r requirements.txt)"
+            ) from exc
+
+        meta = load_meta(artifacts_dir)
+        cb_path = os.path.join(artifacts_dir, CATBOOST_FILE)
+        lgb_path = os.path.join(artifacts_dir, LIGHTGBM_FILE)
+        for path in (cb_path, lgb_path):
+            if not os.path.exists(path):
+                raise FileNotFoundError(f"Model file missing: {path} (run train.py to produce it)")
+
+        catboost_model = CatBoostRegressor()
+        catboost_model.load_model(cb_path)
+        lightgbm_model = lgb.Booster(model_file=lgb_path)
+        return cls(meta, catboost_model, lightgbm_model, model_version(meta, artifacts_dir))
+
+    def validate(self, frame):
+        """Return ``frame`` restricted to the model features, in model order."""
+        missing = [c for c in self.features if c not in frame.columns]
+        if missing:
+            raise ValueError(f"Missing feature columns: {missing}")
+        return frame[self.features]
+
+    def predict_batch(self, frame):
+        """Predict fares for every row of ``frame`` in one call per model."""
+        X = self.validate(frame)
+        if len(X) == 0:
+            return np.empty(0, dtype=np.float64)
+
+        # CatBoost wants the raw category labels, LightGBM pandas categoricals;
+        # the booster remaps categories to its training codes itself.
+        X_cb = X.astype({c: str for c in self.categorical})
+        X_lgb = X.astype({c: "category" for c in self.categorical})
+
+        pred_cb = np.asarray(self.catboost.predict(X_cb), dtype=np.float64)
+        pred_lgb = np.asarray(self.lightgbm.predict(X_lgb), dtype=np.float64)
+        return self.weights["CatBoost"] * pred_cb + self.weights["LightGBM"] * pred_lgb
+
+
+@lru_cache(maxsize=None)
+def load_predictor(artifacts_dir=ARTIFACTS_DIR):
+    """Process-wide shared predictor; models are loaded once per artifacts dir."""
+    return EnsemblePredictor.from_dir(artifacts_dir)
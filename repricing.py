@@ -0,0 +1,367 @@
+"""Dynamic fares: demand and time-to-departure curves over an array fare table.
+
+``FareTable`` holds one row per (route, airline, day) over a booking
+horizon as parallel arrays. A row's fare is its static base fare (the
+fare engine's Economy price for that day) times two step curves: one on
+load factor (seats sold / capacity) and one on days to departure.
+
+Both curves are steps, as airline fare buckets are, so a row's fare only
+changes when an event moves it into another bucket:
+
+- ``book``/``release`` reprice the rows they touch.
+- ``advance`` moves the clock. It reprices only the rows whose departure
+  crossed a days-out boundary in that interval. Rows are kept sorted by
+  departure, so each boundary is one ``searchsorted`` range. A clock that
+  steps backwards (e.g. an NTP correction) is ignored. When the date
+  changes the window rolls forward: past days are dropped and new days
+  priced at the end, so the table always starts today.
+
+Dates outside the window have no demand fares; asking for one raises
+``DateOutsideWindow`` rather than quoting the base fare.
+
+Every repricing publishes a change event with the affected routes, days,
+old and new fares. Caches can then drop exactly those entries, and
+``generation`` counts the repricings that changed a fare, for caches keyed
+on the whole table. ``seat_booker`` feeds confirmed seat inventory
+bookings back into the table.
+"""
+import threading
+from datetime import date, datetime
+
+import numpy as np
+
+from airports import REGISTRY
+from fare_engine import AIRLINE_TABLE, parse_flight_nos, price_batch, seat_capacity
+
+
+HORIZON_DAYS = 180
+
+# Load factor buckets: lower bound of seats sold / capacity -> multiplier.
+LOAD_FACTOR_STEPS = np.array([0.0, 0.5, 0.7, 0.85, 0.95])
+LOAD_FACTOR_MULTIPLIERS = np.array([0.90, 1.00, 1.15, 1.35, 1.60])
+# Advance purchase buckets: lower bound of days to departure -> multiplier.
+DAYS_OUT_STEPS = np.array([0, 3, 7, 14, 21, 45])
+DAYS_OUT_MULTIPLIERS = np.array([1.50, 1.30, 1.15, 1.05, 1.00, 0.92])
+
+MINUTES_PER_DAY = 1440
+
+
+def _minute(when):
+    """A datetime, date or datetime64 as datetime64[m]."""
+    if isinstance(when, date) and not isinstance(when, datetime):
+        when = datetime(when.year, when.month, when.day)
+    return np.datetime64(when, "m")
+
+
+def load_multiplier(sold, capacity):
+    share = np.asarray(sold, dtype=np.float64) / np.maximum(capacity, 1)
+    return LOAD_FACTOR_MULTIPLIERS[np.searchsorted(LOAD_FACTOR_STEPS, share, side="right") - 1]
+
+
+def days_out_bucket(minutes_left):
+    """Advance-purchase bucket per row; departed rows stay in the last-minute bucket."""
+    steps = DAYS_OUT_STEPS * MINUTES_PER_DAY
+    return np.maximum(np.searchsorted(steps, minutes_left, side="right") - 1, 0)
+
+
+class FareTable:
+    """Fares for every route, airline and day from ``first_date`` over ``days`` days.
+
+    Rows are laid out day-major, then route, then airline:
+    ``row = (day * n_routes + route) * n_airlines + airline``. Capacity
+    defaults to the fare engine's ``seat_capacity``, the same seats the
+    seat inventory sells.
+    """
+
+    def __init__(self, first_date, days=HORIZON_DAYS, now=None, capacity=None,
+                 registry=REGISTRY, airlines=AIRLINE_TABLE):
+        self.registry = registry
+        self.airlines = airlines
+        self.first_date = np.datetime64(first_date, "D")
+        self.dates = self.first_date + np.arange(days)
+
+        n = len(registry)
+        src, dst = np.nonzero(~np.eye(n, dtype=bool))
+        self.route_src, self.route_dst = src, dst
+        self.route_id = np.full((n, n), -1, dtype=np.int64)
+        self.route_id[src, dst] = np.arange(len(src))
+        n_routes, n_air = len(src), len(airlines["multiplier"])
+        self.shape = (days, n_routes, n_air)
+
+        self.base = self._base_fares(self.dates)
+        if capacity is None:
+            capacity = seat_capacity(src[:, None], dst[:, None], np.arange(n_air), n)
+        # Capacity is per (route, airline), the same every day.
+        per_day = np.broadcast_to(np.asarray(capacity, dtype=np.int32), (n_routes, n_air))
+        self.capacity = np.tile(per_day.reshape(-1), days)
+        self.sold = np.zeros(self.base.shape, dtype=np.int32)
+
+        # Departures in minutes after first_date 00:00.
+        day_minutes = np.arange(days, dtype=np.int64) * MINUTES_PER_DAY
+        self.departure = (day_minutes[:, None, None]
+                          + airlines["departure"][None, None, :]
+                          + np.zeros((1, n_routes, 1), dtype=np.int64)).reshape(-1)
+        self._by_departure = np.argsort(self.departure, kind="stable")
+        self._sorted_departure = self.departure[self._by_departure]
+
+        self._epoch = np.datetime64(self.first_date, "m")
+        self.now = int((_minute(now or datetime.now()) - self._epoch).astype(np.int64))
+        self.bucket = days_out_bucket(self.departure - self.now).astype(np.int8)
+        self.open = self.departure > self.now
+        self.fare = self._fares(np.arange(len(self.base)))
+
+        # Reentrant so seat_booker can map flights to rows and sell them under one hold.
+        self._lock = threading.RLock()
+        self._listeners = []
+        self.events = 0
+        self.generation = 0
+        self.rows_repriced = 0
+
+    def __len__(self):
+        return len(self.base)
+
+    def _base_fares(self, dates):
+        """Economy fare per row for whole days ``dates``, in row order."""
+        n_routes = len(self.route_src)
+        batch = price_batch(np.tile(self.route_src, len(dates)), np.tile(self.route_dst, len(dates)),
+                            [0], [1], rng=np.random.default_rng(0), registry=self.registry,
+                            airlines=self.airlines, dates=np.repeat(dates, n_routes))
+        return batch["price"].reshape(-1).astype(np.int32)
+
+    def window(self):
+        """(first, last) travel dates the table prices, as ``datetime.date``."""
+        with self._lock:
+            return self.dates[0].astype(object), self.dates[-1].astype(object)
+
+    # ============================================
+    # LOOKUP
+    # ============================================
+    def rows(self, sources, dests, airlines, dates):
+        """Row ids for airport labels, airline indices and travel dates; -1 outside the table."""
+        src = self.registry.indices(sources)
+        dst = self.registry.indices(dests)
+        day = (np.asarray(dates, dtype="datetime64[D]") - self.first_date).astype(np.int64)
+        src, dst, air, day = np.broadcast_arrays(src, dst, np.asarray(airlines), day)
+        route = self.route_id[src, dst]
+        ok = (route >= 0) & (day >= 0) & (day < self.shape[0])
+        rows = (day * self.shape[1] + route) * self.shape[2] + air
+        return np.where(ok, rows, -1)
+
+    def demand_multipliers(self, source, dest, travel_date, airlines=None):
+        """Current fare / base fare per airline.
+
+        ``travel_date`` may be an array of dates shaped to broadcast against
+        the airlines, e.g. ``dates[:, None]`` for a (days, airlines) grid.
+        Raises ``DateOutsideWindow`` for a date the table does not price.
+        """
+        air = np.arange(self.shape[2]) if airlines is None else np.asarray(airlines)
+        dates = np.asarray(travel_date, dtype="datetime64[D]")
+        with self._lock:
+            outside = (dates < self.dates[0]) | (dates > self.dates[-1])
+            if outside.any():
+                raise DateOutsideWindow(
+                    f"No fares for {np.ravel(dates)[np.ravel(outside)][0]}: the fare table covers "
+                    f"{self.dates[0]} to {self.dates[-1]}")
+            rows = self.rows(source, dest, air, dates)
+            return self.fare[rows] / np.maximum(self.base[rows], 1)
+
+    def reprice_results(self, flights, travel_date):
+        """``flights`` (any class and party size) with demand-adjusted prices."""
+        if not len(flights):
+            return flights
+        factor = self.demand_multipliers(flights.source, flights.dest, travel_date, flights.airline)
+        return flights.with_prices(np.rint(flights.price * factor).astype(np.int64))
+
+    def flight_rows(self, flight_nos, dates):
+        """Row ids for fare engine flight numbers and travel dates; -1 if not in the table."""
+        air, src, dst, slot = parse_flight_nos(flight_nos, len(self.registry), self.airlines)
+        # Only slot 0 flights are priced here; schedule waves use the others.
+        known = (air >= 0) & (slot == 0)
+        # Unknown flights look up the (0, 0) route, which does not exist.
+        rows = self.rows(np.where(known, src, 0), np.where(known, dst, 0), np.where(known, air, 0),
+                         np.asarray(dates, dtype="datetime64[D]"))
+        return np.where(known, rows, -1)
+
+    def keys(self, rows):
+        """(source code, dest code, ISO date, airline name) arrays for ``rows``."""
+        day, rest = np.divmod(rows, self.shape[1] * self.shape[2])
+        route, air = np.divmod(rest, self.shape[2])
+        return (self.registry.codes[self.route_src[route]], self.registry.codes[self.route_dst[route]],
+                np.datetime_as_string(self.dates[day], unit="D"), self.airlines["names"][air])
+
+    # ============================================
+    # EVENTS
+    # ============================================
+    def subscribe(self, listener):
+        """Call ``listener(event)`` after every repricing that changed a fare."""
+        self._listeners.append(listener)
+
+    def book(self, rows, seats=1):
+        """Sell ``seats`` on each row (repeats add up); returns the change event or None."""
+        return self._sell(rows, seats, "booking")
+
+    def release(self, rows, seats=1):
+        """Give back ``seats`` sold earlier on each row."""
+        return self._sell(rows, -np.asarray(seats), "release")
+
+    def _sell(self, rows, seats, reason):
+        rows = np.asarray(rows, dtype=np.int64).reshape(-1)
+        seats = np.broadcast_to(np.asarray(seats, dtype=np.int32), rows.shape)
+        if (rows < 0).any() or (rows >= len(self)).any():
+            raise IndexError("Row outside the fare table")
+        touched, inverse = np.unique(rows, return_inverse=True)
+        delta = np.bincount(inverse, weights=seats, minlength=len(touched)).astype(np.int32)
+        with self._lock:
+            sold = self.sold[touched] + delta
+            if (sold < 0).any() or (sold > self.capacity[touched]).any():
+                raise ValueError("Seats sold would fall outside 0..capacity")
+            if not self.open[touched].all():
+                raise ValueError("Cannot sell seats on a departed flight")
+            self.sold[touched] = sold
+            event = self._reprice(touched, reason)
+        return self._publish(event)
+
+    def advance(self, now=None):
+        """Move the clock to ``now`` and reprice rows that changed bucket or departed.
+
+        Once ``now`` is past the first day, the window rolls forward so it
+        still starts today and spans the same number of days.
+        """
+        when = _minute(now or datetime.now())
+        with self._lock:
+            t1 = int((when - self._epoch).astype(np.int64))
+            if t1 >= MINUTES_PER_DAY:
+                self._roll(t1 // MINUTES_PER_DAY)
+                t1 %= MINUTES_PER_DAY
+            t0 = self.now
+            if t1 <= t0:
+                # Wall clocks can step back; fares never un-expire, so wait it out.
+                return None
+            # A row moves bucket when departure - now crosses a step:
+            # t0 + step < departure <= t1 + step.
+            steps = DAYS_OUT_STEPS * MINUTES_PER_DAY
+            lo = np.searchsorted(self._sorted_departure, t0 + steps, side="right")
+            hi = np.searchsorted(self._sorted_departure, t1 + steps, side="right")
+            rows = np.concatenate([self._by_departure[a:b] for a, b in zip(lo, hi)])
+            self.now = t1
+            rows = np.unique(rows)
+            self.bucket[rows] = days_out_bucket(self.departure[rows] - t1)
+            self.open[rows] = self.departure[rows] > t1
+            event = self._reprice(rows, "clock", include=~self.open[rows])
+        return self._publish(event)
+
+    def _roll(self, days):
+        """Drop the first ``days`` days and price as many new ones at the end.
+
+        Departures are stored relative to the first day, so after shifting the
+        epoch they are unchanged and stay sorted; only per-row state moves.
+        """
+        self.first_date = self.first_date + days
+        self.dates = self.first_date + np.arange(self.shape[0])
+        self._epoch = np.datetime64(self.first_date, "m")
+        self.now -= days * MINUTES_PER_DAY
+
+        # Capacity is the same every day, so the tiled array needs no shift.
+        added = min(days, self.shape[0])
+        drop = added * self.shape[1] * self.shape[2]
+        self.base = np.concatenate([self.base[drop:], self._base_fares(self.dates[-added:])])
+        self.sold = np.concatenate([self.sold[drop:], np.zeros(drop, dtype=np.int32)])
+        for name in ("bucket", "open", "fare"):
+            values = getattr(self, name)
+            setattr(self, name, np.concatenate([values[drop:], values[:drop]]))
+        rows = np.arange(len(self) - drop, len(self))
+        self.bucket[rows] = days_out_bucket(self.departure[rows] - self.now)
+        self.open[rows] = self.departure[rows] > self.now
+        self.fare[rows] = self._fares(rows)
+        # Searches for the new days could not be priced before, so nothing
+        # cached is stale; generation still moves for caches keyed on the table.
+        self.generation += 1
+
+    def reprice_all(self):
+        """Recompute every fare from scratch; the full-scan fallback."""
+        with self._lock:
+            self.bucket[:] = days_out_bucket(self.departure - self.now)
+            self.open[:] = self.departure > self.now
+            event = self._reprice(np.arange(len(self)), "full")
+        return self._publish(event)
+
+    def _fares(self, rows):
+        factor = (load_multiplier(self.sold[rows], self.capacity[rows])
+                  * DAYS_OUT_MULTIPLIERS[self.bucket[rows]])
+        return np.rint(self.base[rows] * factor).astype(np.int32)
+
+    def _reprice(self, rows, reason, include=None):
+        """Update ``rows`` in place; the event lists those whose fare changed (or ``include``)."""
+        new = self._fares(rows)
+        old = self.fare[rows]
+        self.fare[rows] = new
+        changed = new != old if include is None else (new != old) | include
+        self.rows_repriced += len(rows)
+        if not changed.any():
+            return None
+        self.events += 1
+        self.generation += 1
+        rows = rows[changed]
+        return {"reason": reason, "rows": rows, "old": old[changed], "new": new[changed],
+                "open": self.open[rows].copy()}
+
+    def _publish(self, event):
+        if event is not None:
+            for listener in list(self._listeners):
+                listener(event)
+        return event
+
+    def stats(self):
+        with self._lock:
+            return {
+                "rows": len(self),
+                "sold": int(self.sold.sum()),
+                "open": int(self.open.sum()),
+                "events": self.events,
+                "generation": self.generation,
+                "rows_repriced": self.rows_repriced,
+            }
+
+
+class DateOutsideWindow(ValueError):
+    """A travel date before today or past the fare table's horizon."""
+
+
+def search_cache_invalidator(table, cache):
+    """Listener dropping cached searches whose route and date had a fare change."""
+    def on_change(event):
+        src, dst, days, _ = table.keys(event["rows"])
+        stale = set(zip(src.tolist(), dst.tolist(), days.tolist()))
+        codes = table.registry.codes
+
+        def affected(key):
+            try:
+                i, j = table.registry.indices([key[0], key[1]])
+            except KeyError:
+                return False
+            return (codes[i], codes[j], key[2]) in stale
+        cache.discard(affected)
+    return on_change
+
+
+def seat_booker(table):
+    """SeatInventory listener: confirmed seats are sold on the fare table, cancelled ones given back.
+
+    Flights outside the table (other routes, past the horizon or departed)
+    are skipped.
+    """
+    def on_booking(events):
+        for action in ("confirm", "cancel"):
+            picked = [e for e in events if e["action"] == action]
+            if not picked:
+                continue
+            seats = np.array([e["seats"] for e in picked])
+            # Held across the lookup and the sale so a window roll cannot move the rows.
+            with table._lock:
+                rows = table.flight_rows([e["flight_no"] for e in picked], [e["date"] for e in picked])
+                keep = rows >= 0
+                keep[keep] = table.open[rows[keep]]
+                if keep.any():
+                    sell = table.book if action == "confirm" else table.release
+                    sell(rows[keep], seats[keep])
+    return on_booking
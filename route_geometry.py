@@ -0,0 +1,95 @@
+import threading
+
+import numpy as np
+
+from airports import REGISTRY
+
+
+def _unit_vectors(lat, lon):
+    lat, lon = np.radians(lat), np.radians(lon)
+    return np.stack([np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)], axis=-1)
+
+
+def great_circle_arcs(lat1, lon1, lat2, lon2, n=64):
+    """Points along the great circle for R endpoint pairs, as (R, n) lat/lon arrays.
+
+    Spherical linear interpolation between the endpoint unit vectors; every
+    route and every point is computed in the same array expression.
+    """
+    a = _unit_vectors(np.atleast_1d(lat1), np.atleast_1d(lon1))[:, None, :]
+    b = _unit_vectors(np.atleast_1d(lat2), np.atleast_1d(lon2))[:, None, :]
+    t = np.linspace(0.0, 1.0, n)[None, :, None]
+
+    omega = np.arccos(np.clip(np.sum(a * b, axis=-1, keepdims=True), -1.0, 1.0))
+    sin_omega = np.sin(omega)
+    # Coincident endpoints: fall back to plain interpolation (all points equal).
+    degenerate = sin_omega < 1e-12
+    safe = np.where(degenerate, 1.0, sin_omega)
+    wa = np.where(degenerate, 1 - t, np.sin((1 - t) * omega) / safe)
+    wb = np.where(degenerate, t, np.sin(t * omega) / safe)
+    p = wa * a + wb * b
+
+    lat = np.degrees(np.arctan2(p[..., 2], np.hypot(p[..., 0], p[..., 1])))
+    # Unwrap so routes across the antimeridian do not jump by 360 degrees.
+    lon = np.degrees(np.unwrap(np.arctan2(p[..., 1], p[..., 0]), axis=1))
+    return lat, lon
+
+
+class RouteGeometry:
+    """Great-circle arcs per airport pair, computed once and shared.
+
+    Arcs are stored once per unordered pair; the reverse direction is a
+    reversed view of the same arrays.
+    """
+
+    def __init__(self, registry=REGISTRY, points=64):
+        self.registry = registry
+        self.points = points
+        self._arcs = {}
+        self._lock = threading.Lock()
+
+    def _fill(self, pairs):
+        missing = [p for p in pairs if p not in self._arcs]
+        if not missing:
+            return
+        i, j = np.array(missing).T
+        reg = self.registry
+        lats, lons = great_circle_arcs(reg.lat[i], reg.lon[i], reg.lat[j], reg.lon[j], self.points)
+        lats.flags.writeable = False
+        lons.flags.writeable = False
+        with self._lock:
+            for k, pair in enumerate(missing):
+                self._arcs.setdefault(pair, (lats[k], lons[k]))
+
+    def arc(self, source, dest):
+        """(lats, lons) from ``source`` to ``dest`` (names, codes or indices)."""
+        return self.arcs([(source, dest)], separate=False)
+
+    def arcs(self, routes, separate=True):
+        """Concatenated (lats, lons) for many routes.
+
+        With ``separate`` the routes are joined by NaN so a single map trace
+        draws them as disconnected lines.
+        """
+        if not routes:
+            return np.empty(0), np.empty(0)
+        src, dst = (self.registry.indices(list(side)) for side in zip(*routes))
+        lo, hi = np.minimum(src, dst), np.maximum(src, dst)
+        keys = list(zip(lo.tolist(), hi.tolist()))
+        self._fill(set(keys))
+
+        lat_parts, lon_parts = [], []
+        gap = np.array([np.nan])
+        for key, forward in zip(keys, (src <= dst).tolist()):
+            lats, lons = self._arcs[key]
+            if not forward:
+                lats, lons = lats[::-1], lons[::-1]
+            lat_parts.append(lats)
+            lon_parts.append(lons)
+            if separate:
+                lat_parts.append(gap)
+                lon_parts.append(gap)
+
+        if len(lat_parts) == 1:
+            return lat_parts[0], lon_parts[0]
+        return np.concatenate(lat_parts), np.concatenate(lon_parts)
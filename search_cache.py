@@ -0,0 +1,82 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+
+def search_key(source, dest, travel_date, class_type, passengers):
+    return (source, dest, travel_date.isoformat(), class_type, int(passengers))
+
+
+def query_rng(key):
+    """Generator seeded from the query itself, so equal queries draw equal values."""
+    digest = hashlib.blake2b(repr(key).encode(), digest_size=8).digest()
+    return np.random.default_rng(int.from_bytes(digest, "little"))
+
+
+class SearchCache:
+    """Thread-safe LRU cache of search results with a per-entry TTL.
+
+    One instance is shared by every session in the process, so lookups and
+    bookkeeping happen under a lock; the (cheap) computation itself runs
+    outside it.
+    """
+
+    def __init__(self, max_entries=512, ttl_seconds=900, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get_or_compute(self, key, compute):
+        """Return the cached value for ``key`` or store ``compute(query_rng(key))``."""
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        value = compute(query_rng(key))
+
+        with self._lock:
+            self._entries[key] = (now + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return value
+
+    def discard(self, predicate):
+        """Drop every entry whose key satisfies ``predicate``; returns how many."""
+        with self._lock:
+            stale = [key for key in self._entries if predicate(key)]
+            for key in stale:
+                del self._entries[key]
+            self.invalidations += len(stale)
+        return len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
@@ -0,0 +1,520 @@
+"""Shared seat inventory keyed by (flight_no, travel date), backed by SQLite in WAL mode.
+
+    python seat_inventory.py --load-test --processes 4 --threads 16 --seconds 10
+
+Every process opens the same database file. Seats are taken with a
+conditional ``UPDATE ... WHERE available >= seats``, so two buyers can
+never both get the last seat, in this process or any other. A hold
+reserves seats for ``hold_seconds``. It is then confirmed, or released
+and given back. Expired holds are swept back in the same way.
+
+Writes go through one writer thread per process. It drains whatever is
+queued into a single transaction (group commit), so a burst of bookings
+costs one commit instead of one per booking. Reads never touch the
+database: they come from an in-memory snapshot. Local commits update it
+directly. Other processes' commits are picked up through a change
+sequence at most every ``refresh_seconds``.
+
+Listeners registered with ``subscribe`` hear about confirmed and cancelled
+bookings made through this instance, after they commit and before the
+caller's ``confirm``/``release`` returns.
+"""
+import argparse
+import os
+import queue
+import sqlite3
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ProcessPoolExecutor
+from contextlib import contextmanager
+
+import numpy as np
+
+
+INVENTORY_PATH = os.environ.get(
+    "AEROVOYAGE_INVENTORY",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "inventory.db"),
+)
+HOLD_SECONDS = 600
+SWEEP_SECONDS = 5.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS inventory (
+    flight_no TEXT NOT NULL,
+    date TEXT NOT NULL,
+    capacity INTEGER NOT NULL,
+    available INTEGER NOT NULL CHECK (available >= 0),
+    seq INTEGER NOT NULL,
+    PRIMARY KEY (flight_no, date)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS inventory_seq ON inventory (seq);
+CREATE TABLE IF NOT EXISTS holds (
+    hold_id TEXT PRIMARY KEY,
+    flight_no TEXT NOT NULL,
+    date TEXT NOT NULL,
+    seats INTEGER NOT NULL,
+    expires_at REAL NOT NULL,
+    status TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS holds_open ON holds (status, expires_at);
+CREATE TABLE IF NOT EXISTS changes (id INTEGER PRIMARY KEY CHECK (id = 0), seq INTEGER NOT NULL);
+INSERT OR IGNORE INTO changes VALUES (0, 0);
+"""
+
+
+def day_key(travel_date):
+    return str(np.datetime64(travel_date, "D"))
+
+
+# ============================================
+# CONNECTIONS
+# ============================================
+def connect(path, timeout=30.0):
+    conn = sqlite3.connect(path, timeout=timeout, isolation_level=None, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    # WAL + NORMAL: commits survive a process crash; only power loss can drop the last few.
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+class ConnectionPool:
+    """A fixed set of connections handed out one caller at a time."""
+
+    def __init__(self, path, size=4, timeout=30.0):
+        self.path = path
+        self._idle = queue.LifoQueue()
+        for _ in range(size):
+            self._idle.put(connect(path, timeout))
+
+    @contextmanager
+    def connection(self):
+        conn = self._idle.get()
+        try:
+            yield conn
+        finally:
+            self._idle.put(conn)
+
+    def close(self):
+        while not self._idle.empty():
+            self._idle.get_nowait().close()
+
+
+# ============================================
+# INVENTORY
+# ============================================
+class SeatInventory:
+    """Holds, confirmations and releases with no oversells across processes."""
+
+    def __init__(self, path=INVENTORY_PATH, pool_size=4, hold_seconds=HOLD_SECONDS,
+                 max_batch=512, refresh_seconds=0.5, clock=time.time):
+        self.path = path
+        self.hold_seconds = hold_seconds
+        self.max_batch = max_batch
+        self.refresh_seconds = refresh_seconds
+        self._clock = clock
+        self.pool = ConnectionPool(path, pool_size)
+        with self.pool.connection() as conn:
+            conn.executescript(SCHEMA)
+
+        self._snapshot = {}  # (flight_no, date) -> (available seats, change seq)
+        self._seen_seq = 0
+        self._next_refresh = 0.0
+        self._lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._writer = None
+        self._listeners = []
+        self._last_sweep = 0.0
+
+        self.holds = 0
+        self.sold_out = 0
+        self.confirms = 0
+        self.releases = 0
+        self.expired = 0
+        self.batches = 0
+        self.writes = 0
+        self.listener_errors = 0
+
+    # ============================================
+    # READS
+    # ============================================
+    def _refresh(self):
+        """Pull rows other processes changed since the last look."""
+        now = time.monotonic()
+        if now < self._next_refresh:
+            return
+        with self.pool.connection() as conn:
+            (seq,) = conn.execute("SELECT seq FROM changes").fetchone()
+            rows = conn.execute("SELECT flight_no, date, available, seq FROM inventory "
+                                "WHERE seq > ?", (self._seen_seq,)).fetchall() \
+                if seq > self._seen_seq else []
+        with self._lock:
+            # The writer may have committed newer rows since the SELECT, so
+            # the snapshot is versioned and never moves back in seq.
+            self._merge(((flight_no, date), (available, row_seq))
+                        for flight_no, date, available, row_seq in rows)
+            self._seen_seq = max(self._seen_seq, seq)
+            self._next_refresh = now + self.refresh_seconds
+
+    def _merge(self, entries):
+        """Apply ((flight_no, date), (available, seq)) pairs unless the snapshot is newer; hold _lock."""
+        for key, value in entries:
+            current = self._snapshot.get(key)
+            if current is None or current[1] <= value[1]:
+                self._snapshot[key] = value
+
+    def availability(self, flight_nos, travel_date, default=-1):
+        """Seats left per flight as an int64 array; ``default`` where unknown."""
+        self._refresh()
+        date = day_key(travel_date)
+        defaults = np.broadcast_to(np.asarray(default, dtype=np.int64), (len(flight_nos),))
+        with self._lock:
+            return np.array([self._snapshot.get((str(f), date), (d,))[0]
+                             for f, d in zip(flight_nos, defaults.tolist())], dtype=np.int64)
+
+    def with_live_seats(self, flights, travel_date):
+        """``flights`` with seats from the inventory, registering first-seen flights.
+
+        The fare engine's ``seats`` are each flight's capacity
+        (``fare_engine.seat_capacity``), so a flight starts with the same
+        seats whichever class or party size first searched it.
+        """
+        flight_nos = flights.flight_nos
+        self.ensure(flight_nos, travel_date, flights.seats)
+        return flights.with_seats(self.availability(flight_nos, travel_date, flights.seats))
+
+    # ============================================
+    # WRITES
+    # ============================================
+    def ensure(self, flight_nos, travel_date, capacity):
+        """Register flights not seen before with ``capacity`` seats; known ones are untouched."""
+        date = day_key(travel_date)
+        capacity = np.broadcast_to(np.asarray(capacity, dtype=np.int64), (len(flight_nos),))
+        with self._lock:
+            rows = [(str(f), date, int(c)) for f, c in zip(flight_nos, capacity.tolist())
+                    if (str(f), date) not in self._snapshot]
+        if rows:
+            self._submit(self._op_ensure, rows).result()
+
+    def hold(self, flight_no, travel_date, seats=1):
+        """Reserve ``seats``; returns {'hold_id', 'expires_at'}, or None if sold out or unknown."""
+        if seats < 1:
+            raise ValueError("seats must be at least 1")
+        return self._submit(self._op_hold, str(flight_no), day_key(travel_date), int(seats)).result()
+
+    def confirm(self, hold_id):
+        """Turn an unexpired hold into a sale; False if it expired or is unknown."""
+        return self._submit(self._op_confirm, hold_id).result()
+
+    def release(self, hold_id):
+        """Give a hold's or a confirmed booking's seats back; False if neither is open."""
+        return self._submit(self._op_release, hold_id).result()
+
+    def expire_holds(self):
+        """Release every hold past its expiry; returns how many."""
+        return self._submit(self._op_expire).result()
+
+    def subscribe(self, listener):
+        """Call ``listener(events)`` with the bookings each batch confirmed or cancelled.
+
+        Events are {'action': 'confirm' or 'cancel', 'flight_no', 'date',
+        'seats'}; listeners run on the writer thread and must not block.
+        """
+        self._listeners.append(listener)
+
+    def _submit(self, op, *args):
+        future = Future()
+        self._queue.put((op, args, future))
+        if self._writer is None:
+            with self._lock:
+                if self._writer is None:
+                    self._writer = threading.Thread(target=self._write_loop,
+                                                     name="seat-inventory-writer", daemon=True)
+                    self._writer.start()
+        return future
+
+    def _write_loop(self):
+        with self.pool.connection() as conn:
+            while True:
+                batch = [self._queue.get()]
+                if batch[0] is None:
+                    return
+                while len(batch) < self.max_batch:
+                    try:
+                        batch.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+                stop = batch[-1] is None
+                self._write_batch(conn, [item for item in batch if item is not None])
+                if stop:
+                    return
+
+    def _write_batch(self, conn, batch):
+        """Run queued operations in one transaction, each under its own savepoint."""
+        now = self._clock()
+        if now - self._last_sweep >= SWEEP_SECONDS:
+            self._last_sweep = now
+            batch = [(self._op_expire, (), Future())] + batch
+        results, changed, events = [], {}, []
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            (seq,) = conn.execute("UPDATE changes SET seq = seq + 1 RETURNING seq").fetchone()
+            for op, args, future in batch:
+                conn.execute("SAVEPOINT op")
+                mark = len(events)
+                try:
+                    result = op(conn, seq, now, changed, events, *args)
+                except Exception as exc:
+                    conn.execute("ROLLBACK TO op")
+                    del events[mark:]
+                    result = exc
+                conn.execute("RELEASE op")
+                results.append(result)
+            conn.execute("COMMIT")
+        except Exception as exc:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            for _, _, future in batch:
+                future.set_exception(exc)
+            return
+
+        with self._lock:
+            self._merge((key, (available, seq)) for key, available in changed.items())
+            if seq == self._seen_seq + 1:
+                # Nobody else committed in between, so the snapshot is current.
+                self._seen_seq = seq
+            self.batches += 1
+            self.writes += len(batch)
+        if events:
+            for listener in list(self._listeners):
+                try:
+                    listener(events)
+                except Exception:
+                    # The batch is committed; a failing listener must not strand its callers.
+                    with self._lock:
+                        self.listener_errors += 1
+        for (_, _, future), result in zip(batch, results):
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    # Operations run on the writer thread inside the batch transaction and
+    # record the new availability of every row they touch in ``changed`` and
+    # every booking they confirm or cancel in ``events``.
+    def _op_ensure(self, conn, seq, now, changed, events, rows):
+        conn.executemany("INSERT OR IGNORE INTO inventory VALUES (?, ?, ?, ?, ?)",
+                         [(f, d, c, c, seq) for f, d, c in rows])
+        for flight_no, date, _ in rows:
+            (changed[flight_no, date],) = conn.execute(
+                "SELECT available FROM inventory WHERE flight_no = ? AND date = ?",
+                (flight_no, date)).fetchone()
+
+    def _op_hold(self, conn, seq, now, changed, events, flight_no, date, seats):
+        row = conn.execute(
+            "UPDATE inventory SET available = available - ?, seq = ? "
+            "WHERE flight_no = ? AND date = ? AND available >= ? RETURNING available",
+            (seats, seq, flight_no, date, seats)).fetchone()
+        if row is None:
+            self.sold_out += 1
+            return None
+        changed[flight_no, date] = row[0]
+        hold_id = uuid.uuid4().hex
+        expires_at = now + self.hold_seconds
+        conn.execute("INSERT INTO holds VALUES (?, ?, ?, ?, ?, 'held')",
+                     (hold_id, flight_no, date, seats, expires_at))
+        self.holds += 1
+        return {"hold_id": hold_id, "expires_at": expires_at}
+
+    def _op_confirm(self, conn, seq, now, changed, events, hold_id):
+        row = conn.execute("UPDATE holds SET status = 'confirmed' "
+                           "WHERE hold_id = ? AND status = 'held' AND expires_at > ? "
+                           "RETURNING flight_no, date, seats", (hold_id, now)).fetchone()
+        if row is None:
+            return False
+        events.append({"action": "confirm", "flight_no": row[0], "date": row[1], "seats": row[2]})
+        self.confirms += 1
+        return True
+
+    def _give_back(self, conn, seq, changed, holds):
+        for flight_no, date, seats in holds:
+            (changed[flight_no, date],) = conn.execute(
+                "UPDATE inventory SET available = available + ?, seq = ? "
+                "WHERE flight_no = ? AND date = ? RETURNING available",
+                (seats, seq, flight_no, date)).fetchone()
+
+    def _op_release(self, conn, seq, now, changed, events, hold_id):
+        row = conn.execute("SELECT status FROM holds WHERE hold_id = ? "
+                           "AND status IN ('held', 'confirmed')", (hold_id,)).fetchone()
+        if row is None:
+            return False
+        holds = conn.execute("UPDATE holds SET status = 'released' WHERE hold_id = ? "
+                             "RETURNING flight_no, date, seats", (hold_id,)).fetchall()
+        self._give_back(conn, seq, changed, holds)
+        if row[0] == "confirmed":
+            flight_no, date, seats = holds[0]
+            events.append({"action": "cancel", "flight_no": flight_no, "date": date, "seats": seats})
+        self.releases += 1
+        return True
+
+    def _op_expire(self, conn, seq, now, changed, events):
+        holds = conn.execute("UPDATE holds SET status = 'expired' "
+                             "WHERE status = 'held' AND expires_at <= ? "
+                             "RETURNING flight_no, date, seats", (now,)).fetchall()
+        self._give_back(conn, seq, changed, holds)
+        self.expired += len(holds)
+        return len(holds)
+
+    # ============================================
+    # MAINTENANCE
+    # ============================================
+    def audit(self):
+        """Flights whose seats do not add up: sold + held must equal capacity - available."""
+        with self.pool.connection() as conn:
+            rows = conn.execute("""
+                SELECT i.flight_no, i.date, i.capacity, i.available, COALESCE(SUM(h.seats), 0)
+                FROM inventory i LEFT JOIN holds h
+                  ON h.flight_no = i.flight_no AND h.date = i.date
+                 AND h.status IN ('held', 'confirmed')
+                GROUP BY i.flight_no, i.date
+            """).fetchall()
+        bad = [r for r in rows if r[3] < 0 or r[4] > r[2] or r[2] - r[3] != r[4]]
+        return {"flights": len(rows), "inconsistent": bad}
+
+    def stats(self):
+        with self._lock:
+            return {
+                "flights": len(self._snapshot),
+                "holds": self.holds,
+                "sold_out": self.sold_out,
+                "confirms": self.confirms,
+                "releases": self.releases,
+                "expired": self.expired,
+                "batches": self.batches,
+                "writes_per_batch": self.writes / self.batches if self.batches else 0.0,
+                "listener_errors": self.listener_errors,
+            }
+
+    def close(self):
+        if self._writer is not None:
+            self._queue.put(None)
+            self._writer.join()
+            self._writer = None
+        self.pool.close()
+
+
+# ============================================
+# LOAD TEST
+# ============================================
+def _load_worker(path, threads, seconds, flights, confirm_share, seed):
+    """One process: ``threads`` buyers that hold, then confirm or release, until time is up."""
+    inventory = SeatInventory(path)
+    deadline = time.monotonic() + seconds
+    counts = {"ops": 0, "holds": 0, "sold_out": 0, "confirms": 0, "releases": 0}
+    latencies = []
+    lock = threading.Lock()
+
+    def buyer(k):
+        rng = np.random.default_rng((seed, k))
+        ops, held, sold_out, confirmed, released, lat = 0, 0, 0, 0, 0, []
+        while time.monotonic() < deadline:
+            started = time.perf_counter()
+            hold = inventory.hold(f"LT{rng.integers(flights)}", "2030-01-01", int(rng.integers(1, 4)))
+            if hold is None:
+                sold_out += 1
+            else:
+                held += 1
+                if rng.random() < confirm_share:
+                    confirmed += inventory.confirm(hold["hold_id"])
+                else:
+                    released += inventory.release(hold["hold_id"])
+                ops += 1
+            ops += 1
+            lat.append(time.perf_counter() - started)
+        with lock:
+            for name, value in zip(counts, (ops, held, sold_out, confirmed, released)):
+                counts[name] += value
+            latencies.extend(lat)
+
+    pool = [threading.Thread(target=buyer, args=(k,)) for k in range(threads)]
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    stats = inventory.stats()
+    inventory.close()
+    return counts, latencies, stats["writes_per_batch"]
+
+
+def load_test(path, processes=4, threads=16, seconds=10.0, flights=200, capacity=180,
+              confirm_share=0.8):
+    """Concurrent buyers against a fresh inventory; returns throughput and audit results."""
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+    setup = SeatInventory(path)
+    setup.ensure([f"LT{i}" for i in range(flights)], "2030-01-01", capacity)
+    setup.close()
+
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        parts = list(pool.map(_load_worker, [path] * processes, [threads] * processes,
+                              [seconds] * processes, [flights] * processes,
+                              [confirm_share] * processes, range(processes)))
+    elapsed = time.perf_counter() - started
+
+    totals = {name: sum(p[0][name] for p in parts) for name in parts[0][0]}
+    latencies = np.concatenate([p[1] for p in parts]) * 1000
+    checker = SeatInventory(path)
+    audit = checker.audit()
+    with checker.pool.connection() as conn:
+        (sold,) = conn.execute("SELECT COALESCE(SUM(seats), 0) FROM holds "
+                               "WHERE status = 'confirmed'").fetchone()
+    checker.close()
+    return {
+        **totals,
+        "seconds": elapsed,
+        "ops_per_s": totals["ops"] / elapsed,
+        "p50_ms": float(np.percentile(latencies, 50)),
+        "p99_ms": float(np.percentile(latencies, 99)),
+        "writes_per_batch": float(np.mean([p[2] for p in parts])),
+        "seats_sold": sold,
+        "capacity": flights * capacity,
+        "inconsistent": audit["inconsistent"],
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Seat inventory maintenance and load test.")
+    parser.add_argument("--db", default=INVENTORY_PATH)
+    parser.add_argument("--load-test", action="store_true",
+                        help="run concurrent hold/confirm traffic against a fresh --db")
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument("--threads", type=int, default=16, help="buyers per process")
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--flights", type=int, default=200)
+    parser.add_argument("--capacity", type=int, default=180)
+    args = parser.parse_args()
+
+    if not args.load_test:
+        inventory = SeatInventory(args.db)
+        released = inventory.expire_holds()
+        audit = inventory.audit()
+        inventory.close()
+        print(f"{audit['flights']} flights, {released} expired holds released, "
+              f"{len(audit['inconsistent'])} inconsistent")
+        sys.exit(1 if audit["inconsistent"] else 0)
+
+    if args.db == INVENTORY_PATH:
+        parser.error("--load-test recreates --db; pass a scratch path")
+    result = load_test(args.db, args.processes, args.threads, args.seconds,
+                       args.flights, args.capacity)
+    print(f"{result['ops']} operations in {result['seconds']:.1f}s: {result['ops_per_s']:.0f} ops/s "
+          f"(p50 {result['p50_ms']:.1f} ms, p99 {result['p99_ms']:.1f} ms, "
+          f"{result['writes_per_batch']:.1f} writes per commit)")
+    print(f"holds {result['holds']}, confirmed {result['confirms']}, released {result['releases']}, "
+          f"sold out {result['sold_out']}")
+    print(f"seats sold {result['seats_sold']} of {result['capacity']}, "
+          f"{len(result['inconsistent'])} inconsistent flights")
+    sys.exit(1 if result["inconsistent"] or result["seats_sold"] > result["capacity"] else 0)
@@ -0,0 +1,13 @@
+import pytest
+
+
+@pytest.fixture(scope="session")
+def trained_artifacts(tmp_path_factory):
+    """A small exportable ensemble trained by train.py (2 folds, 40 trees) in artifacts_v1/."""
+    pytest.importorskip("pyarrow")
+    pytest.importorskip("catboost")
+    pytest.importorskip("lightgbm")
+    from train import train
+
+    out = str(tmp_path_factory.mktemp("models") / "artifacts_v1")
+    return train(out, folds=2, workers=1, iterations=40, exportable=True, log=lambda _: None)
@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+
+from airports import CITIES, REGISTRY, AirportRegistry, haversine_np
+
+
+def test_matrix_matches_pairwise_haversine():
+    names = list(CITIES)
+    for i, a in enumerate(names):
+        for j, b in enumerate(names):
+            expected = haversine_np(CITIES[a]["lat"], CITIES[a]["lon"], CITIES[b]["lat"], CITIES[b]["lon"])
+            assert REGISTRY.matrix[i, j] == pytest.approx(expected, abs=1e-9)
+    np.testing.assert_array_equal(REGISTRY.matrix, REGISTRY.matrix.T)
+    assert REGISTRY.distance("Delhi", "Mumbai") == pytest.approx(1137, abs=5)
+
+
+def test_blocked_build_matches_one_block():
+    rng = np.random.default_rng(0)
+    n = 50
+    registry = AirportRegistry([f"A{i:02d}" for i in range(n)], [f"City {i}" for i in range(n)],
+                               rng.uniform(-60, 60, n), rng.uniform(-180, 180, n))
+    np.testing.assert_allclose(registry._build_matrix(block=7), registry._build_matrix(), rtol=0, atol=0)
+
+
+def test_indices_accept_names_codes_and_integers():
+    np.testing.assert_array_equal(REGISTRY.indices(["Delhi", "BOM", "DEL"]),
+                                  [REGISTRY.index["DEL"], REGISTRY.index["BOM"], REGISTRY.index["DEL"]])
+    np.testing.assert_array_equal(REGISTRY.indices(np.array([2, 0])), [2, 0])
+    np.testing.assert_allclose(REGISTRY.distances(["Delhi"], ["BOM"]), [REGISTRY.distance("DEL", "Mumbai")])
+    with pytest.raises(KeyError, match="Unknown airport 'XXX'"):
+        REGISTRY.indices(["XXX"])
+
+
+def test_from_file_reads_ourairports_columns(tmp_path):
+    path = tmp_path / "airports.csv"
+    path.write_text("iata_code,municipality,latitude_deg,longitude_deg\n"
+                    "DEL,Delhi,28.5562,77.1\nBOM,Mumbai,19.0896,72.8656\n,Heliport,10,10\n")
+    registry = AirportRegistry.from_file(str(path), dtype=np.float32)
+    assert registry.codes.tolist() == ["DEL", "BOM"]
+    assert registry.matrix.dtype == np.float32
+    assert registry.distance("DEL", "BOM") == pytest.approx(REGISTRY.distance("DEL", "BOM"), rel=1e-5)
@@ -0,0 +1,143 @@
+import asyncio
+from datetime import date, timedelta
+
+import pytest
+
+pytest.importorskip("aiohttp")
+
+from aiohttp.test_utils import TestClient, TestServer
+
+import api
+from prediction_cache import PredictionCache
+from seat_inventory import SeatInventory
+
+
+TRAVEL = (date.today() + timedelta(days=30)).isoformat()
+
+
+@pytest.fixture
+def make_app(tmp_path):
+    def make(**kwargs):
+        kwargs.setdefault("inventory", SeatInventory(str(tmp_path / "inventory.db")))
+        kwargs.setdefault("prediction_cache", PredictionCache(str(tmp_path / "predictions.db")))
+        return api.create_app(**kwargs)
+    return make
+
+
+def run(app, scenario):
+    async def main():
+        async with TestClient(TestServer(app)) as client:
+            return await scenario(client)
+    return asyncio.run(main())
+
+
+async def post(client, path, payload):
+    response = await client.post(path, json=payload)
+    return response.status, await response.json()
+
+
+def test_search_batches_and_caches(make_app):
+    query = {"source": "Mumbai", "dest": "DEL", "date": TRAVEL, "class": "Business", "passengers": 2}
+
+    async def scenario(client):
+        first = await post(client, "/search", {"queries": [query, {**query, "dest": "BLR"}]})
+        again = await post(client, "/search", {"queries": [query]})
+        health = await (await client.get("/health")).json()
+        return first, again, health
+
+    (status, body), (_, again), health = run(make_app(), scenario)
+    assert status == 200 and len(body["results"]) == 2
+    result = body["results"][0]
+    assert (result["class"], result["passengers"], len(result["flights"])) == ("Business", 2, 6)
+    assert again["results"][0] == result
+    assert health["search_cache"]["hits"] == 1
+
+
+def test_distance(make_app):
+    status, body = run(make_app(), lambda c: post(c, "/distance", {"pairs": [["BOM", "DEL"], ["Delhi", "Mumbai"]]}))
+    assert status == 200
+    assert body["distances_km"][0] == pytest.approx(body["distances_km"][1])
+
+
+@pytest.mark.parametrize("path, payload, message", [
+    ("/search", {"queries": []}, "non-empty list"),
+    ("/search", {"queries": [{"source": "BOM", "date": TRAVEL}]}, "'dest'"),
+    ("/search", {"queries": [{"source": "BOM", "dest": "XXX", "date": TRAVEL}]}, "Unknown airport"),
+    ("/search", {"queries": [{"source": "BOM", "dest": "DEL", "date": TRAVEL, "passengers": 12}]},
+     "passengers"),
+    ("/search", {"queries": [{"source": "BOM", "dest": "DEL", "date": "2000-01-01"}]},
+     "date must be between"),
+    ("/search", {"queries": [{"source": "BOM", "dest": "DEL", "date": "15/02/2030"}]},
+     "Invalid date"),
+    ("/distance", {"pairs": [["BOM"]]}, "[source, dest]"),
+    ("/distance", {"pairs": [["BOM", "XXX"]]}, "Unknown airport"),
+    ("/distance", {"pairs": [["BOM", 3]]}, "names or codes"),
+    ("/hold", {"flight_no": "6E101", "date": TRAVEL, "seats": "two"}, "whole number"),
+    ("/predict", {"rows": [{"Airline": "IndiGo"}]}, "Missing raw columns"),
+])
+def test_bad_requests(make_app, path, payload, message):
+    status, body = run(make_app(), lambda c: post(c, path, payload))
+    assert status == 400 and message in body["error"]
+
+
+def test_internal_errors_are_not_reported_as_bad_requests(make_app, monkeypatch):
+    def broken(*args):
+        raise KeyError("internal")
+
+    monkeypatch.setattr(api, "generate_flights", broken)
+    query = {"source": "BOM", "dest": "DEL", "date": TRAVEL}
+    response = run(make_app(), lambda c: c.post("/search", json={"queries": [query]}))
+    assert response.status == 500
+
+
+def test_predict_through_the_batcher_and_cache(make_app, trained_artifacts):
+    from dataset import load_dataset
+
+    raw = load_dataset("test").head(5)
+    rows = raw.assign(Date_of_Journey=raw["Date_of_Journey"].dt.strftime("%d/%m/%Y"))
+    rows = rows.astype(object).where(rows.notna(), None).to_dict("records")
+
+    async def scenario(client):
+        first = await post(client, "/predict", {"rows": rows})
+        again = await post(client, "/predict", {"rows": rows[:2]})
+        health = await (await client.get("/health")).json()
+        return first, again, health
+
+    (status, body), (_, again), health = run(make_app(artifacts_dir=trained_artifacts), scenario)
+    assert status == 200 and len(body["prices"]) == 5
+    assert body["model_version"].startswith("artifacts_v1@")
+    assert again["prices"] == body["prices"][:2]
+    assert health["prediction_cache"]["hits"] == 2
+
+
+def test_predict_without_a_model(make_app, tmp_path):
+    row = {"Airline": "IndiGo", "Date_of_Journey": "24/03/2019", "Source": "Banglore",
+           "Destination": "New Delhi", "Dep_Time": "22:20", "Arrival_Time": "01:10",
+           "Duration": "2h 50m", "Total_Stops": "non-stop", "Additional_Info": "No info"}
+    status, body = run(make_app(artifacts_dir=str(tmp_path / "artifacts_v9")),
+                       lambda c: post(c, "/predict", {"rows": [row]}))
+    assert status == 503 and "Model unavailable" in body["error"]
+
+
+def test_hold_confirm_and_release(make_app):
+    async def scenario(client):
+        _, found = await post(client, "/search", {"queries": [{"source": "BOM", "dest": "DEL", "date": TRAVEL}]})
+        flight = found["results"][0]["flights"][0]
+        hold = {"flight_no": flight["flight_no"], "date": TRAVEL}
+        held = await post(client, "/hold", {**hold, "seats": 2})
+        unknown = await post(client, "/hold", {**hold, "flight_no": "XX1"})
+        confirmed = await post(client, "/confirm", {"hold_id": held[1]["hold_id"]})
+        twice = await post(client, "/confirm", {"hold_id": held[1]["hold_id"]})
+        _, after = await post(client, "/search", {"queries": [{"source": "BOM", "dest": "DEL", "date": TRAVEL}]})
+        released = await post(client, "/release", {"hold_id": held[1]["hold_id"]})
+        missing = await post(client, "/hold", {"date": TRAVEL})
+        return flight, held, unknown, confirmed, twice, after, released, missing
+
+    flight, held, unknown, confirmed, twice, after, released, missing = run(make_app(), scenario)
+    assert held[0] == 200 and "expires_at" in held[1]
+    assert unknown[0] == 409
+    assert confirmed == (200, {"hold_id": held[1]["hold_id"], "status": "confirmed"})
+    assert twice[0] == 409
+    assert after["results"][0]["flights"][0]["seats"] == flight["seats"] - 2
+    assert released[1]["status"] == "released"
+    assert missing == (400, {"error": "Hold is missing 'flight_no'"})
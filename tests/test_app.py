@@ -0,0 +1,39 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+pytest.importorskip("streamlit")
+pytest.importorskip("plotly")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Run in a child process so the app's shared resources (inventory file,
+# st.cache_resource) do not leak into other tests.
+SCRIPT = """
+import json, sys
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file(sys.argv[1], default_timeout=120).run()
+out = {"first": [e.message for e in at.exception]}
+figures = at.session_state["figure_cache"]
+builds = figures.builds
+at.radio(key="chart_sort").set_value("Price").run()
+at.selectbox[0].set_value("Chennai").run()
+out["after"] = [e.message for e in at.exception]
+out["rebuilt"] = figures.builds - builds
+out["text"] = " ".join(m.value for m in at.markdown)
+print(json.dumps(out))
+"""
+
+
+def test_app_renders_and_reuses_figures(tmp_path):
+    env = {**os.environ, "AEROVOYAGE_INVENTORY": str(tmp_path / "inventory.db")}
+    done = subprocess.run([sys.executable, "-c", SCRIPT, os.path.join(ROOT, "app.py")],
+                          cwd=str(tmp_path), env=env, capture_output=True, text=True, timeout=300)
+    assert done.returncode == 0, done.stderr[-2000:]
+    out = json.loads(done.stdout.strip().splitlines()[-1])
+    assert out["first"] == [] and out["after"] == []
+    assert out["rebuilt"] == 0
+    assert "Best Options" in out["text"] and "Fare Calendar" in out["text"]
@@ -0,0 +1,58 @@
+import glob
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from batch_score import PREDICTION_COLUMN, score_file
+
+
+@pytest.fixture(scope="module")
+def fares(tmp_path_factory):
+    from dataset import load_dataset
+
+    raw = load_dataset("test").head(120)
+    path = str(tmp_path_factory.mktemp("input") / "fares.csv")
+    raw.assign(Date_of_Journey=raw["Date_of_Journey"].dt.strftime("%d/%m/%Y")).to_csv(path, index=False)
+    return path
+
+
+def read_parts(out_dir):
+    return pd.concat([pd.read_parquet(p) for p in sorted(glob.glob(os.path.join(out_dir, "part-*")))],
+                     ignore_index=True)
+
+
+def test_chunks_match_one_batch_and_resume(fares, trained_artifacts, tmp_path):
+    from features import build_features
+    from freq_index import load_frequency_index
+    from predictor import load_predictor
+
+    out = str(tmp_path / "scores")
+    summary = score_file(fares, out, chunk_rows=50, workers=1, artifacts_dir=trained_artifacts,
+                         log=lambda _: None)
+    assert (summary["rows"], summary["chunks"]) == (120, 3)
+    raw = pd.read_csv(fares)
+    expected = load_predictor(trained_artifacts).predict_batch(
+        build_features(raw, load_frequency_index(trained_artifacts)))
+    np.testing.assert_allclose(read_parts(out)[PREDICTION_COLUMN], expected)
+
+    again = score_file(fares, out, chunk_rows=50, workers=1, artifacts_dir=trained_artifacts,
+                       log=lambda _: None)
+    assert (again["rows"], again["skipped_chunks"]) == (0, 3)
+    with pytest.raises(ValueError, match="different job"):
+        score_file(fares, out, chunk_rows=40, workers=1, artifacts_dir=trained_artifacts)
+    with pytest.raises(ValueError, match="different job"):
+        score_file(fares, out, chunk_rows=50, workers=1, artifacts_dir=trained_artifacts,
+                   cache_path=str(tmp_path / "predictions.db"))
+
+
+def test_worker_pool_writes_the_same_scores(fares, trained_artifacts, tmp_path):
+    one, pool = str(tmp_path / "one"), str(tmp_path / "pool")
+    score_file(fares, one, chunk_rows=25, workers=1, artifacts_dir=trained_artifacts, log=lambda _: None)
+    summary = score_file(fares, pool, chunk_rows=25, workers=2, artifacts_dir=trained_artifacts,
+                         log=lambda _: None)
+    assert summary["chunks"] == 5
+    pd.testing.assert_frame_equal(read_parts(one), read_parts(pool))
@@ -0,0 +1,89 @@
+import asyncio
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from batcher import BatcherStopped, MicroBatcher
+
+
+def doubled(frame):
+    if frame["x"].isna().any():
+        raise ValueError("x is missing")
+    return frame["x"].to_numpy() * 2.0
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_concurrent_submits_are_coalesced_and_split_back():
+    async def main():
+        batcher = MicroBatcher(doubled, max_wait_ms=20)
+        await batcher.start()
+        frames = [pd.DataFrame({"x": [i, i + 0.5]}) for i in range(5)]
+        results = await asyncio.gather(*(batcher.submit(f) for f in frames))
+        await batcher.stop()
+        return frames, results, batcher.batches
+
+    frames, results, batches = run(main())
+    for frame, result in zip(frames, results):
+        np.testing.assert_array_equal(result, frame["x"].to_numpy() * 2)
+    assert batches == 1
+
+
+def test_frame_missing_required_columns_is_rejected_before_batching():
+    async def main():
+        batcher = MicroBatcher(doubled, required_columns=["x"])
+        await batcher.start()
+        try:
+            with pytest.raises(ValueError, match="Missing raw columns"):
+                await batcher.submit(pd.DataFrame({"y": [1.0]}))
+            return await batcher.submit(pd.DataFrame({"x": [1.0]}))
+        finally:
+            await batcher.stop()
+
+    np.testing.assert_array_equal(run(main()), [2.0])
+
+
+def test_bad_frame_fails_only_its_own_caller():
+    async def main():
+        batcher = MicroBatcher(doubled, max_wait_ms=20)
+        await batcher.start()
+        good = batcher.submit(pd.DataFrame({"x": [1.0, 2.0]}))
+        bad = batcher.submit(pd.DataFrame({"x": [np.nan]}))
+        results = await asyncio.gather(good, bad, return_exceptions=True)
+        await batcher.stop()
+        return results
+
+    good, bad = run(main())
+    np.testing.assert_array_equal(good, [2.0, 4.0])
+    assert isinstance(bad, ValueError)
+
+
+def test_stop_fails_in_flight_and_queued_callers():
+    release = threading.Event()
+
+    def slow(frame):
+        release.wait(5)
+        return frame["x"].to_numpy()
+
+    async def main():
+        batcher = MicroBatcher(slow, max_batch_rows=1, max_wait_ms=0)
+        await batcher.start()
+        first = asyncio.ensure_future(batcher.submit(pd.DataFrame({"x": [1.0]})))
+        second = asyncio.ensure_future(batcher.submit(pd.DataFrame({"x": [2.0]})))
+        await asyncio.sleep(0.05)
+        await batcher.stop()
+        results = await asyncio.wait_for(asyncio.gather(first, second, return_exceptions=True), 1)
+        release.set()
+        return results
+
+    assert all(isinstance(r, BatcherStopped) for r in run(main()))
+
+
+def test_submit_before_start_is_refused():
+    batcher = MicroBatcher(doubled)
+    with pytest.raises(RuntimeError, match="not started"):
+        run(batcher.submit(pd.DataFrame({"x": [1.0]})))
@@ -0,0 +1,26 @@
+from benchmark import CASES, compare, measure, run_benchmarks
+
+
+def test_every_case_runs_at_a_small_size(capsys):
+    report = run_benchmarks([6], repeat=2, only=[name for name in CASES if name != "startup"])
+    ran = set(report["results"]) | set(report["skipped"])
+    assert ran == {f"{name}@6" if sized else name for name, (_, sized) in CASES.items()
+                   if name != "startup"}
+    # Only cases needing the model files may be skipped.
+    assert set(report["skipped"]) <= {"inference"}
+    for result in report["results"].values():
+        assert result["p50_ms"] <= result["p99_ms"] and result["throughput_per_s"] > 0
+
+
+def test_measure_counts_items():
+    result = measure(lambda: None, repeat=5, warmup=0, items=10)
+    assert result["repeat"] == 5 and result["items_per_call"] == 10
+
+
+def test_compare_flags_slowdowns_over_the_threshold(capsys):
+    def report(**p50):
+        return {"results": {k: {"p50_ms": v} for k, v in p50.items()}}
+    baseline = report(search=1.0, charts=2.0, route_map=0.0)
+    current = report(search=1.3, charts=2.1, route_map=0.5, features=9.0)
+    assert compare(current, baseline, threshold=0.2) == ["search"]
+    assert "REGRESSION" in capsys.readouterr().out
@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+
+import fare_engine
+from calendar_features import (
+    HOLIDAY_DATES, HOLIDAYS_COVER_UNTIL, date_features, fit_date_multipliers,
+)
+
+
+def test_date_features_for_known_days():
+    cal = date_features(np.array(["2026-01-26", "2026-10-17", "2026-11-08", "NaT"],
+                                 dtype="datetime64[D]"))
+    np.testing.assert_array_equal(cal["journey_weekday"][:3], [0, 5, 6])
+    np.testing.assert_array_equal(cal["journey_is_weekend"][:3], [0, 1, 1])
+    np.testing.assert_array_equal(cal["is_holiday"][:3], [1, 0, 1])
+    np.testing.assert_array_equal(cal["travel_season_num"][:3], [0, 3, 3])
+    assert np.isnan(cal["journey_month"][3])
+
+
+def test_movable_holidays_cover_the_search_horizon():
+    from repricing import HORIZON_DAYS
+
+    today = np.datetime64("today", "D")
+    assert HOLIDAY_DATES.max() <= HOLIDAYS_COVER_UNTIL
+    assert today + HORIZON_DAYS <= HOLIDAYS_COVER_UNTIL, "extend HOLIDAY_DATES"
+    # Every covered year has its movable festivals listed.
+    years = set(HOLIDAY_DATES.astype("datetime64[Y]").astype(int) + 1970)
+    assert {int(str(today)[:4]), int(str(today + HORIZON_DAYS)[:4])} <= years
+
+
+def test_fare_engine_multipliers_match_the_training_data():
+    pytest.importorskip("pyarrow")
+    from dataset import load_dataset
+    from features import _journey_dates
+
+    train = load_dataset("train").dropna(subset=["Total_Stops"])
+    groups = train.groupby(["Airline", "Source", "Destination", "Total_Stops"],
+                           observed=True).ngroup().to_numpy()
+    fitted = fit_date_multipliers(_journey_dates(train["Date_of_Journey"]),
+                                  train["Price"].to_numpy(), groups)
+    np.testing.assert_allclose(fare_engine.SEASON_MULTIPLIERS, fitted["season"], atol=5e-4)
+    assert fare_engine.WEEKEND_MULTIPLIER == pytest.approx(fitted["weekend"], abs=5e-4)
+    assert fare_engine.HOLIDAY_MULTIPLIER == pytest.approx(fitted["holiday"], abs=5e-4)
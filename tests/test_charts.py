@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("plotly")
+
+from charts import FigureCache
+from fare_engine import generate_flights
+from ui_templates import flight_card, stat_card
+
+
+def test_figures_are_built_once_and_updated_per_key():
+    figures = FigureCache()
+    first = figures.bar("price", ("q1", "Price"), "Price", "₹", x=["a", "b"], y=[1, 2],
+                        colors=["#fff", "#000"], text=["1", "2"])
+    again = figures.bar("price", ("q1", "Price"), "Price", "₹", x=["c"], y=[9],
+                        colors=["#fff"], text=["9"])
+    assert again is first and list(first.data[0].y) == [1, 2]
+    figures.bar("price", ("q2", "Price"), "Price", "₹", x=["c"], y=[9], colors=["#fff"], text=["9"])
+    assert list(first.data[0].y) == [9]
+    figures.heatmap("cal", np.ones((2, 7)), ["w1", "w2"], np.full((2, 7), "d"))
+    assert (figures.builds, figures.updates) == (2, 3)
+
+
+def test_route_map_centres_on_the_route():
+    fig = FigureCache().route_map(("DEL", "BOM"), [28.5, 19.1], [77.1, 72.9],
+                                  [28.5, 19.1], [77.1, 72.9], ["DEL", "BOM"])
+    assert fig.layout.mapbox.center.lat == pytest.approx(23.8)
+
+
+def test_cards_render_records():
+    flights = generate_flights("Delhi", "Mumbai", "Economy", 1, rng=np.random.default_rng(0))
+    html = flight_card("cheapest", flights.record(flights.cheapest()), "Delhi", "Mumbai")
+    assert flights.flight_nos[flights.cheapest()] in html
+    assert f"₹{int(flights.price.min()):,}" in html
+    assert "42" in stat_card("Flights", 42, "found")
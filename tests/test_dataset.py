@@ -0,0 +1,64 @@
+import os
+
+import pandas as pd
+import pytest
+
+pytest.importorskip("pyarrow")
+pytest.importorskip("openpyxl")
+
+import dataset
+
+
+@pytest.fixture
+def workbook(tmp_path, monkeypatch):
+    monkeypatch.setattr(dataset, "CACHE_DIR", str(tmp_path / ".cache"))
+    path = str(tmp_path / "Fares.xlsx")
+    pd.DataFrame({
+        "Airline": ["IndiGo", "Air India", "IndiGo"],
+        "Date_of_Journey": ["24/03/2019", "1/05/2019", "9/06/2019"],
+        "Source": ["Banglore", "Kolkata", "Banglore"],
+        "Duration": ["2h 50m", "7h 25m", "19h"],
+        "Price": [3897, 7662, 13882],
+    }).to_excel(path, index=False)
+    return path
+
+
+def test_cache_round_trips_typed_columns(workbook):
+    frame = dataset.load_dataset(workbook)
+    pd.testing.assert_frame_equal(frame, dataset.read_workbook(workbook))
+    assert frame["Date_of_Journey"].dt.month.tolist() == [3, 5, 6]
+    assert isinstance(frame["Airline"].dtype, pd.CategoricalDtype)
+    assert frame["Price"].dtype == "int32"
+    assert dataset.load_dataset(workbook, columns=["Price"]).columns.tolist() == ["Price"]
+    assert dataset.load_dataset(workbook, as_arrow=True).num_rows == 3
+
+
+def test_rebuilds_only_when_the_workbook_changes(workbook):
+    parquet = dataset.build_cache(workbook)
+    built = os.stat(parquet).st_mtime_ns
+    # Touched but identical: the hash matches, so the cache is kept.
+    os.utime(workbook, ns=(built + 10**9, built + 10**9))
+    assert os.stat(dataset.build_cache(workbook)).st_mtime_ns == built
+
+    frame = pd.read_excel(workbook)
+    frame.loc[0, "Price"] = 1
+    frame.to_excel(workbook, index=False)
+    dataset.build_cache(workbook)
+    assert dataset.load_dataset(workbook)["Price"].tolist()[0] == 1
+
+
+def test_iter_batches(workbook):
+    sizes = [len(batch) for batch in dataset.iter_batches(workbook, 2)]
+    assert sizes == [2, 1]
+
+
+def test_same_named_workbooks_get_their_own_cache(workbook, tmp_path):
+    other = tmp_path / "other"
+    other.mkdir()
+    copy = str(other / "Fares.xlsx")
+    frame = pd.read_excel(workbook)
+    frame.loc[0, "Price"] = 1
+    frame.to_excel(copy, index=False)
+    assert dataset.cache_path(copy) != dataset.cache_path(workbook)
+    assert dataset.load_dataset(workbook)["Price"].tolist()[0] == 3897
+    assert dataset.load_dataset(copy)["Price"].tolist()[0] == 1
@@ -0,0 +1,45 @@
+from datetime import date
+
+import numpy as np
+
+import fare_calendar
+from fare_calendar import calendar_dates, calendar_grid, price_calendar, price_calendars
+from fare_engine import generate_flights
+
+
+def test_window_is_clipped_to_the_earliest_and_latest_day():
+    dates = calendar_dates(date(2026, 11, 10), 30, 30, earliest=date(2026, 11, 1))
+    assert str(dates[0]) == "2026-11-01" and str(dates[-1]) == "2026-12-10"
+    dates = calendar_dates(date(2026, 11, 10), 30, 30, latest=date(2026, 11, 20))
+    assert str(dates[0]) == "2026-10-11" and str(dates[-1]) == "2026-11-20"
+    assert len(calendar_dates(date(2026, 11, 10), 0, 89)) == 90
+
+
+def test_cells_match_a_search_for_that_day():
+    dates = calendar_dates(date(2026, 11, 10), 3, 3)
+    calendar = price_calendar("Delhi", "Mumbai", dates, "Business", 2)
+    assert calendar["price"].shape == (7, 6)
+    for i, day in enumerate(dates):
+        flights = generate_flights("Delhi", "Mumbai", "Business", 2, travel_date=day)
+        assert calendar["price"][i].tolist() == flights.price.tolist()
+    assert calendar["min_price"].tolist() == calendar["price"].min(axis=1).tolist()
+    assert set(calendar["cheapest_airline"]) <= {"GoAir"}
+
+
+def test_many_routes_match_single_route_calendars(monkeypatch):
+    dates = calendar_dates(date(2026, 11, 10), 0, 13)
+    routes = [("DEL", "BOM"), ("BLR", "CCU"), ("MAA", "HYD")]
+    grid = price_calendars(routes, dates, workers=1)
+    monkeypatch.setattr(fare_calendar, "POOL_MIN_ROWS", 0)
+    pooled = price_calendars(routes, dates, workers=2)
+    for r, (source, dest) in enumerate(routes):
+        assert grid[r].tolist() == price_calendar(source, dest, dates, "Economy", 1)["min_price"].tolist()
+    np.testing.assert_array_equal(grid, pooled)
+
+
+def test_grid_starts_on_monday():
+    dates = calendar_dates(date(2026, 11, 4), 0, 9)  # Wednesday to the next Friday
+    z, labels, weeks = calendar_grid(price_calendar("DEL", "BOM", dates, "Economy", 1))
+    assert z.shape == (2, 7) and weeks.tolist() == ["2026-11-02", "2026-11-09"]
+    assert np.isnan(z[0, :2]).all() and np.isnan(z[1, 5:]).all()
+    assert labels[0, 2] == "2026-11-04" and labels[1, 4] == "2026-11-13"
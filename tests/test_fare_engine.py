@@ -0,0 +1,85 @@
+import numpy as np
+import pytest
+
+from airports import REGISTRY
+from fare_engine import (
+    AIRLINE_TABLE, DAILY_SLOTS, MAX_SEATS, MIN_SEATS, generate_flights, parse_flight_nos, price_batch,
+)
+
+
+def test_flight_numbers_and_capacity_are_stable_across_class_and_passengers():
+    a = generate_flights("Delhi", "Mumbai", "Economy", 1, rng=np.random.default_rng(1))
+    b = generate_flights("Delhi", "Mumbai", "Business", 5, rng=np.random.default_rng(2),
+                         travel_date="2026-12-25")
+    assert a.flight_nos.tolist() == b.flight_nos.tolist()
+    assert a.seats.tolist() == b.seats.tolist()
+    assert ((a.seats >= MIN_SEATS) & (a.seats < MAX_SEATS)).all()
+
+
+def test_flight_numbers_are_unique_across_routes_and_airlines():
+    n = len(REGISTRY)
+    src, dst = np.nonzero(~np.eye(n, dtype=bool))
+    batch = price_batch(src, dst, [0], [1], rng=np.random.default_rng(0))
+    keys = np.char.add(np.broadcast_to(AIRLINE_TABLE["prefix"], batch["flight_number"].shape),
+                       batch["flight_number"].astype(str))
+    assert len(np.unique(keys)) == keys.size
+    assert len(set(AIRLINE_TABLE["prefix"].tolist())) == len(AIRLINE_TABLE["prefix"])
+
+
+def test_schedule_numbers_never_collide_with_search_numbers():
+    from itinerary import build_schedule
+
+    n = len(REGISTRY)
+    src, dst = np.nonzero(~np.eye(n, dtype=bool))
+    batch = price_batch(src, dst, [0], [1], rng=np.random.default_rng(0))
+    searched = np.char.add(np.broadcast_to(AIRLINE_TABLE["prefix"], batch["flight_number"].shape),
+                           batch["flight_number"].astype(str)).reshape(-1)
+    legs = build_schedule(coverage=1.0, daily_frequency=DAILY_SLOTS - 1)
+    scheduled = np.char.add(AIRLINE_TABLE["prefix"][legs["airline"]],
+                            legs["flight_number"].astype(str))
+    assert not set(searched.tolist()) & set(scheduled.tolist())
+
+    air, s, d, slot = parse_flight_nos(scheduled, n)
+    np.testing.assert_array_equal(air, legs["airline"])
+    np.testing.assert_array_equal(s, legs["origin"])
+    np.testing.assert_array_equal(d, legs["dest"])
+    assert (slot >= 1).all()
+    assert (parse_flight_nos(searched, n)[3] == 0).all()
+    assert parse_flight_nos(["XX101", "6E99", "6Eabc"], n).tolist() == [[-1] * 3] * 4
+
+
+def test_prices_scale_with_class_and_passengers():
+    batch = price_batch(["DEL"], ["BOM"], [0, 2], [1, 3], rng=np.random.default_rng(0))
+    np.testing.assert_allclose(batch["price"][1] / batch["price"][0], 2.5 * 3, rtol=1e-3)
+    assert not price_batch(["DEL"], ["DEL"], [0], [1])["valid"][0]
+
+
+def test_batch_matches_the_per_airline_loop():
+    from airports import CITIES, haversine_np
+    from fare_engine import AIRLINES
+
+    flights = generate_flights("Mumbai", "Kolkata", "Premium Economy", 2,
+                               rng=np.random.default_rng(3))
+    a, b = CITIES["Mumbai"], CITIES["Kolkata"]
+    distance = haversine_np(a["lat"], a["lon"], b["lat"], b["lon"])
+    base_duration = int((distance / 770) * 60 + 30)
+    for idx, airline in enumerate(AIRLINES):
+        record = flights.record(idx)
+        assert record["name"] == airline["name"]
+        assert record["price"] == int(distance * 2.5 * airline["multiplier"] * 1.5 * 2)
+        assert base_duration <= record["duration"] < base_duration + 20
+        assert record["departure"] == f"{6 + idx * 2:02d}:{[0, 15, 30, 45][idx % 4]:02d}"
+        assert record["stops"] == idx % 3
+
+
+def test_same_airport_has_no_flights():
+    assert len(generate_flights("Delhi", "Delhi", "Economy", 1)) == 0
+
+
+def test_date_multiplier_weekends_and_holidays():
+    from fare_engine import HOLIDAY_MULTIPLIER, WEEKEND_MULTIPLIER, date_multiplier
+
+    # Tue, Sat and Diwali (Sun) in November, all post-monsoon.
+    factor = date_multiplier(np.array(["2026-11-03", "2026-11-07", "2026-11-08"], dtype="datetime64[D]"))
+    assert factor[1] / factor[0] == pytest.approx(WEEKEND_MULTIPLIER)
+    assert factor[2] / factor[0] == pytest.approx(WEEKEND_MULTIPLIER * HOLIDAY_MULTIPLIER)
@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from features import FEATURES, RAW_COLUMNS, build_features
+from freq_index import FrequencyIndex
+
+
+def raw_rows():
+    return pd.DataFrame({
+        "Airline": ["IndiGo", "Jet Airways Business", "IndiGo", None],
+        "Date_of_Journey": ["24/03/2019", "1/05/2019", "9/06/2019", "bad"],
+        "Source": ["Banglore", "Kolkata", "Banglore", "Delhi"],
+        "Destination": ["New Delhi", "Banglore", "New Delhi", "Cochin"],
+        "Dep_Time": ["22:20", "05:50", "09:25", "18:05"],
+        "Arrival_Time": ["01:10 22 Mar", "13:15", "04:25 10 Jun", "23:30"],
+        "Duration": ["2h 50m", "7h 25m", "19h", "25m"],
+        "Total_Stops": ["non-stop", "2 stops", "1 stop", np.nan],
+        "Additional_Info": ["No info", "No info", "In-flight meal not included", "No info"],
+    }, index=[10, 11, 12, 13])
+
+
+def test_parsed_columns():
+    X = build_features(raw_rows())
+    assert list(X.columns) == FEATURES
+    assert X.index.tolist() == [10, 11, 12, 13]
+    np.testing.assert_array_equal(X["duration_min"], [170, 445, 1140, 25])
+    np.testing.assert_array_equal(X["total_stops_num"][:3], [0, 2, 1])
+    assert np.isnan(X["total_stops_num"].iloc[3])
+    np.testing.assert_array_equal(X["dep_hour"], [22, 5, 9, 18])
+    np.testing.assert_array_equal(X["arr_min"], [10, 15, 25, 30])
+    np.testing.assert_array_equal(X["dep_is_night"], [1, 1, 0, 0])
+    np.testing.assert_array_equal(X["dep_is_peak"], [0, 0, 1, 1])
+    np.testing.assert_array_equal(X["is_premium_airline"], [0, 1, 0, 0])
+    np.testing.assert_array_equal(X["bad_duration_flag"], [0, 0, 0, 1])
+    np.testing.assert_array_equal(X["journey_weekday"][:3], [6, 2, 6])
+    assert np.isnan(X["journey_month"].iloc[3])
+    assert X["route"].astype(str).tolist()[:2] == ["Banglore_New Delhi", "Kolkata_Banglore"]
+
+
+def test_text_and_parsed_dates_agree():
+    raw = raw_rows().head(3)
+    parsed = raw.assign(Date_of_Journey=pd.to_datetime(raw["Date_of_Journey"], format="%d/%m/%Y"))
+    pd.testing.assert_frame_equal(build_features(raw), build_features(parsed))
+
+
+def test_frequencies_from_the_frame_or_an_index():
+    raw = raw_rows().head(3)
+    counted = build_features(raw)
+    looked_up = build_features(raw, FrequencyIndex.from_frame(raw, version="t"))
+    for column in ("route_freq", "airline_freq", "airline_route_freq"):
+        np.testing.assert_array_equal(counted[column], looked_up[column])
+    np.testing.assert_array_equal(counted["airline_route_freq"], [2, 1, 2])
+
+
+def test_missing_raw_columns():
+    with pytest.raises(ValueError, match="Dep_Time"):
+        build_features(raw_rows().drop(columns=["Dep_Time"]))
+    assert set(RAW_COLUMNS) <= set(raw_rows().columns)
@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+
+from fare_engine import AIRLINE_TABLE
+from flight_results import FlightResults, _thousands
+
+
+def results(price=(5200, 3100, 12999, 3100), duration=(130, 95, 140, 200)):
+    n = len(price)
+    return FlightResults("Delhi", "Mumbai", np.arange(n), price, duration,
+                         departure=[360, 490, 615, 1420], arrival=[490, 585, 755, 180],
+                         stops=[0, 1, 2, 0], seats=[9, 5, 20, 7],
+                         flight_number=[101, 101, 101, 101], airlines=AIRLINE_TABLE)
+
+
+def test_columns_are_read_only():
+    flights = results()
+    with pytest.raises(ValueError):
+        flights.price[0] = 1
+    changed = flights.with_prices([1, 2, 3, 4]).with_seats([0, 0, 0, 0])
+    assert changed.price.tolist() == [1, 2, 3, 4] and changed.seats.tolist() == [0] * 4
+    assert flights.price.tolist() == [5200, 3100, 12999, 3100]
+
+
+def test_queries():
+    flights = results()
+    assert flights.cheapest() == 1 and flights.fastest() == 1
+    assert flights.top_k("price", 3).tolist() == [1, 3, 0]
+    assert flights.top_k("duration", 10).tolist() == [1, 0, 2, 3]
+    assert flights.savings().tolist() == [7799, 9899, 0, 9899]
+    assert flights.avg_price() == 6099
+    assert len(FlightResults.empty("Delhi", "Delhi", AIRLINE_TABLE)) == 0
+
+
+def test_formatting_matches_record():
+    flights = results()
+    assert flights.price_str().tolist() == ["₹5,200", "₹3,100", "₹12,999", "₹3,100"]
+    assert flights.route_str()[3] == "23:40 → 03:00"
+    assert flights.flight_nos.tolist() == ["6E101", "AI101", "UK101", "SG101"]
+    record = flights.record(1)
+    assert record == {
+        "name": "Air India", "logo": AIRLINE_TABLE["logos"][1], "rating": 4.0,
+        "price": 3100, "duration": 95, "departure": "08:10", "arrival": "09:45",
+        "stops": 1, "seats": 5, "flight_no": "AI101", "duration_str": "1h 35m",
+        "stops_str": "1 stop(s)",
+    }
+    assert _thousands([0, 999, 1000, 1234567]).tolist() == ["0", "999", "1,000", "1,234,567"]
@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+
+from features import route_labels
+from freq_index import FrequencyIndex
+
+
+def frame():
+    return pd.DataFrame({
+        "Airline": ["IndiGo", "IndiGo", "Air India", "IndiGo", None],
+        "Source": ["Delhi", "Delhi", "Delhi", "Mumbai", "Delhi"],
+        "Destination": ["Cochin", "Cochin", "Cochin", "Hyderabad", "Cochin"],
+    })
+
+
+def test_counts_and_unseen_keys():
+    index = FrequencyIndex.from_frame(frame(), version="t")
+    freq = index.lookup(["IndiGo", "Air India", "Vistara"],
+                        ["Delhi_Cochin", "Delhi_Cochin", "Delhi_Cochin"])
+    np.testing.assert_array_equal(freq["airline_freq"], [3, 1, 0])
+    np.testing.assert_array_equal(freq["route_freq"], [3, 3, 3])
+    np.testing.assert_array_equal(freq["airline_route_freq"], [2, 1, 0])
+
+
+def test_subset_with_a_gapped_index_counts_its_own_rows():
+    raw = frame()
+    index = FrequencyIndex.from_frame(raw.iloc[[1, 2, 3]], version="t")
+    freq = index.lookup(["IndiGo", "Air India"], ["Delhi_Cochin", "Mumbai_Hyderabad"])
+    np.testing.assert_array_equal(freq["airline_freq"], [2, 1])
+    np.testing.assert_array_equal(freq["route_freq"], [2, 1])
+
+
+def test_save_and_load_round_trip(tmp_path):
+    index = FrequencyIndex.from_frame(frame(), version="t")
+    path = str(tmp_path / "freq_index_v1.json")
+    index.save(path)
+    loaded = FrequencyIndex.load(path)
+    labels = route_labels(frame()["Source"], frame()["Destination"])
+    expected, actual = index.lookup(frame()["Airline"], labels), loaded.lookup(frame()["Airline"], labels)
+    for name in expected:
+        np.testing.assert_array_equal(actual[name], expected[name])
+    assert loaded.version == "t"
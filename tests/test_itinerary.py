@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+from airports import REGISTRY
+from itinerary import MAX_STOPS, RouteGraph, build_schedule, fare_for
+
+
+def brute_force_costs(graph, src, dst, w_price, w_minutes, depart_after=0, window=1440,
+                      max_stops=MAX_STOPS, min_connection=45, max_connection=720):
+    """Cost of every valid itinerary, by exhaustive enumeration."""
+    costs = []
+
+    def extend(path):
+        last = path[-1]
+        here = int(graph.dest[last])
+        if here == dst:
+            elapsed = graph.arrival[last] - graph.departure[path[0]]
+            price = graph.price[list(path)].sum()
+            costs.append(w_price * price + w_minutes * elapsed)
+            return
+        if len(path) > max_stops:
+            return
+        visited = {int(graph.origin[leg]) for leg in path}
+        arrived = graph.arrival[last]
+        for leg in graph.departures(here, arrived + min_connection, arrived + max_connection):
+            if int(graph.dest[leg]) not in visited:
+                extend(path + (int(leg),))
+
+    for leg in graph.departures(src, depart_after, depart_after + window):
+        extend((int(leg),))
+    return sorted(costs)
+
+
+@pytest.mark.parametrize("seed", range(4))
+@pytest.mark.parametrize("objective,weights", [
+    ("price", (1.0, 0.0)), ("duration", (0.0, 1.0)), ((1.0, 10.0), (1.0, 10.0)),
+])
+def test_k_best_matches_brute_force(seed, objective, weights):
+    graph = RouteGraph(build_schedule(coverage=0.3, daily_frequency=1, seed=seed))
+    n = len(REGISTRY)
+    for src in range(n):
+        for dst in range(n):
+            if src == dst:
+                continue
+            expected = brute_force_costs(graph, src, dst, *weights)
+            for k in (1, 3):
+                got = [it["score"] for it in graph.k_best(src, dst, k=k, objective=objective)]
+                np.testing.assert_allclose(got, expected[:k], rtol=1e-9)
+
+
+def test_itinerary_shape_and_fare():
+    graph = RouteGraph(build_schedule())
+    (best,) = graph.k_best("Mumbai", "Delhi", k=1)
+    assert best["airports"][0] == "BOM" and best["airports"][-1] == "DEL"
+    assert best["stops"] == len(best["legs"]) - 1
+    assert best["duration"] == best["arrival"] - best["departure"]
+    assert fare_for(best, "Business", 2) == int(best["price"] * 2.5 * 2)
+
+
+def test_same_airport_has_no_itineraries():
+    assert RouteGraph(build_schedule()).k_best("BOM", "BOM") == []
@@ -0,0 +1,38 @@
+import json
+import logging
+import time
+
+from perf import PerfRecorder, RerunTimer
+
+
+def test_begin_closes_the_previous_section():
+    timer = RerunTimer()
+    timer.begin("A")
+    time.sleep(0.01)
+    timer.begin("B")
+    timer.end()
+    assert [label for label, _ in timer.spans] == ["A", "B"]
+    assert timer.spans[0][1] >= 0.01
+    assert timer.total() == sum(s for _, s in timer.spans)
+
+
+def test_recorder_keeps_history_and_prometheus_histograms():
+    recorder = PerfRecorder(history=2)
+    for _ in range(3):
+        timer = recorder.start()
+        timer.begin("SEARCH")
+        recorder.finish(timer)
+    assert len(recorder.recent()) == 2
+    text = recorder.prometheus()
+    assert 'aerovoyage_section_seconds_count{section="search"} 3' in text
+
+
+def test_startup_phase_is_recorded_once(caplog):
+    recorder = PerfRecorder()
+    with caplog.at_level(logging.INFO, logger="aerovoyage.perf"):
+        assert recorder.mark_startup("imports", 0.5)
+        assert not recorder.mark_startup("imports", 9.0)
+    assert recorder.startup == {"imports": 0.5}
+    assert 'aerovoyage_startup_seconds{phase="imports"} 0.500000' in recorder.prometheus()
+    events = [json.loads(r.message) for r in caplog.records if r.message.startswith("{")]
+    assert [e["phase"] for e in events if e["event"] == "startup"] == ["imports"]
@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+
+from prediction_cache import CachedPredictor, PredictionCache, row_keys
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class CountingModel:
+    features = ["a", "b"]
+    version = "artifacts_v1@t"
+
+    def __init__(self):
+        self.rows = 0
+
+    def validate(self, frame):
+        return frame[self.features]
+
+    def predict_batch(self, frame):
+        self.rows += len(frame)
+        return frame["a"].to_numpy(np.float64) * 10 + frame["b"].to_numpy(np.float64)
+
+
+def test_row_keys_ignore_the_index_and_other_columns():
+    frame = pd.DataFrame({"a": [1, 2, 1], "b": [3.0, 4.0, 3.0], "c": ["x", "y", "z"]}, index=[7, 8, 9])
+    keys = row_keys(frame, ["a", "b"])
+    assert keys.dtype == np.int64 and keys[0] == keys[2] != keys[1]
+    np.testing.assert_array_equal(keys, row_keys(frame.reset_index(drop=True), ["a", "b"]))
+
+
+def test_get_and_put_are_namespaced_by_version(tmp_path):
+    cache = PredictionCache(str(tmp_path / "p.db"))
+    cache.put_many("v1", [1, 2, -3], [10.0, 20.0, 30.0])
+    values, found = cache.get_many("v1", [2, 4, -3])
+    assert found.tolist() == [True, False, True]
+    assert values[0] == 20.0 and np.isnan(values[1]) and values[2] == 30.0
+    assert not cache.get_many("v2", [1])[1].any()
+    # Another process (here: instance) sees the same entries.
+    assert PredictionCache(str(tmp_path / "p.db")).get_many("v1", [1])[0].tolist() == [10.0]
+    cache.put_many("v2", [1], [11.0])
+    assert cache.drop_other_versions("v2") == 3
+    assert cache.entries() == 1
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    clock = Clock()
+    cache = PredictionCache(str(tmp_path / "p.db"), max_entries=10, touch_seconds=0, clock=clock)
+    cache.put_many("v", np.arange(10), np.zeros(10))
+    clock.now += 1
+    cache.get_many("v", [0, 1])            # 0 and 1 are now the most recent
+    clock.now += 1
+    cache.put_many("v", [10], [0.0])      # over budget: down to 9 entries
+    assert cache.entries() == 9
+    _, found = cache.get_many("v", np.arange(11))
+    assert found[[0, 1, 10]].all() and found.sum() == 9
+    assert cache.stats()["evictions"] == 2
+
+
+def test_cached_predictor_only_sends_misses_to_the_model(tmp_path):
+    model = CountingModel()
+    predictor = CachedPredictor(model, PredictionCache(str(tmp_path / "p.db")))
+    frame = pd.DataFrame({"a": [1, 2, 1, 3], "b": [1, 2, 1, 3]})
+    np.testing.assert_array_equal(predictor.predict_batch(frame), [11, 22, 11, 33])
+    assert model.rows == 3                 # the repeated row is predicted once
+    np.testing.assert_array_equal(predictor.predict_batch(frame.iloc[[3, 0]]), [33, 11])
+    assert model.rows == 3
+    assert predictor.predict_batch(frame.head(0)).shape == (0,)
@@ -0,0 +1,45 @@
+import os
+import shutil
+
+import numpy as np
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from dataset import load_dataset
+from features import build_features
+from freq_index import load_frequency_index
+from predictor import EnsemblePredictor, load_meta, load_predictor
+
+
+@pytest.fixture(scope="module")
+def frame(trained_artifacts):
+    return build_features(load_dataset("test").head(200), load_frequency_index(trained_artifacts))
+
+
+def test_batch_is_the_weighted_blend_of_both_models(trained_artifacts, frame):
+    model = load_predictor(trained_artifacts)
+    X = model.validate(frame)
+    cb = model.catboost.predict(X.astype({c: str for c in model.categorical}))
+    lgb = model.lightgbm.predict(X.astype({c: "category" for c in model.categorical}))
+    expected = model.weights["CatBoost"] * cb + model.weights["LightGBM"] * lgb
+    np.testing.assert_allclose(model.predict_batch(frame), expected)
+    # Row order and batch size do not change a row's prediction.
+    np.testing.assert_allclose(model.predict_batch(frame.iloc[::-1].head(7)), expected[::-1][:7])
+    assert model.predict_batch(frame.head(0)).shape == (0,)
+
+
+def test_loaded_once_per_directory(trained_artifacts):
+    assert load_predictor(trained_artifacts) is load_predictor(trained_artifacts)
+    meta = load_meta(trained_artifacts)
+    assert load_predictor(trained_artifacts).version == f"artifacts_v1@{meta['created_at']}"
+
+
+def test_missing_inputs_are_reported(trained_artifacts, frame, tmp_path):
+    with pytest.raises(ValueError, match="route_freq"):
+        load_predictor(trained_artifacts).validate(frame.drop(columns=["route_freq"]))
+    partial = tmp_path / "artifacts_v1"
+    shutil.copytree(trained_artifacts, partial)
+    os.remove(partial / "lightgbm_model.txt")
+    with pytest.raises(FileNotFoundError, match="run train.py"):
+        EnsemblePredictor.from_dir(str(partial))
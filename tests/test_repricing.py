@@ -0,0 +1,146 @@
+from datetime import date, datetime
+
+import numpy as np
+import pytest
+
+from fare_calendar import calendar_dates, price_calendar
+from fare_engine import generate_flights
+from repricing import DateOutsideWindow, FareTable, search_cache_invalidator, seat_booker
+from search_cache import SearchCache, search_key
+from seat_inventory import SeatInventory
+
+
+NOW = datetime(2030, 1, 1, 9, 0)
+DAY = "2030-02-15"
+
+
+def make_table(**kwargs):
+    return FareTable(NOW.date(), days=60, now=NOW, **kwargs)
+
+
+def quote(table, rng=0):
+    flights = generate_flights("Delhi", "Mumbai", "Economy", 1, rng=np.random.default_rng(rng),
+                               travel_date=DAY)
+    return flights, table.reprice_results(flights, DAY)
+
+
+def test_bookings_raise_and_releases_restore_fares():
+    table = make_table(capacity=10)
+    row = table.rows(["DEL"], ["BOM"], [0], [DAY])
+    before = int(table.fare[row[0]])
+    event = table.book(row, 5)
+    assert event["reason"] == "booking" and int(event["new"][0]) > before
+    assert table.generation == 1
+    table.release(row, 5)
+    assert int(table.fare[row[0]]) == before
+    assert table.generation == 2
+
+
+def test_advance_matches_full_reprice_and_ignores_backward_steps():
+    table = make_table()
+    table.advance(datetime(2030, 1, 20, 12, 0))
+    fare = table.fare.copy()
+    assert table.advance(datetime(2030, 1, 10)) is None
+    table.reprice_all()
+    np.testing.assert_array_equal(table.fare, fare)
+    assert not table.open[table.rows(["DEL"], ["BOM"], [0], ["2030-01-20"])[0]]
+
+
+def test_window_rolls_forward_with_the_date():
+    table = make_table(capacity=10)
+    row = table.rows(["DEL"], ["BOM"], [0], [DAY])[0]
+    table.book([row], 6)
+    booked = int(table.fare[row])
+    generation = table.generation
+
+    table.advance(datetime(2030, 1, 3, 8, 0))
+    assert table.window() == (date(2030, 1, 3), date(2030, 3, 3))
+    assert table.generation > generation
+    row = table.rows(["DEL"], ["BOM"], [0], [DAY])[0]
+    assert table.sold[row] == 6 and table.fare[row] == booked
+
+    fresh = FareTable(date(2030, 1, 3), days=60, now=datetime(2030, 1, 3, 8, 0), capacity=10)
+    fresh.book([row], 6)
+    np.testing.assert_array_equal(table.fare, fresh.fare)
+    np.testing.assert_array_equal(table.open, fresh.open)
+
+
+def test_dates_outside_the_window_are_refused():
+    table = make_table()
+    with pytest.raises(DateOutsideWindow):
+        table.demand_multipliers("Delhi", "Mumbai", "2030-03-02")
+    with pytest.raises(DateOutsideWindow):
+        table.demand_multipliers("Delhi", "Mumbai", "2029-12-31")
+    assert table.demand_multipliers("Delhi", "Mumbai", "2030-03-01").shape == (6,)
+
+
+def test_fare_changes_drop_matching_cached_searches():
+    table = make_table(capacity=10)
+    cache = SearchCache()
+    table.subscribe(search_cache_invalidator(table, cache))
+    hit = search_key("Delhi", "Mumbai", datetime(2030, 2, 15).date(), "Economy", 1)
+    other = search_key("Delhi", "Mumbai", datetime(2030, 2, 16).date(), "Economy", 1)
+    computed = []
+
+    def search(key):
+        return cache.get_or_compute(key, lambda rng: computed.append(key))
+
+    search(hit), search(other)
+    table.book(table.rows(["DEL"], ["BOM"], [2], [DAY]), 6)
+    search(hit), search(other)
+    assert computed == [hit, other, hit]
+    assert cache.stats()["invalidations"] >= 1
+
+
+def test_confirmed_booking_raises_the_next_quote(tmp_path):
+    table = make_table(capacity=4)
+    inventory = SeatInventory(str(tmp_path / "inv.db"))
+    inventory.subscribe(seat_booker(table))
+    flights, first = quote(table)
+    inventory.ensure(flights.flight_nos, DAY, 4)
+
+    hold = inventory.hold(flights.flight_nos[0], DAY, 2)
+    _, held = quote(table, rng=1)
+    assert held.price.tolist() == first.price.tolist()
+
+    assert inventory.confirm(hold["hold_id"])
+    _, booked = quote(table, rng=2)
+    assert booked.price[0] > first.price[0]
+    assert booked.price[1:].tolist() == first.price[1:].tolist()
+
+    assert inventory.release(hold["hold_id"])
+    _, cancelled = quote(table, rng=3)
+    assert cancelled.price.tolist() == first.price.tolist()
+    assert inventory.stats()["listener_errors"] == 0
+    inventory.close()
+
+
+def test_selling_out_a_searched_flight_raises_its_fare(tmp_path):
+    table = make_table()
+    inventory = SeatInventory(str(tmp_path / "inv.db"))
+    inventory.subscribe(seat_booker(table))
+    flights, first = quote(table)
+    live = inventory.with_live_seats(first, DAY)
+    row = table.flight_rows(flights.flight_nos[:1], [DAY])[0]
+    assert live.seats[0] == table.capacity[row]
+
+    hold = inventory.hold(flights.flight_nos[0], DAY, int(live.seats[0]))
+    assert inventory.confirm(hold["hold_id"])
+    _, sold_out = quote(table, rng=1)
+    assert inventory.with_live_seats(sold_out, DAY).seats[0] == 0
+    assert table.sold[row] == table.capacity[row]
+    assert sold_out.price[0] > first.price[0]
+    assert inventory.stats()["listener_errors"] == 0
+    inventory.close()
+
+
+def test_calendar_cells_match_search_quotes():
+    table = make_table(capacity=4)
+    table.book(table.rows(["DEL"], ["BOM"], [1], [DAY]), 3)
+    dates = calendar_dates(datetime(2030, 2, 15).date(), 3, 3)
+    calendar = price_calendar("Delhi", "Mumbai", dates, "Economy", 1, fare_table=table)
+    _, quoted = quote(table)
+    day = int(np.flatnonzero(dates == np.datetime64(DAY))[0])
+    assert calendar["price"][day].tolist() == quoted.price.tolist()
+    base = price_calendar("Delhi", "Mumbai", dates, "Economy", 1)
+    assert calendar["price"][day, 1] > base["price"][day, 1]
@@ -0,0 +1,33 @@
+import numpy as np
+import pytest
+
+from airports import REGISTRY, haversine_np
+from route_geometry import RouteGeometry, great_circle_arcs
+
+
+def test_arc_points_lie_on_the_great_circle():
+    lat, lon = great_circle_arcs(28.5562, 77.1, 19.0896, 72.8656, n=33)
+    assert lat.shape == (1, 33)
+    assert (lat[0, 0], lon[0, 0]) == pytest.approx((28.5562, 77.1))
+    assert (lat[0, -1], lon[0, -1]) == pytest.approx((19.0896, 72.8656))
+    steps = haversine_np(lat[0, :-1], lon[0, :-1], lat[0, 1:], lon[0, 1:])
+    np.testing.assert_allclose(steps, REGISTRY.distance("DEL", "BOM") / 32, rtol=1e-6)
+
+
+def test_antimeridian_and_coincident_endpoints():
+    lat, lon = great_circle_arcs([0.0, 10.0], [170.0, 20.0], [0.0, 10.0], [-170.0, 20.0], n=5)
+    assert np.abs(np.diff(lon[0])).max() < 10
+    np.testing.assert_allclose(lat[1], 10.0)
+
+
+def test_pairs_are_cached_and_reversed():
+    geometry = RouteGeometry(points=16)
+    fwd = geometry.arc("Delhi", "Mumbai")
+    back = geometry.arc("BOM", "DEL")
+    np.testing.assert_array_equal(back[0], fwd[0][::-1])
+    assert len(geometry._arcs) == 1
+    with pytest.raises(ValueError):
+        fwd[0][0] = 0
+    lats, _ = geometry.arcs([("DEL", "BOM"), ("BLR", "MAA")])
+    assert len(lats) == 2 * 17 and np.isnan(lats[16]) and np.isnan(lats[-1])
+    assert geometry.arcs([])[0].shape == (0,)
@@ -0,0 +1,51 @@
+from datetime import date
+
+import numpy as np
+
+from fare_engine import generate_flights
+from search_cache import SearchCache, query_rng, search_key
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_equal_queries_draw_equal_results():
+    key = search_key("Delhi", "Mumbai", date(2026, 12, 1), "Economy", 2)
+    a = generate_flights("Delhi", "Mumbai", "Economy", 2, rng=query_rng(key))
+    b = generate_flights("Delhi", "Mumbai", "Economy", 2, rng=query_rng(key))
+    np.testing.assert_array_equal(a.duration, b.duration)
+    assert query_rng(key).integers(1 << 30) != query_rng(key[:-1] + (3,)).integers(1 << 30)
+
+
+def test_hits_expiry_and_lru_eviction():
+    clock = Clock()
+    cache = SearchCache(max_entries=2, ttl_seconds=10, clock=clock)
+    calls = []
+
+    def get(key):
+        return cache.get_or_compute(key, lambda rng: calls.append(key) or key)
+
+    get("a"), get("a"), get("b")
+    assert calls == ["a", "b"]
+    get("a")          # a is now the most recent
+    get("c")          # evicts b
+    get("b")
+    assert calls == ["a", "b", "c", "b"]
+    clock.now = 11
+    get("b")
+    assert calls[-1] == "b" and len(calls) == 5
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["evictions"], stats["size"]) == (2, 5, 2, 2)
+
+
+def test_discard_drops_matching_keys():
+    cache = SearchCache()
+    for key in ("DEL-BOM", "DEL-BLR", "BOM-DEL"):
+        cache.get_or_compute(key, lambda rng: 0)
+    assert cache.discard(lambda key: key.startswith("DEL")) == 2
+    assert cache.stats()["size"] == 1
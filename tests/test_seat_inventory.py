@@ -0,0 +1,97 @@
+import threading
+
+import numpy as np
+
+from fare_engine import generate_flights
+from seat_inventory import SeatInventory
+
+
+DAY = "2030-01-01"
+
+
+class Clock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def test_holds_never_oversell(tmp_path):
+    inventory = SeatInventory(str(tmp_path / "inv.db"))
+    inventory.ensure(["6E100"], DAY, 10)
+    results = []
+
+    def buyer():
+        for _ in range(5):
+            results.append(inventory.hold("6E100", DAY, 1))
+
+    threads = [threading.Thread(target=buyer) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert sum(r is not None for r in results) == 10
+    assert inventory.availability(["6E100"], DAY).tolist() == [0]
+    assert inventory.audit()["inconsistent"] == []
+    inventory.close()
+
+
+def test_confirm_release_and_expiry(tmp_path):
+    clock = Clock()
+    inventory = SeatInventory(str(tmp_path / "inv.db"), hold_seconds=60, clock=clock)
+    inventory.ensure(["AI101"], DAY, 5)
+    kept = inventory.hold("AI101", DAY, 2)
+    dropped = inventory.hold("AI101", DAY, 2)
+    lapsed = inventory.hold("AI101", DAY, 1)
+    assert inventory.hold("AI101", DAY, 1) is None
+    assert inventory.hold("XX999", DAY, 1) is None
+
+    assert inventory.confirm(kept["hold_id"])
+    assert inventory.release(dropped["hold_id"])
+    assert not inventory.release(dropped["hold_id"])
+    clock.now += 61
+    # The writer sweeps expired holds before the next batch runs.
+    assert not inventory.confirm(lapsed["hold_id"])
+    assert inventory.expire_holds() == 0
+    assert inventory.stats()["expired"] == 1
+    assert inventory.availability(["AI101"], DAY).tolist() == [3]
+    assert inventory.audit()["inconsistent"] == []
+    inventory.close()
+
+
+def test_other_instances_see_commits(tmp_path):
+    path = str(tmp_path / "inv.db")
+    a = SeatInventory(path, refresh_seconds=0)
+    b = SeatInventory(path, refresh_seconds=0)
+    a.ensure(["UK102"], DAY, 4)
+    assert b.availability(["UK102"], DAY).tolist() == [4]
+    a.hold("UK102", DAY, 3)
+    assert b.availability(["UK102"], DAY).tolist() == [1]
+    assert b.hold("UK102", DAY, 2) is None
+    assert a.availability(["UK102"], DAY).tolist() == [1]
+    a.close()
+    b.close()
+
+
+def test_stale_refresh_does_not_overwrite_a_newer_commit(tmp_path):
+    inventory = SeatInventory(str(tmp_path / "inv.db"))
+    inventory.ensure(["SG103"], DAY, 4)
+    inventory.hold("SG103", DAY, 1)
+    with inventory._lock:
+        # A refresh that read the row before the hold committed arrives late.
+        inventory._merge([(("SG103", DAY), (4, 1))])
+    assert inventory.availability(["SG103"], DAY).tolist() == [3]
+    inventory.close()
+
+
+def test_with_live_seats_keys_flights_across_searches(tmp_path):
+    inventory = SeatInventory(str(tmp_path / "inv.db"))
+    economy = generate_flights("Delhi", "Mumbai", "Economy", 1, rng=np.random.default_rng(1))
+    business = generate_flights("Delhi", "Mumbai", "Business", 4, rng=np.random.default_rng(2))
+    first = inventory.with_live_seats(economy, DAY)
+    inventory.hold(economy.flight_nos[0], DAY, 2)
+    again = inventory.with_live_seats(business, DAY)
+    assert again.seats[0] == first.seats[0] - 2
+    assert again.seats[1:].tolist() == first.seats[1:].tolist()
+    inventory.close()
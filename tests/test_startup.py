@@ -0,0 +1,27 @@
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# What app.py imports before its first paint; heavy libraries must load lazily.
+STARTUP_MODULES = ["airports", "charts", "fare_calendar", "fare_engine", "itinerary", "perf",
+                   "repricing", "route_geometry", "search_cache", "seat_inventory", "ui_templates"]
+HEAVY = ["pandas", "plotly", "catboost", "lightgbm", "pyarrow"]
+
+
+def test_startup_imports_leave_heavy_libraries_unloaded():
+    code = (f"import json, sys\nimport {', '.join(STARTUP_MODULES)}\n"
+            f"print(json.dumps([m for m in {HEAVY!r} if m in sys.modules]))")
+    done = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True,
+                          check=True)
+    assert json.loads(done.stdout) == []
+
+
+def test_charts_import_plotly_on_first_figure():
+    code = ("import sys, charts\nbefore = 'plotly' in sys.modules\n"
+            "charts.comparison_figure('t', 'y')\nprint(before, 'plotly' in sys.modules)")
+    done = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True,
+                          check=True)
+    assert done.stdout.split() == ["False", "True"]
@@ -0,0 +1,79 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+pytest.importorskip("pyarrow")
+
+import train as training
+from train import blend_weights, fold_ids, load_training_frame, train, training_features
+
+
+def test_fold_ids_are_balanced_and_seeded():
+    ids = fold_ids(103, 5)
+    assert np.bincount(ids).tolist() == [21, 21, 21, 20, 20]
+    np.testing.assert_array_equal(ids, fold_ids(103, 5))
+
+
+def test_fold_features_only_count_training_rows():
+    raw, _ = load_training_frame()
+    folds = fold_ids(len(raw), 5)
+    train_rows = folds != 0
+    X = training_features(raw, train_rows)
+    X_all = training_features(raw)
+    valid = np.flatnonzero(~train_rows)
+    counted = raw["Airline"][train_rows].value_counts()
+    expected = raw["Airline"].iloc[valid].map(counted).fillna(0).to_numpy(np.float64)
+    np.testing.assert_array_equal(X["airline_freq"].to_numpy()[valid], expected)
+    assert (X_all["airline_freq"].to_numpy()[valid] > expected).all()
+
+
+def test_cv_jobs_early_stop_on_training_rows_only(monkeypatch, tmp_path):
+    raw, y = load_training_frame()
+    raw, y = raw.head(300), y[:300]
+    folds = fold_ids(len(raw), 3)
+    seen = {}
+
+    def fake_fit(X, y_fit, params, threads, X_val=None, y_val=None):
+        seen["fit"], seen["stop"] = set(X.index), set(X_val.index)
+        return None, 1
+
+    monkeypatch.setattr(training, "fit_catboost", fake_fit)
+    monkeypatch.setattr(training, "predict", lambda family, model, X: np.zeros(len(X)))
+    training._init_worker(raw, y, folds)
+    config = {"catboost_params": {}, "iterations": 10, "threads": 1, "early_stop_share": 0.1}
+    training.cv_job("CatBoost", 1, config, str(tmp_path))
+    valid = set(np.flatnonzero(folds == 1).tolist())
+    assert seen["stop"] and not seen["stop"] & valid
+    assert not seen["fit"] & (valid | seen["stop"])
+
+
+def test_blend_weights_prefer_the_better_family():
+    y = np.linspace(1, 10, 50)
+    weights = blend_weights({"CatBoost": y, "LightGBM": y[::-1]}, y)
+    assert weights["CatBoost"] == pytest.approx(1.0) and weights["LightGBM"] == 0.0
+
+
+def test_quick_training_run_writes_artifacts(tmp_path):
+    pytest.importorskip("catboost")
+    pytest.importorskip("lightgbm")
+    out = train(str(tmp_path / "artifacts_v1"), folds=2, workers=1, iterations=20, log=lambda _: None)
+    with open(os.path.join(out, "meta_v1.json"), encoding="utf-8") as fh:
+        meta = json.load(fh)
+    assert set(meta["final_rounds"]) == {"CatBoost", "LightGBM"}
+    assert meta["cv_ensemble"]["R2"] > 0.3
+    assert sorted(os.listdir(out)) == sorted(
+        ["catboost_model.cbm", "lightgbm_model.txt", "freq_index_v1.json", "meta_v1.json"])
+
+
+def test_blend_weights_refit_when_one_family_goes_negative():
+    rng = np.random.default_rng(0)
+    y = rng.uniform(2000, 20000, 500)
+    good = y + rng.normal(0, 500, 500)
+    # Correlated with the error of ``good``: plain least squares weights it negatively.
+    bad = 0.5 * y + 2 * (good - y)
+    weights = blend_weights({"CatBoost": good, "LightGBM": bad}, y)
+    assert weights["LightGBM"] == 0.0
+    blended = weights["CatBoost"] * good
+    assert np.sqrt(np.mean((blended - y) ** 2)) <= np.sqrt(np.mean((good - y) ** 2))
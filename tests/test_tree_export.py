@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("pyarrow")
+pytest.importorskip("catboost")
+pytest.importorskip("lightgbm")
+
+from dataset import load_dataset
+from features import build_features
+from freq_index import load_frequency_index
+from predictor import EnsemblePredictor
+from tree_export import PARITY_TOLERANCE, TreeEnsemble, export, export_catboost, parity
+
+
+@pytest.fixture(scope="module")
+def artifacts(trained_artifacts):
+    export(trained_artifacts)
+    return trained_artifacts
+
+
+def test_tree_tables_match_the_native_models(artifacts):
+    diffs, rows = parity(artifacts, "test")
+    assert rows > 0
+    assert max(diffs.values()) <= PARITY_TOLERANCE, diffs
+
+
+def test_unseen_categories_and_missing_values(artifacts):
+    raw = load_dataset("test").head(50).copy()
+    raw["Airline"] = raw["Airline"].astype(object)
+    raw.loc[raw.index[:10], "Airline"] = "Unknown Air"
+    raw["Total_Stops"] = raw["Total_Stops"].astype(object)
+    raw.loc[raw.index[10:20], "Total_Stops"] = np.nan
+    frame = build_features(raw, load_frequency_index(artifacts))
+    expected = EnsemblePredictor.from_dir(artifacts).predict_batch(frame)
+    got = TreeEnsemble.open(artifacts).predict_batch(frame)
+    np.testing.assert_allclose(got, expected, rtol=PARITY_TOLERANCE, atol=1e-6)
+
+
+def test_ctr_splits_are_refused():
+    from catboost import CatBoostRegressor
+
+    rng = np.random.default_rng(0)
+    route = rng.integers(0, 40, 2000)
+    frame = pd.DataFrame({"route": route.astype(str), "x": rng.random(2000)})
+    model = CatBoostRegressor(iterations=30, depth=3, verbose=False, allow_writing_files=False)
+    model.fit(frame, route * 10.0 + frame["x"], cat_features=["route"])
+    with pytest.raises(ValueError, match="train.py --exportable"):
+        export_catboost(model, ["route", "x"], {"route": [str(i) for i in range(40)]}, {})
@@ -0,0 +1,401 @@
+"""Reproducible, parallel, resumable training of the CatBoost + LightGBM ensemble.
+
+    python train.py                       # next artifacts_vN/ from Dataset/Data_Train.xlsx
+    python train.py --folds 5 --workers 4
+    python train.py --iterations 200      # quick run with fewer trees
+
+K-fold CV runs every (fold, model family) job in a process pool. Each job
+checkpoints its out-of-fold predictions, so an interrupted run resumes
+from the jobs already finished. Each fold fits the frequency features on
+its own training rows, so the CV scores carry no validation-row counts.
+The final models are then fit on all rows.
+Blend weights come from a least-squares fit on the out-of-fold predictions.
+Everything is written to ``artifacts_vN.partial/``, which is renamed to
+``artifacts_vN/`` when complete. Its ``meta_vN.json`` has the meta_v3
+schema plus per-stage wall-clock timings.
+"""
+import argparse
+import glob
+import json
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import numpy as np
+
+from features import CATEGORICAL_COLUMNS, FEATURES
+from predictor import CATBOOST_FILE, LIGHTGBM_FILE, artifact_file
+
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+TARGET = "Price"
+SEED = 42
+
+# Tuned parameters from artifacts_v3.
+CATBOOST_PARAMS = {
+    "learning_rate": 0.05874190536964785,
+    "depth": 8,
+    "l2_leaf_reg": 1.8693471071174743,
+    "bagging_temperature": 3.661320460568728,
+    "random_seed": SEED,
+    "loss_function": "RMSE",
+    "n_estimators": 5000,
+    "od_type": "Iter",
+    "od_wait": 150,
+    "verbose": False,
+}
+
+# Opt-in profile (``--exportable``) for models tree_export.py will flatten:
+# one_hot_max_size above every categorical's cardinality (route has ~130
+# values) makes CatBoost one-hot encode instead of building CTR tables,
+# which the exporter cannot evaluate. It changes the model, so it is not
+# the default.
+EXPORTABLE_CATBOOST_PARAMS = {**CATBOOST_PARAMS, "one_hot_max_size": 255}
+
+LIGHTGBM_PARAMS = {
+    "objective": "regression",
+    "learning_rate": 0.03,
+    "num_leaves": 63,
+    "min_child_samples": 10,
+    "feature_fraction": 0.9,
+    "bagging_fraction": 0.9,
+    "bagging_freq": 1,
+    "seed": SEED,
+    "verbose": -1,
+}
+LIGHTGBM_EARLY_STOP = 150
+# Share of each CV job's training rows held out to pick the tree count.
+EARLY_STOP_SHARE = 0.1
+
+FAMILIES = ("CatBoost", "LightGBM")
+
+
+# ============================================
+# DATA
+# ============================================
+def load_training_frame(dataset="train"):
+    """(raw frame, target) for the training workbook."""
+    from dataset import load_dataset
+
+    raw = load_dataset(dataset)
+    return raw, raw[TARGET].to_numpy(np.float64)
+
+
+def training_features(raw, fit_rows=None):
+    """Model features for every row, with frequency counts fit on ``fit_rows`` only.
+
+    CV folds pass their training mask so validation rows never count
+    towards the frequencies they are scored with.
+    """
+    from features import build_features
+    from freq_index import FrequencyIndex
+
+    index = FrequencyIndex.from_frame(raw if fit_rows is None else raw[fit_rows], version="train")
+    return build_features(raw, index)[FEATURES]
+
+
+def fold_ids(n, folds, seed=SEED):
+    """Fold number per row from a seeded shuffle."""
+    ids = np.empty(n, dtype=np.int64)
+    ids[np.random.default_rng(seed).permutation(n)] = np.arange(n) % folds
+    return ids
+
+
+def early_stop_rows(n, fold, share=EARLY_STOP_SHARE, seed=SEED):
+    """Seeded mask of rows a CV job holds out from its training folds for early stopping."""
+    return np.random.default_rng(seed + fold).random(n) < share
+
+
+def metrics(y, pred):
+    err = pred - y
+    return {
+        "RMSE": float(np.sqrt(np.mean(err ** 2))),
+        "MAE": float(np.mean(np.abs(err))),
+        "MAPE%": float(np.mean(np.abs(err) / y) * 100),
+        "R2": float(1 - np.sum(err ** 2) / np.sum((y - y.mean()) ** 2)),
+    }
+
+
+def blend_weights(oof, y):
+    """Non-negative least-squares weights for the out-of-fold predictions."""
+    A = np.column_stack([oof[f] for f in FAMILIES])
+    w = np.zeros(len(FAMILIES))
+    active = np.arange(len(FAMILIES))
+    # Refit without the most negative weight until all are >= 0; clipping
+    # instead would leave the others sized for the dropped family's share.
+    while len(active):
+        fit = np.linalg.lstsq(A[:, active], y, rcond=None)[0]
+        if (fit >= 0).all():
+            w[active] = fit
+            break
+        active = np.delete(active, fit.argmin())
+    if not w.any():
+        w = np.full(len(FAMILIES), 1 / len(FAMILIES))
+    return dict(zip(FAMILIES, w.tolist()))
+
+
+# ============================================
+# MODEL FAMILIES
+# ============================================
+def _catboost_frame(X):
+    return X.astype({c: str for c in CATEGORICAL_COLUMNS})
+
+
+def _lightgbm_frame(X):
+    return X.astype({c: "category" for c in CATEGORICAL_COLUMNS})
+
+
+def fit_catboost(X, y, params, threads, X_val=None, y_val=None):
+    from catboost import CatBoostRegressor
+
+    model = CatBoostRegressor(**params, thread_count=threads, allow_writing_files=False)
+    eval_set = None if X_val is None else (_catboost_frame(X_val), y_val)
+    model.fit(_catboost_frame(X), y, cat_features=CATEGORICAL_COLUMNS, eval_set=eval_set,
+              use_best_model=eval_set is not None)
+    return model, model.get_best_iteration() + 1 if eval_set is not None else model.tree_count_
+
+
+def fit_lightgbm(X, y, params, rounds, threads, X_val=None, y_val=None):
+    import lightgbm as lgb
+
+    train_set = lgb.Dataset(_lightgbm_frame(X), y, categorical_feature=CATEGORICAL_COLUMNS)
+    kwargs = {}
+    if X_val is not None:
+        kwargs["valid_sets"] = [lgb.Dataset(_lightgbm_frame(X_val), y_val, reference=train_set)]
+        kwargs["callbacks"] = [lgb.early_stopping(LIGHTGBM_EARLY_STOP, verbose=False)]
+    model = lgb.train({**params, "num_threads": threads}, train_set, rounds, **kwargs)
+    return model, model.best_iteration or model.current_iteration()
+
+
+def predict(family, model, X):
+    if family == "CatBoost":
+        return np.asarray(model.predict(_catboost_frame(X)), dtype=np.float64)
+    return np.asarray(model.predict(_lightgbm_frame(X), num_iteration=model.best_iteration or None),
+                      dtype=np.float64)
+
+
+# ============================================
+# JOBS
+# ============================================
+_DATA = {}
+
+
+def _init_worker(raw, y, folds):
+    # The training frame is sent to each worker once, not with every job.
+    _DATA["raw"], _DATA["y"], _DATA["folds"] = raw, y, folds
+
+
+def _save_npz(path, **arrays):
+    tmp = f"{path}.tmp.npz"
+    np.savez(tmp, **arrays)
+    os.replace(tmp, path)
+
+
+def cv_job(family, fold, config, checkpoint_dir):
+    """Fit one family on all folds but ``fold``; checkpoint its out-of-fold predictions."""
+    raw, y, folds = _DATA["raw"], _DATA["y"], _DATA["folds"]
+    started = time.perf_counter()
+    valid = folds == fold
+    stop = ~valid & early_stop_rows(len(raw), fold, config["early_stop_share"])
+    train = ~valid & ~stop
+    X = training_features(raw, train)
+    if family == "CatBoost":
+        params = {**config["catboost_params"], "n_estimators": config["iterations"]}
+        model, best = fit_catboost(X[train], y[train], params, config["threads"],
+                                   X[stop], y[stop])
+    else:
+        model, best = fit_lightgbm(X[train], y[train], config["lightgbm_params"],
+                                   config["iterations"], config["threads"], X[stop], y[stop])
+    pred = predict(family, model, X[valid])
+    _save_npz(os.path.join(checkpoint_dir, f"{family}_fold{fold}.npz"),
+              pred=pred, best_iteration=best, seconds=time.perf_counter() - started)
+    return family, fold
+
+
+def final_job(family, rounds, config, out_dir):
+    """Fit ``family`` on every row for ``rounds`` trees and save it into ``out_dir``."""
+    y = _DATA["y"]
+    started = time.perf_counter()
+    X = training_features(_DATA["raw"])
+    if family == "CatBoost":
+        params = {**config["catboost_params"], "n_estimators": rounds}
+        params.pop("od_type", None)
+        params.pop("od_wait", None)
+        model, _ = fit_catboost(X, y, params, config["threads"])
+        path = os.path.join(out_dir, CATBOOST_FILE)
+    else:
+        model, _ = fit_lightgbm(X, y, config["lightgbm_params"], rounds, config["threads"])
+        path = os.path.join(out_dir, LIGHTGBM_FILE)
+    # Written under a temporary name so a killed run never leaves a half model behind.
+    model.save_model(f"{path}.tmp")
+    os.replace(f"{path}.tmp", path)
+    return family, time.perf_counter() - started
+
+
+def _run(pool, fn, jobs):
+    if pool is None or not jobs:
+        return [fn(*job) for job in jobs]
+    return list(pool.map(fn, *zip(*jobs)))
+
+
+# ============================================
+# PIPELINE
+# ============================================
+def next_artifacts_dir(root=ROOT):
+    """Resume a pending ``artifacts_vN.partial`` or start the next free version."""
+    partial = sorted(glob.glob(os.path.join(root, "artifacts_v*.partial")))
+    if partial:
+        return partial[-1][:-len(".partial")]
+    versions = [int(m.group(1)) for p in glob.glob(os.path.join(root, "artifacts_v*"))
+                if (m := re.fullmatch(r"artifacts_v(\d+)", os.path.basename(p)))]
+    return os.path.join(root, f"artifacts_v{max(versions, default=0) + 1}")
+
+
+def _load_config(work_dir, config):
+    path = os.path.join(work_dir, "train_config.json")
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as fh:
+            saved = json.load(fh)
+        if {k: v for k, v in saved.items() if k != "threads"} != \
+                {k: v for k, v in config.items() if k != "threads"}:
+            raise ValueError(f"{work_dir} was started with different settings; delete it to restart")
+        return
+    with open(path, "w", encoding="utf-8") as fh:
+        json.dump(config, fh, indent=2)
+
+
+def train(out_dir=None, dataset="train", folds=5, workers=None, iterations=None, exportable=False,
+          log=print):
+    """Run CV and final fits; returns the path of the finished artifacts directory.
+
+    ``exportable`` trains CatBoost with EXPORTABLE_CATBOOST_PARAMS so that
+    tree_export.py can flatten the model.
+    """
+    from freq_index import FrequencyIndex
+
+    timings = {}
+    started = stage = time.perf_counter()
+
+    def lap(name):
+        nonlocal stage
+        now = time.perf_counter()
+        timings[name] = round(now - stage, 3)
+        stage = now
+        log(f"{name}: {timings[name]:.1f}s")
+
+    out_dir = out_dir or next_artifacts_dir()
+    work_dir = f"{out_dir}.partial"
+    os.makedirs(work_dir, exist_ok=True)
+
+    raw, y = load_training_frame(dataset)
+    fold_of = fold_ids(len(raw), folds)
+    lap("load")
+
+    workers = workers or os.cpu_count() or 1
+    jobs = [(family, fold) for fold in range(folds) for family in FAMILIES]
+    catboost_params = EXPORTABLE_CATBOOST_PARAMS if exportable else CATBOOST_PARAMS
+    config = {
+        "dataset": dataset,
+        "rows": len(raw),
+        "folds": folds,
+        # Upper bound on trees for both families; early stopping picks the count.
+        "iterations": iterations or CATBOOST_PARAMS["n_estimators"],
+        "early_stop_share": EARLY_STOP_SHARE,
+        "catboost_params": catboost_params,
+        "lightgbm_params": LIGHTGBM_PARAMS,
+        # Split the cores between concurrent jobs instead of oversubscribing.
+        "threads": max(1, (os.cpu_count() or 1) // min(workers, len(jobs))),
+    }
+    _load_config(work_dir, config)
+
+    checkpoint = lambda family, fold: os.path.join(work_dir, f"{family}_fold{fold}.npz")  # noqa: E731
+    todo = [job for job in jobs if not os.path.exists(checkpoint(*job))]
+    log(f"CV: {len(jobs) - len(todo)}/{len(jobs)} fold jobs already done")
+    pool = None
+    if workers > 1:
+        pool = ProcessPoolExecutor(max_workers=min(workers, len(jobs)), initializer=_init_worker,
+                                   initargs=(raw, y, fold_of))
+    else:
+        _init_worker(raw, y, fold_of)
+    try:
+        for family, fold in _run(pool, cv_job, [(f, k, config, work_dir) for f, k in todo]):
+            log(f"  {family} fold {fold} done")
+        lap("cv")
+
+        oof = {family: np.empty(len(raw)) for family in FAMILIES}
+        rounds, fold_seconds = {}, {}
+        for family in FAMILIES:
+            best = []
+            for fold in range(folds):
+                with np.load(checkpoint(family, fold)) as ckpt:
+                    oof[family][fold_of == fold] = ckpt["pred"]
+                    best.append(int(ckpt["best_iteration"]))
+                    fold_seconds[f"{family}_fold{fold}"] = round(float(ckpt["seconds"]), 3)
+            # Final models fit on every row; each CV model fit on its training
+            # folds minus the early-stopping holdout.
+            fit_share = (folds - 1) / folds * (1 - config["early_stop_share"])
+            rounds[family] = min(config["iterations"], max(1, int(np.mean(best) / fit_share)))
+        weights = blend_weights(oof, y)
+
+        final = [(f, rounds[f], config, work_dir) for f in FAMILIES
+                 if not os.path.exists(os.path.join(work_dir, CATBOOST_FILE if f == "CatBoost"
+                                                    else LIGHTGBM_FILE))]
+        for family, seconds in _run(pool, final_job, final):
+            timings[f"final_{family}"] = round(seconds, 3)
+        lap("final_fit")
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    created_at = datetime.now().isoformat()
+    index = FrequencyIndex.from_frame(raw, version=created_at)
+    index.save(os.path.join(work_dir, os.path.basename(artifact_file(out_dir, "freq_index"))))
+    ensemble = sum(weights[f] * oof[f] for f in FAMILIES)
+    lap("write")
+    timings["fold_jobs"] = fold_seconds
+    timings["total"] = round(time.perf_counter() - started, 3)
+
+    meta = {
+        "created_at": created_at,
+        "features": FEATURES,
+        "categorical_columns": CATEGORICAL_COLUMNS,
+        "categorical_indices": [FEATURES.index(c) for c in CATEGORICAL_COLUMNS],
+        "best_params": {**catboost_params, "n_estimators": config["iterations"]},
+        "lightgbm_params": {**LIGHTGBM_PARAMS, "n_estimators": config["iterations"]},
+        "final_rounds": rounds,
+        "cv_catboost": metrics(y, oof["CatBoost"]),
+        "cv_lightgbm": metrics(y, oof["LightGBM"]),
+        "cv_ensemble": metrics(y, ensemble),
+        "ensemble_weights": weights,
+        "timings": timings,
+    }
+    meta_path = os.path.join(work_dir, os.path.basename(artifact_file(out_dir, "meta")))
+    with open(meta_path, "w", encoding="utf-8") as fh:
+        json.dump(meta, fh, indent=2)
+    os.remove(os.path.join(work_dir, "train_config.json"))
+    for path in glob.glob(os.path.join(work_dir, "*_fold*.npz")):
+        os.remove(path)
+    os.replace(work_dir, out_dir)
+    return out_dir
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train the fare ensemble into a new artifacts_vN/.")
+    parser.add_argument("--out", help="artifacts directory (default: next artifacts_vN)")
+    parser.add_argument("--dataset", default="train")
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--workers", type=int, help="parallel fold jobs (default: all cores)")
+    parser.add_argument("--iterations", type=int,
+                        help=f"max trees per model (default {CATBOOST_PARAMS['n_estimators']})")
+    parser.add_argument("--exportable", action="store_true",
+                        help="one-hot CatBoost categoricals so tree_export.py can flatten the model")
+    args = parser.parse_args()
+
+    path = train(args.out, args.dataset, args.folds, args.workers, args.iterations, args.exportable)
+    with open(artifact_file(path, "meta"), encoding="utf-8") as fh:
+        meta = json.load(fh)
+    print(f"Wrote {path}")
+    for name in ("cv_catboost", "cv_lightgbm", "cv_ensemble"):
+        print(f"{name:12s} RMSE {meta[name]['RMSE']:9.1f}  MAPE {meta[name]['MAPE%']:5.2f}%")
@@ -0,0 +1,438 @@
+"""Array tree tables for the ensemble, evaluated with NumPy from one mmap'd file.
+
+    python tree_export.py                               # artifacts_v3/trees_v3.bin
+    python tree_export.py --check Dataset/Test_set.xlsx # parity vs the native libraries
+
+Both models are flattened into plain arrays (feature index, threshold,
+children, leaf values) and written to ``trees_vN.bin``: a short JSON header
+followed by 64-byte aligned arrays. ``TreeEnsemble.open`` maps the file
+read-only, so every worker process on a host shares one copy of the model
+through the page cache, and neither catboost nor lightgbm is imported to
+serve predictions.
+
+CatBoost trees are oblivious: one (feature, threshold) per depth level,
+and the leaf index is the bit pattern of the level outcomes. Float and
+one-hot splits are supported; CTR splits are not, so the export refuses
+models trained without ``train.py --exportable``. LightGBM trees
+are stored as a flat node table walked level by level for all rows and
+trees at once. Categorical splits test a per-node bitset, as LightGBM
+does.
+"""
+import argparse
+import ast
+import json
+import mmap
+import os
+import sys
+import tempfile
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from predictor import (
+    ARTIFACTS_DIR, artifact_file, load_meta, model_version,
+)
+
+
+MAGIC = b"AVTREES1"
+ALIGN = 64
+FORMAT_VERSION = 1
+
+# Split kinds. CatBoost: x > t (NaN false), x > t (NaN true), x == t.
+CB_GREATER, CB_GREATER_NAN_TRUE, CB_EQUAL = 0, 1, 2
+# LightGBM missing types, as in its model dump.
+LGB_MISSING = {"None": 0, "Zero": 1, "NaN": 2}
+ZERO_THRESHOLD = 1e-35
+
+PARITY_TOLERANCE = 1e-6  # relative
+
+
+def trees_path(artifacts_dir=ARTIFACTS_DIR):
+    return artifact_file(artifacts_dir, "trees", ext="bin")
+
+
+# ============================================
+# FILE FORMAT
+# ============================================
+def _aligned(offset):
+    return (offset + ALIGN - 1) // ALIGN * ALIGN
+
+
+def write_tables(path, arrays, header):
+    """Write ``arrays`` (name -> ndarray) and a JSON ``header`` atomically."""
+    layout, offset = {}, 0
+    for name, arr in arrays.items():
+        arr = np.ascontiguousarray(arr)
+        arrays[name] = arr
+        layout[name] = {"dtype": arr.dtype.str, "shape": list(arr.shape), "offset": offset}
+        offset = _aligned(offset + arr.nbytes)
+    meta = json.dumps({**header, "format_version": FORMAT_VERSION, "arrays": layout}).encode()
+    data_start = _aligned(len(MAGIC) + 8 + len(meta))
+
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix=".tmp")
+    with os.fdopen(fd, "wb") as fh:
+        fh.write(MAGIC)
+        fh.write(len(meta).to_bytes(8, "little"))
+        fh.write(meta)
+        for name, arr in arrays.items():
+            fh.seek(data_start + layout[name]["offset"])
+            fh.write(arr.tobytes())
+        fh.truncate(data_start + offset)
+    os.replace(tmp, path)
+    return path
+
+
+def read_tables(path):
+    """(header, name -> read-only ndarray view into a shared mmap of ``path``)."""
+    with open(path, "rb") as fh:
+        buf = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+    if buf[:len(MAGIC)] != MAGIC:
+        raise ValueError(f"{path} is not a tree table file")
+    size = int.from_bytes(buf[len(MAGIC):len(MAGIC) + 8], "little")
+    header = json.loads(buf[len(MAGIC) + 8:len(MAGIC) + 8 + size])
+    if header["format_version"] != FORMAT_VERSION:
+        raise ValueError(f"{path}: format {header['format_version']}, expected {FORMAT_VERSION}")
+    data_start = _aligned(len(MAGIC) + 8 + size)
+    arrays = {}
+    for name, spec in header.pop("arrays").items():
+        dtype = np.dtype(spec["dtype"])
+        count = int(np.prod(spec["shape"], dtype=np.int64))
+        arrays[name] = np.frombuffer(buf, dtype=dtype, count=count,
+                                     offset=data_start + spec["offset"]).reshape(spec["shape"])
+    return header, arrays
+
+
+# ============================================
+# EXPORT
+# ============================================
+def catboost_hashes(model, frame, categorical):
+    """Category string -> CatBoost's 32-bit hash, from its Python export.
+
+    The model stores one-hot splits by hash only; the exporter needs the
+    training pool to emit the string -> hash table, which is read back
+    here as a literal (never executed).
+    """
+    from catboost import Pool
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "model.py")
+        model.save_model(path, format="python", pool=Pool(frame, cat_features=categorical))
+        with open(path, encoding="utf-8") as fh:
+            tree = ast.parse(fh.read())
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and getattr(node.targets[0], "id", None) == "cat_features_hashes":
+            return ast.literal_eval(node.value)
+    raise ValueError("CatBoost export has no cat_features_hashes table")
+
+
+def export_catboost(model, features, vocab, hashes):
+    """Oblivious trees as (T, D) split arrays plus (T, 2**D) leaf values."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "model.json")
+        model.save_model(path, format="json")
+        with open(path, encoding="utf-8") as fh:
+            dump = json.load(fh)
+
+    info = dump["features_info"]
+    float_cols = {f["feature_index"]: f["flat_feature_index"] for f in info.get("float_features", [])}
+    nan_true = {f["feature_index"] for f in info.get("float_features", [])
+                if f.get("nan_value_treatment") == "AsTrue"}
+    cat_cols = {f["feature_index"]: f["flat_feature_index"] for f in info.get("categorical_features", [])}
+    # Hash -> category code, per categorical column.
+    cat_codes = {
+        col: {hashes[v]: i for i, v in enumerate(vocab[features[col]]) if v in hashes}
+        for col in cat_cols.values()
+    }
+
+    trees = dump["oblivious_trees"]
+    depth = max((len(t["splits"]) for t in trees), default=0)
+    n = len(trees)
+    # Padding levels compare against +inf, so their bit is always 0.
+    feature = np.zeros((n, depth), dtype=np.int32)
+    threshold = np.full((n, depth), np.inf)
+    kind = np.full((n, depth), CB_GREATER, dtype=np.int8)
+    leaves = np.zeros((n, 2 ** depth))
+    for t, tree in enumerate(trees):
+        for d, split in enumerate(tree["splits"]):
+            if split["split_type"] == "FloatFeature":
+                idx = split["float_feature_index"]
+                feature[t, d] = float_cols[idx]
+                threshold[t, d] = split["border"]
+                kind[t, d] = CB_GREATER_NAN_TRUE if idx in nan_true else CB_GREATER
+            elif split["split_type"] == "OneHotFeature":
+                col = cat_cols[split["cat_feature_index"]]
+                feature[t, d] = col
+                # A category absent from the vocabulary can never match: code -2.
+                threshold[t, d] = cat_codes[col].get(split["value"], -2)
+                kind[t, d] = CB_EQUAL
+            else:
+                raise ValueError(f"Unsupported CatBoost split {split['split_type']!r} in tree {t}: "
+                                 "only float and one-hot splits can be exported; retrain with "
+                                 "`python train.py --exportable`")
+        values = tree["leaf_values"]
+        leaves[t, :len(values)] = values
+
+    scale, bias = dump.get("scale_and_bias", [1.0, [0.0]])
+    return {
+        "cb_feature": feature, "cb_threshold": threshold, "cb_kind": kind, "cb_leaves": leaves,
+    }, {"cb_scale": float(scale), "cb_bias": float(np.sum(bias))}
+
+
+def export_lightgbm(booster):
+    """Every tree's nodes in one table. Children >= 0 are nodes, < 0 are ~leaf."""
+    dump = booster.dump_model()
+    feature, threshold, is_cat, default_left, missing = [], [], [], [], []
+    left, right, cat_start, cat_end, cat_words, leaf_value, roots = [], [], [], [], [], [], []
+
+    def add(node):
+        if "split_index" not in node:
+            leaf_value.append(node["leaf_value"])
+            return ~(len(leaf_value) - 1)
+        i = len(feature)
+        feature.append(node["split_feature"])
+        default_left.append(node["default_left"])
+        missing.append(LGB_MISSING[node["missing_type"]])
+        left.append(0)
+        right.append(0)
+        if node["decision_type"] == "==":
+            cats = np.array([int(c) for c in str(node["threshold"]).split("||")], dtype=np.int64)
+            words = np.zeros(cats.max() // 32 + 1, dtype=np.uint32)
+            np.bitwise_or.at(words, cats // 32, (np.uint32(1) << (cats % 32).astype(np.uint32)))
+            is_cat.append(True)
+            threshold.append(0.0)
+            cat_start.append(len(cat_words))
+            cat_words.extend(words.tolist())
+        else:
+            is_cat.append(False)
+            threshold.append(float(node["threshold"]))
+            cat_start.append(len(cat_words))
+        cat_end.append(len(cat_words))
+        left[i] = add(node["left_child"])
+        right[i] = add(node["right_child"])
+        return i
+
+    for tree in dump["tree_info"]:
+        roots.append(add(tree["tree_structure"]))
+
+    return {
+        "lgb_feature": np.array(feature, dtype=np.int32),
+        "lgb_threshold": np.array(threshold, dtype=np.float64),
+        "lgb_is_cat": np.array(is_cat, dtype=bool),
+        "lgb_default_left": np.array(default_left, dtype=bool),
+        "lgb_missing": np.array(missing, dtype=np.int8),
+        "lgb_left": np.array(left, dtype=np.int32),
+        "lgb_right": np.array(right, dtype=np.int32),
+        "lgb_cat_start": np.array(cat_start, dtype=np.int32),
+        "lgb_cat_end": np.array(cat_end, dtype=np.int32),
+        "lgb_cat_words": np.array(cat_words, dtype=np.uint32),
+        "lgb_leaf_value": np.array(leaf_value, dtype=np.float64),
+        "lgb_roots": np.array(roots, dtype=np.int32),
+    }, {"lgb_feature_names": dump["feature_names"]}
+
+
+def export(artifacts_dir=ARTIFACTS_DIR, dataset="train", path=None):
+    """Flatten the native models in ``artifacts_dir`` into ``trees_vN.bin``."""
+    from dataset import load_dataset
+    from features import build_features
+    from freq_index import load_frequency_index
+    from predictor import EnsemblePredictor
+
+    native = EnsemblePredictor.from_dir(artifacts_dir)
+    features, categorical = native.features, native.categorical
+    if list(native.lightgbm.feature_name()) != features:
+        raise ValueError("LightGBM feature order differs from meta features")
+    # LightGBM's category lists fix the codes; CatBoost splits are mapped onto them.
+    vocab = dict(zip(categorical, (list(map(str, c)) for c in native.lightgbm.pandas_categorical)))
+
+    train = build_features(load_dataset(dataset), load_frequency_index(artifacts_dir))[features]
+    hashes = catboost_hashes(native.catboost, train.astype({c: str for c in categorical}), categorical)
+
+    cb_arrays, cb_header = export_catboost(native.catboost, features, vocab, hashes)
+    lgb_arrays, lgb_header = export_lightgbm(native.lightgbm)
+    header = {
+        "version": native.version,
+        "features": features,
+        "categorical": categorical,
+        "vocab": vocab,
+        "weights": native.weights,
+        **cb_header,
+        **lgb_header,
+    }
+    return write_tables(path or trees_path(artifacts_dir), {**cb_arrays, **lgb_arrays}, header)
+
+
+# ============================================
+# EVALUATION
+# ============================================
+class TreeEnsemble:
+    """Drop-in for ``EnsemblePredictor.predict_batch`` backed by mmap'd tree tables."""
+
+    def __init__(self, header, arrays, rows_per_chunk=None):
+        self.header = header
+        self.arrays = arrays
+        self.features = header["features"]
+        self.categorical = header["categorical"]
+        self.weights = header["weights"]
+        self.version = header["version"]
+        self._vocab = {c: pd.Index(v) for c, v in header["vocab"].items()}
+        self._cat_cols = [self.features.index(c) for c in self.categorical]
+        # Bound the (rows, trees, depth) temporaries to ~32 MB.
+        cells = max(1, arrays["cb_feature"].size + len(arrays["lgb_roots"]))
+        self.rows_per_chunk = rows_per_chunk or max(256, (1 << 22) // cells)
+        self._lgb_defaults()
+
+    def _lgb_defaults(self):
+        """Per-node routing of NaN and of zero, folded from LightGBM's missing types."""
+        a = self.arrays
+        missing, default_left = a["lgb_missing"], a["lgb_default_left"]
+        zero_goes_left = 0.0 <= a["lgb_threshold"]
+        # missing_type None treats NaN as 0; Zero and NaN send it to the default side.
+        self._nan_left = np.where(missing == LGB_MISSING["None"], zero_goes_left, default_left)
+        # -1: compare normally, else 0/1 for right/left.
+        self._zero_left = np.where(missing == LGB_MISSING["Zero"], default_left.astype(np.int8), -1)
+
+    @classmethod
+    def open(cls, artifacts_dir=ARTIFACTS_DIR):
+        header, arrays = read_tables(trees_path(artifacts_dir))
+        expected = model_version(load_meta(artifacts_dir), artifacts_dir)
+        if header["version"] != expected:
+            raise ValueError(f"{trees_path(artifacts_dir)} is for {header['version']}, "
+                             f"models are {expected}; rerun tree_export.py")
+        return cls(header, arrays)
+
+    def validate(self, frame):
+        missing = [c for c in self.features if c not in frame.columns]
+        if missing:
+            raise ValueError(f"Missing feature columns: {missing}")
+        return frame[self.features]
+
+    def matrix(self, frame):
+        """Feature matrix with categoricals as vocabulary codes (-1 unseen or missing)."""
+        X = self.validate(frame)
+        out = np.empty((len(X), len(self.features)), dtype=np.float64)
+        for j, col in enumerate(self.features):
+            if col in self._vocab:
+                out[:, j] = self._vocab[col].get_indexer(X[col].astype(object))
+            else:
+                out[:, j] = pd.to_numeric(X[col], errors="coerce").to_numpy(np.float64)
+        return out
+
+    def _catboost(self, X):
+        a = self.arrays
+        vals = X[:, a["cb_feature"]]  # (rows, trees, depth)
+        threshold, kind = a["cb_threshold"], a["cb_kind"]
+        greater = vals > threshold
+        bits = np.where(kind == CB_EQUAL, vals == threshold,
+                        np.where(np.isnan(vals), kind == CB_GREATER_NAN_TRUE, greater))
+        leaf = (bits.astype(np.int64) << np.arange(bits.shape[2])).sum(axis=2)
+        raw = a["cb_leaves"][np.arange(leaf.shape[1]), leaf].sum(axis=1)
+        return self.header["cb_scale"] * raw + self.header["cb_bias"]
+
+    def _lightgbm(self, X):
+        a = self.arrays
+        n_trees = len(a["lgb_roots"])
+        # One cell per (row, tree), flattened row-major; leaves are ~index.
+        node = np.tile(a["lgb_roots"], len(X))
+        row = np.repeat(np.arange(len(X)), n_trees)
+        active = np.flatnonzero(node >= 0)
+        while active.size:
+            nd = node[active]
+            fval = X[row[active], a["lgb_feature"][nd]]
+            go_left = fval <= a["lgb_threshold"][nd]
+
+            # Missing values are rare, so they are patched in afterwards.
+            idx = np.flatnonzero(np.isnan(fval))
+            if idx.size:
+                go_left[idx] = self._nan_left[nd[idx]]
+            idx = np.flatnonzero(np.abs(fval) <= ZERO_THRESHOLD)
+            if idx.size:
+                zero_left = self._zero_left[nd[idx]]
+                use = zero_left >= 0
+                go_left[idx[use]] = zero_left[use] == 1
+
+            idx = np.flatnonzero(a["lgb_is_cat"][nd])
+            if idx.size:
+                go_left[idx] = self._in_bitset(nd[idx], fval[idx])
+
+            nxt = np.where(go_left, a["lgb_left"][nd], a["lgb_right"][nd])
+            node[active] = nxt
+            active = active[nxt >= 0]
+        return a["lgb_leaf_value"][~node].reshape(len(X), n_trees).sum(axis=1)
+
+    def _in_bitset(self, nodes, codes):
+        """Category codes in each node's left set; NaN and unseen (-1) go right."""
+        a = self.arrays
+        code = np.where(np.isnan(codes), -1, codes).astype(np.int64)
+        start = a["lgb_cat_start"][nodes]
+        word = code // 32
+        ok = (code >= 0) & (word < a["lgb_cat_end"][nodes] - start)
+        bits = a["lgb_cat_words"][np.where(ok, start + word, 0)]
+        return ok & (((bits >> (code % 32).astype(np.uint32)) & 1) == 1)
+
+    def predict_parts(self, frame):
+        """(catboost, lightgbm) raw predictions, evaluated in row chunks."""
+        X = self.matrix(frame)
+        cb, lgb = np.empty(len(X)), np.empty(len(X))
+        for start in range(0, len(X), self.rows_per_chunk):
+            chunk = X[start:start + self.rows_per_chunk]
+            cb[start:start + len(chunk)] = self._catboost(chunk)
+            lgb[start:start + len(chunk)] = self._lightgbm(chunk)
+        return cb, lgb
+
+    def predict_batch(self, frame):
+        if len(frame) == 0:
+            return np.empty(0, dtype=np.float64)
+        cb, lgb = self.predict_parts(frame)
+        return self.weights["CatBoost"] * cb + self.weights["LightGBM"] * lgb
+
+
+@lru_cache(maxsize=None)
+def load_tree_predictor(artifacts_dir=ARTIFACTS_DIR):
+    """Process-wide shared tree tables; the mapping is opened once per artifacts dir."""
+    return TreeEnsemble.open(artifacts_dir)
+
+
+# ============================================
+# PARITY
+# ============================================
+def parity(artifacts_dir=ARTIFACTS_DIR, dataset="test"):
+    """Max relative difference per model between tree tables and the native libraries."""
+    from dataset import load_dataset
+    from features import build_features
+    from freq_index import load_frequency_index
+    from predictor import EnsemblePredictor
+
+    native = EnsemblePredictor.from_dir(artifacts_dir)
+    tables = TreeEnsemble.open(artifacts_dir)
+    frame = build_features(load_dataset(dataset), load_frequency_index(artifacts_dir))
+    X = native.validate(frame)
+    expected = {
+        "CatBoost": np.asarray(native.catboost.predict(X.astype({c: str for c in native.categorical}))),
+        "LightGBM": np.asarray(native.lightgbm.predict(X.astype({c: "category" for c in native.categorical}))),
+    }
+    expected["ensemble"] = native.predict_batch(frame)
+    cb, lgb = tables.predict_parts(frame)
+    got = {"CatBoost": cb, "LightGBM": lgb, "ensemble": tables.predict_batch(frame)}
+    return {
+        name: float(np.max(np.abs(got[name] - expected[name]) / np.maximum(np.abs(expected[name]), 1.0)))
+        for name in expected
+    }, len(frame)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export the ensemble to mmap-able tree tables.")
+    parser.add_argument("--artifacts", default=ARTIFACTS_DIR)
+    parser.add_argument("--dataset", default="train", help="training data, for CatBoost's category hashes")
+    parser.add_argument("--check", metavar="DATASET",
+                        help="compare against the native libraries on this dataset instead of exporting")
+    args = parser.parse_args()
+
+    if args.check:
+        diffs, rows = parity(args.artifacts, args.check)
+        for name, diff in diffs.items():
+            print(f"{name:10s} max relative difference {diff:.2e} over {rows} rows")
+        sys.exit(0 if max(diffs.values()) <= PARITY_TOLERANCE else 1)
+
+    path = export(args.artifacts, args.dataset)
+    print(f"Wrote {path} ({os.path.getsize(path) / 1024:.0f} KiB)")
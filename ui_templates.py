@@ -0,0 +1,68 @@
+# ============================================
+# HTML TEMPLATES
+# ============================================
+# Compiled once at import and filled with str.format on each render, instead
+# of rebuilding near-identical f-string blocks per card.
+
+STAT_CARD = """
+<div class='stat-card'>
+    <div style='font-size: 18px;'>{label}</div>
+    <div class='stat-number'>{value}</div>
+    <div>{caption}</div>
+</div>
+"""
+
+
+FLIGHT_CARD = """
+<div class='flight-card'>
+    <div class='best-badge {badge_class}'>{badge}</div>
+    <div style='display: flex; justify-content: space-between; align-items: center; margin: 15px 0;'>
+        <div style='display: flex; align-items: center; gap: 15px;'>
+            <span style='font-size: 40px;'>{logo}</span>
+            <div>
+                <div style='font-size: 22px; font-weight: 700;'>{name}</div>
+                <div style='color: #6b7280;'>{flight_no}</div>
+            </div>
+        </div>
+        <div class='price-tag'>₹{price:,}</div>
+    </div>
+    <div class='flight-route'>
+        <div style='text-align: center;'>
+            <div class='flight-time'>{departure}</div>
+            <div class='flight-city'>{source}</div>
+        </div>
+        <div style='flex: 1; text-align: center; margin: 0 20px;'>
+            <div style='border-top: 2px dashed #cbd5e1; position: relative;'>
+                <div style='position: absolute; top: -12px; left: 50%; transform: translateX(-50%); background: white; padding: 0 10px;'>
+                    ✈️
+                </div>
+            </div>
+            <div style='margin-top: 15px; font-weight: 600;'>{duration_str}</div>
+            <div style='font-size: 12px; color: #6b7280;'>{stops_str}</div>
+        </div>
+        <div style='text-align: center;'>
+            <div class='flight-time'>{arrival}</div>
+            <div class='flight-city'>{dest}</div>
+        </div>
+    </div>
+    <div style='display: flex; justify-content: space-between; align-items: center; margin-top: 20px; padding-top: 20px; border-top: 1px solid #e5e7eb;'>
+        <div style='color: #6b7280;'>⭐ {rating} • {seats} seats left</div>
+    </div>
+</div>
+"""
+
+
+BADGES = {
+    "cheapest": ("cheapest-badge", "💰 CHEAPEST FLIGHT"),
+    "fastest": ("fastest-badge", "⚡ FASTEST FLIGHT"),
+}
+
+
+def stat_card(label, value, caption):
+    return STAT_CARD.format(label=label, value=value, caption=caption)
+
+
+def flight_card(kind, flight, source, dest):
+    badge_class, badge = BADGES[kind]
+    return FLIGHT_CARD.format(badge_class=badge_class, badge=badge,
+                              source=source, dest=dest, **flight)